@@ -1,5 +1,6 @@
 from flask import Flask
 from flask_assets import Environment, Bundle
+from config import Config
 
 
 def create_app():
@@ -24,7 +25,30 @@ def create_app():
     # Import and register controllers
     from app.controllers.user_preferences_controller import user_preferences_blueprint
     from app.controllers.progress_controller import progress_blueprint
+    from app.controllers.media_probe_controller import media_probe_blueprint
+    from app.controllers.health_controller import health_blueprint
+    from app.controllers.registry_controller import registry_blueprint
+    from app.controllers.markdown_cache_controller import markdown_cache_blueprint
     app.register_blueprint(user_preferences_blueprint)
     app.register_blueprint(progress_blueprint)
+    app.register_blueprint(media_probe_blueprint)
+    app.register_blueprint(health_blueprint)
+    app.register_blueprint(registry_blueprint)
+    app.register_blueprint(markdown_cache_blueprint)
+
+    # Optional background watcher keeping registry and structure caches current
+    if Config.FILESYSTEM_WATCHER_ENABLED:
+        from app.services.filesystem_watcher_service import FilesystemWatcherService
+        FilesystemWatcherService.start(Config.COURSES_ROOT_DIRECTORY_ABS_PATH)
+
+    # Optional background media probing, so pages never wait on media headers
+    if Config.MEDIA_PROBE_BACKGROUND_ENABLED:
+        from app.services.media_probe_queue_service import MediaProbeQueueService
+        MediaProbeQueueService.start()
+
+    # Optional background crawl prefilling the registry and caches; /api/health/ready reports its progress
+    if Config.WARMUP_ENABLED and Config.COURSES_ROOT_DIRECTORY_ABS_PATH:
+        from app.services.warmup_service import WarmupService
+        WarmupService.start(Config.COURSES_ROOT_DIRECTORY_ABS_PATH)
 
     return app
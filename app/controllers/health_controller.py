@@ -0,0 +1,22 @@
+from flask import Blueprint, jsonify
+from app.services.warmup_service import WarmupService
+
+health_blueprint = Blueprint("health", __name__, url_prefix="/api/health")
+
+
+@health_blueprint.route("", methods=["GET"])
+def get_health():
+    """Liveness: the process is up and serving requests."""
+    return jsonify({"success": True, "status": "ok"})
+
+
+@health_blueprint.route("/ready", methods=["GET"])
+def get_readiness():
+    """Readiness: 503 while the library warm-up runs, 200 once it ended (degraded if it failed or stopped)."""
+    try:
+        warmup = WarmupService.get_status()
+        ready = WarmupService.is_ready()
+        status = "warming" if not ready else "degraded" if warmup["degraded"] else "ok"
+        return jsonify({"success": True, "ready": ready, "status": status, "warmup": warmup}), 200 if ready else 503
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
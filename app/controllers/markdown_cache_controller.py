@@ -0,0 +1,14 @@
+from flask import Blueprint, jsonify
+from app.services.markdown_cache_service import MarkdownCacheService
+
+markdown_cache_blueprint = Blueprint("markdown_cache", __name__, url_prefix="/api/markdown-cache")
+
+
+@markdown_cache_blueprint.route("/stats", methods=["GET"])
+def get_stats():
+    """Get hit/miss counters and occupancy of the rendered markdown cache."""
+    try:
+        stats = MarkdownCacheService.get_stats()
+        return jsonify({"success": True, "stats": stats})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
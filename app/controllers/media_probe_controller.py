@@ -0,0 +1,14 @@
+from flask import Blueprint, jsonify
+from app.services.media_probe_queue_service import MediaProbeQueueService
+
+media_probe_blueprint = Blueprint("media_probe", __name__, url_prefix="/api/media-probe")
+
+
+@media_probe_blueprint.route("/status", methods=["GET"])
+def get_status():
+    """Get the background media probing queue depth and throughput."""
+    try:
+        status = MediaProbeQueueService.get_status()
+        return jsonify({"success": True, "status": status})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
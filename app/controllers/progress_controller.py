@@ -1,5 +1,7 @@
+import os
 from flask import Blueprint, request, jsonify
 from app.services.progress_service import ProgressService
+from app.services.progress_buffer_service import ProgressBufferService
 from app.services.registry_service import RegistryService
 
 progress_blueprint = Blueprint("progress", __name__, url_prefix="/api/progress")
@@ -192,16 +194,93 @@ def update_playback_position(course_id):
         if not course_entry:
             return jsonify({"success": False, "error": "Course not found"}), 404
 
-        course_path = course_entry["path"]
-        progress_service = ProgressService(course_path)
+        # Buffered and written with the other positions of the course on the next flush
+        ProgressBufferService.record_position(course_entry["path"], lesson_path, position_seconds)
 
-        success = progress_service.update_playback_position(lesson_path, position_seconds)
+        return jsonify({"success": True, "message": "Playback position updated"})
 
-        if success:
-            return jsonify({"success": True, "message": "Playback position updated"})
-        else:
-            return jsonify({"success": False, "error": "Failed to update playback position"}), 500
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
 
+
+@progress_blueprint.route("/recent", methods=["GET"])
+def get_recent_lessons():
+    """Most recently accessed lessons across all courses, for "continue where you left off"."""
+    try:
+        limit = request.args.get("limit", 10, type=int)
+        courses = {entry["path"]: entry for entry in RegistryService().get_all_courses().values()}
+
+        lessons = []
+        for lesson in ProgressService.get_recent_lessons(list(courses), limit):
+            course_entry = courses.get(lesson["course_path"])
+            if course_entry is None:
+                continue
+            lessons.append({
+                "course_id": os.path.basename(lesson["course_path"]),
+                "course_title": course_entry["title"],
+                "lesson_path": lesson["lesson_path"],
+                "completed": lesson["completed"],
+                "last_position_seconds": lesson["last_position_seconds"],
+                "last_accessed_at": lesson["last_accessed_at"]
+            })
+
+        return jsonify({"success": True, "lessons": lessons})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@progress_blueprint.route("/batch", methods=["POST"])
+def apply_progress_batch():
+    """
+    Apply many progress operations across lessons and courses in one request.
+
+    Body: {"course_id": optional default, "operations": [{"course_id", "op", ...}]}
+    with "op" one of position, complete, incomplete or complete_module. The
+    operations of every course are validated before any is written, so an
+    invalid batch (400) changes nothing; each course is then saved once. The
+    body is parsed whatever its content type, since navigator.sendBeacon posts
+    it as text/plain.
+    """
+    try:
+        data = request.get_json(force=True, silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"success": False, "error": "No data provided"}), 400
+
+        operations = data.get("operations")
+        if not isinstance(operations, list) or not operations:
+            return jsonify({"success": False, "error": "operations is required"}), 400
+
+        # course id -> its operations, in request order
+        course_operations = {}
+        for operation in operations:
+            course_id = operation.get("course_id", data.get("course_id")) if isinstance(operation, dict) else None
+            if not course_id:
+                return jsonify({"success": False, "error": "course_id is required"}), 400
+            course_operations.setdefault(course_id, []).append(operation)
+
+        registry_service = RegistryService()
+        course_paths = {}
+        for course_id in course_operations:
+            course_entry = registry_service.get_course_by_id(course_id)
+            if not course_entry:
+                return jsonify({"success": False, "error": f"Course not found: {course_id}"}), 404
+            course_paths[course_id] = course_entry["path"]
+
+        # Validate every course first: a resent beacon must not half-apply
+        services = {course_id: ProgressService(course_paths[course_id]) for course_id in course_operations}
+        prepared = {
+            course_id: services[course_id].prepare_operations(course_ops)
+            for course_id, course_ops in course_operations.items()
+        }
+
+        applied = {}
+        for course_id, changes in prepared.items():
+            applied[course_id] = services[course_id].write_prepared_operations(changes)
+
+        return jsonify({"success": True, "applied": applied})
+
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -0,0 +1,15 @@
+from flask import Blueprint, request, jsonify
+from app.services.registry_service import RegistryService
+
+registry_blueprint = Blueprint("registry", __name__, url_prefix="/api/registry")
+
+
+@registry_blueprint.route("/access", methods=["GET"])
+def get_access_stats():
+    """Get hit counts of courses and directories since the process started."""
+    try:
+        limit = request.args.get("limit", default=20, type=int)
+        registry_service = RegistryService()
+        return jsonify({"success": True, "entries": registry_service.get_access_stats(limit)})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
@@ -0,0 +1,141 @@
+import os
+import sys
+from array import array
+from typing import List
+from .lesson_data_model import LessonData
+from .lesson_type import LessonType
+from .module_data_model import ModuleData
+
+
+# Lesson types are stored as one-byte codes
+_LESSON_TYPES = list(LessonType)
+_LESSON_TYPE_CODES = {lesson_type: code for code, lesson_type in enumerate(_LESSON_TYPES)}
+
+
+class CompactModule:
+    """A module as a range of lesson rows in a CompactCourseStructure."""
+    __slots__ = ("title", "directory_name", "start", "end", "total_duration_seconds", "duration_pending")
+
+    def __init__(self, title: str, directory_name: str, start: int, end: int,
+                 total_duration_seconds: int = 0, duration_pending: bool = False):
+        self.title = title
+        self.directory_name = directory_name
+        self.start = start
+        self.end = end
+        self.total_duration_seconds = total_duration_seconds
+        self.duration_pending = duration_pending
+
+
+class CompactCourseStructure:
+    """
+    Column-oriented form of a course structure, used for cached courses.
+
+    Lessons are rows: file name, title, directory index, type code, duration
+    and pending flag, with the numeric columns in typed arrays. Absolute
+    paths are not stored; they are rebuilt from the course path, the
+    interned module directory name and the file name when the structure is
+    materialized back to LessonData/ModuleData for services and templates.
+    Module lessons come first, in module order, followed by root lessons.
+    """
+    __slots__ = ("course_path", "directories", "modules", "file_names", "titles",
+                 "directory_indexes", "type_codes", "durations", "pending", "root_start")
+
+    def __init__(self, course_path: str):
+        self.course_path = sys.intern(course_path)
+        # Index 0 is the course root, module directories follow in module order
+        self.directories: List[str] = [""]
+        self.modules: List[CompactModule] = []
+        self.file_names: List[str] = []
+        self.titles: List[str] = []
+        self.directory_indexes = array("I")
+        self.type_codes = array("B")
+        self.durations = array("l")
+        self.pending = bytearray()
+        self.root_start = 0
+
+    @classmethod
+    def from_structure(cls, course_path: str, modules: List[ModuleData],
+                       lessons: List[LessonData]) -> "CompactCourseStructure":
+        """Pack scanned modules and root lessons."""
+        structure = cls(course_path)
+
+        for module in modules:
+            directory_name = sys.intern(module.directory_name or "")
+            structure.directories.append(directory_name)
+            start = len(structure.file_names)
+            for lesson in module.lessons:
+                structure._append_lesson(lesson, len(structure.directories) - 1)
+            structure.modules.append(CompactModule(
+                title=module.title,
+                directory_name=directory_name,
+                start=start,
+                end=len(structure.file_names),
+                total_duration_seconds=module.total_duration_seconds,
+                duration_pending=module.duration_pending
+            ))
+
+        structure.root_start = len(structure.file_names)
+        for lesson in lessons:
+            structure._append_lesson(lesson, 0)
+
+        return structure
+
+    def relative_path(self, row: int) -> str:
+        """Lesson path relative to the course directory."""
+        directory = self.directories[self.directory_indexes[row]]
+        file_name = self.file_names[row]
+        return os.path.join(directory, file_name) if directory else file_name
+
+    def lesson_at(self, row: int) -> LessonData:
+        """Materialize one lesson row."""
+        return LessonData(
+            title=self.titles[row],
+            lesson_type=_LESSON_TYPES[self.type_codes[row]],
+            duration_seconds=self.durations[row],
+            completed=False,
+            file_path=os.path.join(self.course_path, self.relative_path(row)),
+            duration_pending=bool(self.pending[row])
+        )
+
+    def module_at(self, index: int) -> ModuleData:
+        """Materialize one module with its lessons."""
+        module = self.modules[index]
+        return ModuleData(
+            title=module.title,
+            module_number=index + 1,
+            lessons=[self.lesson_at(row) for row in range(module.start, module.end)],
+            total_duration_seconds=module.total_duration_seconds,
+            completed=False,
+            directory_name=module.directory_name,
+            duration_pending=module.duration_pending
+        )
+
+    def materialize_modules(self) -> List[ModuleData]:
+        """Materialize every module with its lessons."""
+        return [self.module_at(index) for index in range(len(self.modules))]
+
+    def materialize_lessons(self) -> List[LessonData]:
+        """Materialize the root-level lessons."""
+        return [self.lesson_at(row) for row in range(self.root_start, len(self.file_names))]
+
+    def sizeof(self) -> int:
+        """Approximate memory held by the structure, in bytes."""
+        size = sys.getsizeof(self) + sys.getsizeof(self.directories) + sys.getsizeof(self.modules)
+        size += sum(sys.getsizeof(module) + sys.getsizeof(module.title) for module in self.modules)
+        size += sum(sys.getsizeof(directory) for directory in self.directories)
+        size += sys.getsizeof(self.file_names) + sum(sys.getsizeof(name) for name in self.file_names)
+        size += sys.getsizeof(self.titles) + sum(sys.getsizeof(title) for title in self.titles)
+        size += sys.getsizeof(self.directory_indexes) + sys.getsizeof(self.type_codes)
+        size += sys.getsizeof(self.durations) + sys.getsizeof(self.pending)
+        return size
+
+    def __len__(self) -> int:
+        return len(self.file_names)
+
+    def _append_lesson(self, lesson: LessonData, directory_index: int) -> None:
+        self.file_names.append(os.path.basename(lesson.file_path or ""))
+        self.titles.append(lesson.title)
+        self.directory_indexes.append(directory_index)
+        self.type_codes.append(_LESSON_TYPE_CODES[lesson.lesson_type])
+        self.durations.append(lesson.duration_seconds)
+        self.pending.append(1 if lesson.duration_pending else 0)
@@ -13,6 +13,8 @@ class NodeType(Enum):
 @dataclass
 class CourseProgress:
     progress_percent: float = 0.0
+    # The percentage of a directory is still being computed
+    progress_pending: bool = False
     last_accessed_item_timestamp: Optional[int] = None
     last_accessed_item_title: Optional[str] = None
     last_accessed_item_path: Optional[str] = None
@@ -0,0 +1,44 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class CoursePlaylist:
+    """
+    Lessons of a course in playback order (module lessons first, then root
+    lessons), indexed for constant-time navigation.
+    """
+    lesson_paths: List[str] = field(default_factory=list)
+    positions: Dict[str, int] = field(default_factory=dict)
+    lesson_modules: List[Optional[str]] = field(default_factory=list)
+    module_indexes: Dict[str, int] = field(default_factory=dict)
+
+    def add_lesson(self, relative_path: str, module_directory: Optional[str] = None) -> None:
+        """Append a lesson; lessons of one module must be added consecutively."""
+        position = len(self.lesson_paths)
+        self.lesson_paths.append(relative_path)
+        self.positions[relative_path] = position
+        self.lesson_modules.append(module_directory)
+
+    def get_navigation(self, relative_path: str) -> Dict[str, Optional[str]]:
+        """Previous and next lesson paths, both None if the lesson is not in the playlist."""
+        position = self.positions.get(relative_path)
+        if position is None:
+            return {'next': None, 'previous': None}
+
+        return {
+            'next': self.lesson_paths[position + 1] if position + 1 < len(self.lesson_paths) else None,
+            'previous': self.lesson_paths[position - 1] if position > 0 else None
+        }
+
+    def is_module_boundary(self, relative_path: str) -> bool:
+        """Check if the next lesson starts a different module (or the course ends)."""
+        position = self.positions.get(relative_path)
+        if position is None:
+            return False
+        if position + 1 == len(self.lesson_paths):
+            return True
+        return self.lesson_modules[position + 1] != self.lesson_modules[position]
+
+    def __len__(self) -> int:
+        return len(self.lesson_paths)
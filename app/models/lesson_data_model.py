@@ -9,4 +9,5 @@ class LessonData:
     lesson_type: LessonType = LessonType.TEXT
     duration_seconds: int = 0
     completed: bool = False
-    file_path: Optional[str] = None
\ No newline at end of file
+    file_path: Optional[str] = None
+    duration_pending: bool = False
\ No newline at end of file
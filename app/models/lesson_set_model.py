@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Optional
+
+
+@dataclass
+class LessonSet:
+    """
+    Relative paths of the lessons of a course, with the directory mtimes and
+    listings they were read from. Enough to count completion without
+    building the course structure.
+    """
+    lesson_paths: FrozenSet[str]
+    directory_mtimes: Dict[str, int]
+    directory_signatures: Optional[Dict[str, int]] = None
+
+    @property
+    def count(self) -> int:
+        return len(self.lesson_paths)
+
+    def count_completed(self, completed_paths: Iterable[str]) -> int:
+        """Completed lessons that still exist in the course."""
+        return len(self.lesson_paths.intersection(completed_paths))
@@ -10,4 +10,5 @@ class ModuleData:
     lessons: List[LessonData]
     total_duration_seconds: int = 0
     completed: bool = False
-    directory_name: Optional[str] = None
\ No newline at end of file
+    directory_name: Optional[str] = None
+    duration_pending: bool = False
\ No newline at end of file
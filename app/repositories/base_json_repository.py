@@ -1,41 +1,285 @@
 import json
 import os
-from typing import Any, Dict, Optional
+import stat
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from config import Config
+from app.utils.file_lock import FileLock
 
 
 class BaseJsonRepository:
-    """Base repository for JSON file operations."""
+    """
+    Base repository for JSON file operations.
 
-    def __init__(self, file_path: str):
+    Files are safe to share between worker processes: every write goes to a
+    temporary file that atomically replaces the target, so readers never see
+    a partial document, and writes hold an exclusive fcntl advisory lock (see
+    FileLock). Plain reads take no lock and create nothing, so a missing or
+    read-only file simply loads as None. Use update() or append_changes() for
+    read-modify-write: they load under the lock, so the change is applied to
+    the latest document on disk and concurrent changes to other keys are kept.
+
+    A journaled repository keeps the JSON file as a snapshot and appends
+    changes made through set_value/delete_value/append_changes to a JSON
+    lines journal next to it (`<file>.journal`), so a small change costs a
+    small append instead of a rewrite of the whole document. load() reads
+    the snapshot and replays the journal, and is retried when a compaction
+    replaced the snapshot meanwhile. The journal is compacted into the
+    snapshot once it outgrows both the snapshot and
+    Config.JSON_JOURNAL_COMPACT_BYTES, and on every save().
+    """
+
+    JOURNAL_SUFFIX = ".journal"
+    # Lock-free reads that raced a compaction before a load falls back to the shared lock
+    LOAD_ATTEMPTS = 3
+
+    def __init__(self, file_path: str, journaled: bool = False):
         self.file_path = file_path
+        self.journaled = journaled
+        self._transaction_depth = 0
+        self._pending_data: Optional[Dict[str, Any]] = None
+
+    @property
+    def journal_path(self) -> str:
+        return self.file_path + self.JOURNAL_SUFFIX
 
     def load(self) -> Optional[Dict[str, Any]]:
-        """Load data from the JSON file."""
-        if not os.path.exists(self.file_path):
-            return None
+        """Load data from the JSON file (or the data saved in the open transaction)."""
+        if self._pending_data is not None:
+            return self._pending_data
+        if not self.journaled:
+            # No lock: the file is only ever replaced atomically
+            return self._read_document()
 
-        try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError, PermissionError) as e:
-            raise IOError(f"Error loading JSON from {self.file_path}: {e}")
+        # No lock either, but compaction replaces the snapshot and then empties the
+        # journal, so a read that opened the old snapshot may replay the emptied
+        # journal. Such a read sees a different snapshot afterwards and is retried.
+        for _ in range(self.LOAD_ATTEMPTS):
+            identity = self._snapshot_identity()
+            data = self._read_document()
+            if self._snapshot_identity() == identity:
+                return data
+
+        with self._file_lock(exclusive=False):
+            return self._read_document()
 
     def save(self, data: Dict[str, Any]) -> bool:
-        """Save data to the JSON file."""
-        try:
-            self._ensure_directory()
+        """Replace the JSON file with data, or keep it for the commit of the open transaction."""
+        if self._transaction_depth > 0:
+            self._pending_data = data
+            return True
+
+        with self._file_lock():
+            self._write_snapshot(data)
+        return True
 
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+    def update(self, mutator: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Read-modify-write under the exclusive lock: mutator receives the latest
+        document (an empty dict if there is none), changes it in place or
+        returns a replacement, and the result is saved.
 
+        Returns:
+            Dict[str, Any]: The saved document
+        """
+        with self._file_lock():
+            data = self.load() or {}
+            result = mutator(data)
+            if result is not None:
+                data = result
+            self.save(data)
+            return data
+
+    def set_value(self, key_path: List[str], value: Any) -> bool:
+        """Set the value at a key path (e.g. ["lessons", lesson_path]), creating missing parents."""
+        return self.append_changes([{"set": list(key_path), "value": value}])
+
+    def delete_value(self, key_path: List[str]) -> bool:
+        """Delete the value at a key path if present."""
+        return self.append_changes([{"delete": list(key_path)}])
+
+    def append_changes(self, changes: List[Dict[str, Any]]) -> bool:
+        """
+        Apply changes to the latest document under the exclusive lock: appended
+        to the journal in journaled mode, otherwise (or inside a transaction)
+        applied to the document and saved.
+
+        Args:
+            changes: {"set": key_path, "value": value}, {"delete": key_path} or
+                {"merge": key_path, "value": dict, "defaults": dict, "latest": fields}, which
+                updates the fields of the dictionary at key_path, filling missing ones from
+                defaults; of the fields named in the optional latest, the greater of the
+                stored and the new value is kept (e.g. ISO timestamps)
+        """
+        if not self.journaled or self._transaction_depth > 0:
+            def apply(data: Dict[str, Any]) -> None:
+                for change in changes:
+                    self.apply_change(data, change)
+
+            self.update(apply)
             return True
-        except (IOError, OSError, PermissionError) as e:
-            raise IOError(f"Error saving JSON to {self.file_path}: {e}")
+
+        with self._file_lock():
+            self._append_journal(changes)
+        return True
+
+    def compact(self) -> None:
+        """Fold the journal into the snapshot."""
+        with self._file_lock():
+            data = self.load()
+            if data is not None:
+                self._write_snapshot(data)
+
+    @staticmethod
+    def apply_change(data: Dict[str, Any], change: Dict[str, Any]) -> None:
+        """Apply one journal change to a document in place."""
+        if "set" in change or "merge" in change:
+            *parents, key = change["set"] if "set" in change else change["merge"]
+            target = data
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            if "set" in change:
+                target[key] = change["value"]
+            else:
+                current = target.get(key) if isinstance(target.get(key), dict) else {}
+                merged = {**change.get("defaults", {}), **current, **change["value"]}
+                for field in change.get("latest", ()):
+                    stored = current.get(field)
+                    if stored is not None and (merged.get(field) is None or stored > merged[field]):
+                        merged[field] = stored
+                target[key] = merged
+        elif "delete" in change:
+            *parents, key = change["delete"]
+            target = data
+            for parent in parents:
+                target = target.get(parent)
+                if not isinstance(target, dict):
+                    return
+            target.pop(key, None)
+
+    @contextmanager
+    def transaction(self) -> Iterator["BaseJsonRepository"]:
+        """
+        Batch the saves made inside the block into one atomic write when the
+        outermost block exits. Loads inside the block see the pending data.
+        If the block raises, the pending data is discarded.
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._pending_data = None
+            raise
+
+        self._transaction_depth -= 1
+        if self._transaction_depth == 0 and self._pending_data is not None:
+            data, self._pending_data = self._pending_data, None
+            with self._file_lock():
+                self._write_snapshot(data)
 
     def exists(self) -> bool:
         """Check if the JSON file exists."""
         return os.path.exists(self.file_path)
 
+    def _write_file(self, data: Dict[str, Any]) -> None:
+        """
+        Write data to a temporary file in the same directory that then
+        atomically replaces the target, so readers never see a partial document.
+        """
+        try:
+            self._ensure_directory()
+
+            directory = os.path.dirname(self.file_path) or "."
+            fd, temp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                # mkstemp creates the file as 0600; keep the mode of the file being replaced
+                mode = stat.S_IMODE(os.stat(self.file_path).st_mode) if os.path.exists(self.file_path) else 0o644
+                os.chmod(temp_path, mode)
+                os.replace(temp_path, self.file_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        except (IOError, OSError, PermissionError) as e:
+            raise IOError(f"Error saving JSON to {self.file_path}: {e}")
+
+    def _file_lock(self, exclusive: bool = True) -> FileLock:
+        """Advisory lock shared by every process using this file."""
+        return FileLock(self.file_path, exclusive=exclusive)
+
+    def _write_snapshot(self, data: Dict[str, Any]) -> None:
+        """Replace the file atomically and empty the journal it now contains."""
+        self._write_file(data)
+        if self.journaled and self._journal_size() > 0:
+            # Truncated rather than removed, so the directory itself does not change
+            with open(self.journal_path, 'w', encoding='utf-8'):
+                pass
+
+    def _append_journal(self, changes: List[Dict[str, Any]]) -> None:
+        """Append changes as JSON lines in one write, compacting when the journal grew too large."""
+        lines = "".join(json.dumps(change, ensure_ascii=False, separators=(",", ":")) + "\n" for change in changes)
+        try:
+            self._ensure_directory()
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        except (IOError, OSError) as e:
+            raise IOError(f"Error appending to journal {self.journal_path}: {e}")
+
+        journal_size = self._journal_size()
+        snapshot_size = os.path.getsize(self.file_path) if os.path.exists(self.file_path) else 0
+        if journal_size > max(snapshot_size, Config.JSON_JOURNAL_COMPACT_BYTES):
+            self.compact()
+
+    def _replay_journal(self, data: Dict[str, Any]) -> None:
+        try:
+            f = open(self.journal_path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    change = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line torn by a crash during an append
+                    continue
+                self.apply_change(data, change)
+
+    def _read_document(self) -> Optional[Dict[str, Any]]:
+        """Read the snapshot and replay the journal over it."""
+        has_journal = self.journaled and self._journal_size() > 0
+        if not os.path.exists(self.file_path) and not has_journal:
+            return None
+
+        try:
+            data = {}
+            if os.path.exists(self.file_path):
+                with open(self.file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            if has_journal:
+                self._replay_journal(data)
+            return data
+        except (FileNotFoundError, json.JSONDecodeError, PermissionError) as e:
+            raise IOError(f"Error loading JSON from {self.file_path}: {e}")
+
+    def _snapshot_identity(self) -> Optional[tuple]:
+        """Changes whenever the snapshot is replaced."""
+        try:
+            stat_result = os.stat(self.file_path)
+        except OSError:
+            return None
+        return stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size
+
+    def _journal_size(self) -> int:
+        try:
+            return os.path.getsize(self.journal_path)
+        except OSError:
+            return 0
+
     def _ensure_directory(self) -> None:
         """Ensure the directory for the file path exists."""
         directory = os.path.dirname(self.file_path)
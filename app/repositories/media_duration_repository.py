@@ -0,0 +1,13 @@
+from pathlib import Path
+from .base_json_repository import BaseJsonRepository
+
+
+class MediaDurationRepository(BaseJsonRepository):
+    """Repository for probed media durations stored in media_durations.json."""
+
+    DEFAULT_DURATIONS_PATH = Path(__file__).parent.parent / "data" / "media_durations.json"
+
+    def __init__(self, durations_file: Path = None):
+        if durations_file is None:
+            durations_file = self.DEFAULT_DURATIONS_PATH
+        super().__init__(str(durations_file))
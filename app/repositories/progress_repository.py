@@ -1,4 +1,6 @@
 import os
+from typing import Set
+from config import Config
 from .base_json_repository import BaseJsonRepository
 
 
@@ -9,7 +11,7 @@ class ProgressRepository(BaseJsonRepository):
 
     def __init__(self, course_directory: str):
         progress_path = os.path.join(course_directory, self.PROGRESS_FILENAME)
-        super().__init__(progress_path)
+        super().__init__(progress_path, journaled=Config.JSON_JOURNAL_ENABLED)
         self.course_directory = course_directory
 
     @staticmethod
@@ -19,6 +21,18 @@ class ProgressRepository(BaseJsonRepository):
 
     @staticmethod
     def progress_exists(course_directory: str) -> bool:
-        """Check if progress file exists for a course directory."""
+        """Check if progress file (or its journal) exists for a course directory."""
         progress_path = ProgressRepository.get_progress_path(course_directory)
-        return os.path.exists(progress_path)
+        return os.path.exists(progress_path) or os.path.exists(progress_path + BaseJsonRepository.JOURNAL_SUFFIX)
+
+    def has_progress(self) -> bool:
+        """Check if any progress was recorded for the course."""
+        return ProgressRepository.progress_exists(self.course_directory)
+
+    def get_completed_lessons(self) -> Set[str]:
+        """Relative paths of the lessons marked as completed."""
+        data = self.load() or {}
+        return {
+            lesson_path for lesson_path, lesson in data.get("lessons", {}).items()
+            if isinstance(lesson, dict) and lesson.get("completed", False)
+        }
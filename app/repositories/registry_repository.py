@@ -1,13 +1,560 @@
-from pathlib import Path
+import atexit
+import copy
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from config import Config
+from app.utils.access_table import AccessTable
+from app.utils.path_trie import PathTrie
 from .base_json_repository import BaseJsonRepository
 
 
+REGISTRY_SECTIONS = ("directories", "courses")
+
+EMPTY_REGISTRY = {
+    "directories": {},
+    "courses": {},
+    "metadata": {
+        "version": "1.0",
+        "last_updated": None,
+        "description": "Unified registry for directories and courses with their metadata and node types"
+    }
+}
+
+
+class _RegistryIndex:
+    """Secondary indexes over the registry sections: by id (directory name) and a trie of absolute paths."""
+
+    def __init__(self, data: Dict[str, Any]):
+        # section -> id -> registry keys, in registry order
+        self.ids: Dict[str, Dict[str, List[str]]] = {section: {} for section in REGISTRY_SECTIONS}
+        # path -> (section, key) pairs, with ancestor walks and the cached library root
+        self.paths = PathTrie()
+        # section -> ids looked up and not found since the last addition
+        self.missing_ids: Dict[str, Set[str]] = {section: set() for section in REGISTRY_SECTIONS}
+
+        for section in REGISTRY_SECTIONS:
+            for key, entry in data.get(section, {}).items():
+                self.add(section, key, entry)
+
+    def add(self, section: str, key: str, entry: Dict[str, Any]) -> None:
+        item_id = os.path.basename(entry["path"])
+        keys = self.ids[section].setdefault(item_id, [])
+        if key not in keys:
+            keys.append(key)
+        self.paths.insert(entry["path"], (section, key))
+        self.missing_ids[section].discard(item_id)
+
+    def remove(self, section: str, key: str, entry: Dict[str, Any]) -> None:
+        item_id = os.path.basename(entry["path"])
+        keys = self.ids[section].get(item_id, [])
+        if key in keys:
+            keys.remove(key)
+        if not keys:
+            self.ids[section].pop(item_id, None)
+        self.paths.remove(entry["path"], (section, key))
+
+
+class _SharedDocument:
+    """In-memory copy of one registry file, shared by every repository instance in the process."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.data: Optional[Dict[str, Any]] = None
+        self.index: Optional[_RegistryIndex] = None
+        # Identity of the file (and journal size) the data was read from or last written as
+        self.file_version: Optional[Tuple[int, int]] = None
+        # The whole document must be rewritten
+        self.dirty = False
+        # Entry changes not written yet, unless dirty
+        self.changes: List[Dict[str, Any]] = []
+        self.timer: Optional[threading.Timer] = None
+        self.transaction_depth = 0
+        # (section, key) -> hits and access times, persisted at a coarse granularity
+        self.accesses = AccessTable(Config.REGISTRY_ACCESS_FLUSH_SECONDS)
+
+    @property
+    def has_changes(self) -> bool:
+        return self.dirty or bool(self.changes)
+
+
 class RegistryRepository(BaseJsonRepository):
-    """Repository for the directory registry stored in registry.json."""
+    """
+    Repository for the directory registry stored in registry.json.
+
+    The registry is kept in memory once per process and file. load() returns
+    the shared document and re-parses the file only when it was replaced
+    (a write by another process), unless in-memory changes are still pending,
+    which then win. Changes are written behind on a timer
+    (Config.REGISTRY_WRITE_BEHIND_SECONDS, 0 writes through), at the end of a
+    transaction() and at interpreter exit. A flush holds the file lock and
+    replays this process's entry changes onto the file as it is on disk, so
+    worker processes do not overwrite each other; only a document replaced
+    with save() is written as is. With Config.JSON_JOURNAL_ENABLED, entry
+    changes are flushed as journal appends.
+
+    The document is shared and mutable: hold `lock` while iterating over it
+    or changing it. Entries changed through set_entry/remove_entry keep the
+    id and path indexes current; a document replaced or changed in place and
+    passed to save() has its indexes rebuilt on the next lookup.
+    """
 
     DEFAULT_REGISTRY_PATH = "app/data/registry.json"
 
+    # Bound of the per-section negative cache of unknown ids
+    MAX_MISSING_IDS = 10000
+
+    _documents: Dict[str, _SharedDocument] = {}
+    _documents_lock = threading.Lock()
+    _atexit_registered = False
+
     def __init__(self, registry_path: str = None):
         if registry_path is None:
             registry_path = self.DEFAULT_REGISTRY_PATH
-        super().__init__(registry_path)
+        # Absolute, so that write-behind flushes do not depend on the working directory
+        super().__init__(os.path.abspath(registry_path), journaled=Config.JSON_JOURNAL_ENABLED)
+        self._document = self._get_document(self.file_path)
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Lock guarding the shared document."""
+        return self._document.lock
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Return the shared registry document, reloading it if the file changed on disk."""
+        document = self._document
+        with document.lock:
+            if document.data is not None and document.has_changes:
+                return document.data
+
+            file_version = self._file_version()
+            if document.data is not None and file_version == document.file_version:
+                return document.data
+
+            try:
+                data = super().load() if file_version is not None else None
+            except IOError as e:
+                if document.data is None:
+                    raise
+                # Keep serving the last good document rather than dropping the registry
+                print(f"Error reloading registry, keeping the loaded one: {e}")
+                return document.data
+            document.data = data
+            document.index = None
+            document.file_version = file_version
+            return document.data
+
+    def save(self, data: Dict[str, Any]) -> bool:
+        """Replace the shared document and schedule a write-behind flush."""
+        with self._document.lock:
+            self._document.data = data
+            self._document.index = None
+            return self._mark_changed()
+
+    def get_entry(self, section: str, key: str) -> Optional[Dict[str, Any]]:
+        """Get the entry stored under a registry key."""
+        with self._document.lock:
+            data = self.load()
+            return data[section].get(key) if data else None
+
+    def set_entry(self, section: str, key: str, entry: Dict[str, Any]) -> None:
+        """Add or replace one entry, keeping the indexes current."""
+        with self._document.lock:
+            data = self._get_data()
+            # The key embeds the path, so a replaced entry keeps its index slots
+            if key not in data[section]:
+                self._get_index().add(section, key, entry)
+            data[section][key] = entry
+            self._mark_changed([{"set": [section, key], "value": entry}])
+
+    def remove_entry(self, section: str, key: str) -> Optional[Dict[str, Any]]:
+        """Remove one entry, keeping the indexes current."""
+        with self._document.lock:
+            data = self.load()
+            entry = data[section].pop(key, None) if data else None
+            if entry is not None:
+                self._get_index().remove(section, key, entry)
+                self._mark_changed([{"delete": [section, key]}])
+            return entry
+
+    def get_section(self, section: str) -> Dict[str, Dict[str, Any]]:
+        """Copy of all entries of a section, by registry key."""
+        with self._document.lock:
+            return dict((self.load() or {}).get(section, {}))
+
+    def get_child_entries(self, parent_path: str) -> List[Dict[str, Any]]:
+        """Entries whose path is a direct child of parent_path."""
+        with self._document.lock:
+            data = self.load()
+            if not data:
+                return []
+            return [data[section][key] for section, key in self._get_index().paths.children(parent_path)]
+
+    def get_root_path(self) -> Optional[str]:
+        """Deepest directory containing every registered path, or None if the registry is empty."""
+        with self._document.lock:
+            if not self.load():
+                return None
+            return self._get_index().paths.common_root()
+
+    def get_path_entries(self, path: str) -> Dict[str, Dict[str, Any]]:
+        """Entries registered for path and each of its ancestors, by path, directories first."""
+        with self._document.lock:
+            data = self.load()
+            if not data:
+                return {}
+            return {
+                ancestor: data[section][key]
+                for ancestor, locations in self._get_index().paths.walk(path)
+                for section, key in [self._first_location(locations)]
+            }
+
+    def remove_tree(self, path: str) -> int:
+        """Remove the entries of a path and of everything below it, returning how many were removed."""
+        with self._document.lock:
+            data = self.load() or {}
+            prefix = path.rstrip(os.sep) + os.sep
+            removed = [
+                (section, key)
+                for section in REGISTRY_SECTIONS
+                for key, entry in data.get(section, {}).items()
+                if entry["path"] == path or entry["path"].startswith(prefix)
+            ]
+            for section, key in removed:
+                self.remove_entry(section, key)
+            return len(removed)
+
+    def remove_accessed_before(self, cutoff: datetime) -> int:
+        """Remove the entries last accessed at or before cutoff, returning how many were removed."""
+        with self._document.lock:
+            data = self.load() or {}
+            removed = [
+                (section, key)
+                for section in REGISTRY_SECTIONS
+                for key, entry in data.get(section, {}).items()
+                if datetime.fromisoformat(entry["last_accessed"]) <= cutoff
+            ]
+            for section, key in removed:
+                self.remove_entry(section, key)
+            return len(removed)
+
+    def clear(self) -> None:
+        """Replace the registry with an empty one."""
+        self.save(copy.deepcopy(EMPTY_REGISTRY))
+
+    def ensure_exists(self) -> None:
+        """Create an empty registry file unless one exists, without replacing one another process just created."""
+        with self._document.lock:
+            if self.exists():
+                return
+            with self._file_lock():
+                if not super().exists():
+                    self._write_snapshot(copy.deepcopy(EMPTY_REGISTRY))
+            self.load()
+
+    def record_access(self, section: str, key: str, when: datetime) -> None:
+        """
+        Record an access to an entry in the access table. Its stored
+        last_accessed is updated only when it is older than
+        Config.REGISTRY_ACCESS_FLUSH_SECONDS; later accesses are applied
+        with the next write or at exit.
+        """
+        with self._document.lock:
+            entry = self.get_entry(section, key)
+            if entry is None:
+                return
+
+            try:
+                stored = datetime.fromisoformat(entry["last_accessed"])
+            except (KeyError, TypeError, ValueError):
+                stored = None
+            if self._document.accesses.record((section, key), when, stored):
+                entry["last_accessed"] = when.isoformat()
+                self._mark_changed([{"set": [section, key, "last_accessed"], "value": entry["last_accessed"]}])
+
+    def apply_pending_accesses(self) -> int:
+        """Write the newest recorded access times into their entries now, returning how many changed."""
+        with self._document.lock:
+            changes = self._apply_pending_accesses()
+            if changes:
+                self._mark_changed(changes)
+            return len(changes)
+
+    def get_access_stats(self, limit: int = 0) -> List[Dict[str, Any]]:
+        """Hit counts and last access times recorded by this process, most accessed first."""
+        with self._document.lock:
+            data = self.load() or {}
+            stats = []
+            for (section, key), hits, last_access in self._document.accesses.most_accessed(limit):
+                entry = data.get(section, {}).get(key)
+                if entry is not None:
+                    stats.append({
+                        "title": entry["title"],
+                        "path": entry["path"],
+                        "node_type": entry["node_type"],
+                        "hits": hits,
+                        "last_accessed": last_access.isoformat()
+                    })
+            return stats
+
+    def find_by_id(self, section: str, item_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the first entry of a section whose directory name is item_id.
+        Unknown ids are remembered until an entry with that id is added.
+        """
+        with self._document.lock:
+            data = self.load()
+            if not data:
+                return None
+            index = self._get_index()
+            if item_id in index.missing_ids[section]:
+                return None
+
+            keys = index.ids[section].get(item_id)
+            if not keys:
+                if len(index.missing_ids[section]) >= self.MAX_MISSING_IDS:
+                    index.missing_ids[section].clear()
+                index.missing_ids[section].add(item_id)
+                return None
+            return data[section][keys[0]]
+
+    def find_by_path(self, path: str) -> Optional[Dict[str, Any]]:
+        """Get the entry registered for an absolute path, directories first."""
+        with self._document.lock:
+            data = self.load()
+            if not data:
+                return None
+            locations = self._get_index().paths.get(path)
+            if not locations:
+                return None
+            section, key = self._first_location(locations)
+            return data[section][key]
+
+    def flush(self) -> bool:
+        """Write pending changes to disk now."""
+        document = self._document
+        with document.lock:
+            if document.timer is not None:
+                document.timer.cancel()
+                document.timer = None
+            if not document.has_changes:
+                return True
+
+            with self._file_lock():
+                # Piggyback access times newer than the stored ones on this write
+                self._record_changes(self._apply_pending_accesses())
+                if document.dirty:
+                    # A replaced document is written as is
+                    self._write_snapshot(document.data)
+                else:
+                    metadata = document.data.get("metadata") or {}
+                    changes = document.changes + [
+                        {"set": ["metadata", "last_updated"], "value": metadata.get("last_updated")}
+                    ]
+                    # Journal appends cannot overwrite other processes' changes; a rewrite is
+                    # applied to the file as it is now. Either way the document catches up.
+                    if not self.journaled or self._file_version() != document.file_version:
+                        self._merge_into_file_version(changes)
+                    if self.journaled:
+                        self._append_journal(changes)
+                    else:
+                        self._write_file(document.data)
+            document.dirty = False
+            document.changes = []
+            document.file_version = self._file_version()
+        return True
+
+    @contextmanager
+    def transaction(self) -> Iterator["RegistryRepository"]:
+        """
+        Batch the changes made inside the block into one atomic write when the
+        outermost block exits, instead of write-through or timer flushes.
+
+        The document lock is not held for the whole block, so other threads keep
+        reading and writing; their changes are part of the same commit. Changes
+        made before an exception stay in memory and are written behind as usual.
+        """
+        document = self._document
+        with document.lock:
+            document.transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            with document.lock:
+                document.transaction_depth -= 1
+                if document.transaction_depth == 0 and document.has_changes:
+                    self._schedule_flush()
+            raise
+
+        with document.lock:
+            document.transaction_depth -= 1
+            if document.transaction_depth == 0:
+                self.flush()
+
+    def exists(self) -> bool:
+        """Check if the registry is loaded or exists on disk."""
+        return self._document.data is not None or super().exists()
+
+    @classmethod
+    def flush_all(cls) -> None:
+        """Write every registry with pending changes, used at interpreter exit."""
+        with cls._documents_lock:
+            paths = list(cls._documents)
+        for path in paths:
+            try:
+                repository = RegistryRepository(path)
+                repository.apply_pending_accesses()
+                repository.flush()
+            except IOError as e:
+                print(f"Error flushing registry: {e}")
+
+    @classmethod
+    def reset(cls) -> None:
+        """Flush and forget every in-memory registry, so the next load reads the files again."""
+        cls.flush_all()
+        with cls._documents_lock:
+            cls._documents = {}
+
+    @classmethod
+    def _get_document(cls, path: str) -> _SharedDocument:
+        with cls._documents_lock:
+            document = cls._documents.get(path)
+            if document is None:
+                document = cls._documents[path] = _SharedDocument()
+            if not cls._atexit_registered:
+                atexit.register(cls.flush_all)
+                cls._atexit_registered = True
+            return document
+
+    def _get_data(self) -> Dict[str, Any]:
+        """
+        The document to change, creating an empty registry if the file is
+        missing. An unreadable file is kept aside as `<file>.corrupt` first.
+        """
+        try:
+            data = self.load()
+        except IOError as e:
+            print(f"Registry is unreadable, moving it to {self.file_path}.corrupt: {e}")
+            with self._file_lock():
+                os.replace(self.file_path, self.file_path + ".corrupt")
+            data = None
+        if data is None:
+            self.ensure_exists()
+            data = self.load()
+        if not data:
+            self.clear()
+            data = self._document.data
+        return data
+
+    def _merge_into_file_version(self, changes: List[Dict[str, Any]]) -> None:
+        """
+        Replace the document with the version on disk plus this process's
+        changes, so changes written meanwhile by other processes are kept.
+        Called with the file lock held.
+        """
+        document = self._document
+        try:
+            data = super().load()
+        except IOError as e:
+            print(f"Error reading registry to merge, overwriting it: {e}")
+            return
+        if not data:
+            return
+
+        for change in changes:
+            key_path = change.get("set") or change.get("delete")
+            # Access times of entries another process removed are dropped
+            if len(key_path) > 2 and key_path[1] not in data.get(key_path[0], {}):
+                continue
+            self.apply_change(data, change)
+        document.data = data
+        document.index = None
+
+    def _apply_pending_accesses(self) -> List[Dict[str, Any]]:
+        """Write pending access times into their entries, returning the journal changes made."""
+        accesses = self._document.accesses
+        data = self._document.data
+        if not data:
+            return []
+
+        changes = []
+        for (section, key), when in accesses.pending().items():
+            entry = data.get(section, {}).get(key)
+            if entry is None:
+                accesses.forget((section, key))
+                continue
+            entry["last_accessed"] = when.isoformat()
+            accesses.mark_persisted((section, key), when)
+            changes.append({"set": [section, key, "last_accessed"], "value": entry["last_accessed"]})
+        return changes
+
+    @staticmethod
+    def _first_location(locations: List[Tuple[str, str]]) -> Tuple[str, str]:
+        """The directories entry of a path registered in both sections."""
+        return min(locations, key=lambda location: REGISTRY_SECTIONS.index(location[0]))
+
+    def _get_index(self) -> _RegistryIndex:
+        document = self._document
+        if document.index is None:
+            document.index = _RegistryIndex(document.data or {})
+        return document.index
+
+    def _record_changes(self, changes: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Queue entry changes, replayed onto a file changed by another process and
+        appended to the journal, or without changes mark the whole document dirty.
+        """
+        document = self._document
+        if changes is not None and not document.dirty:
+            document.changes.extend(changes)
+        elif changes is None or changes:
+            document.dirty = True
+            document.changes = []
+
+    def _mark_changed(self, changes: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """Record a change and schedule (or, without a delay, perform) the flush."""
+        document = self._document
+        self._record_changes(changes)
+        metadata = document.data.get("metadata") if document.data else None
+        if metadata is not None:
+            metadata["last_updated"] = datetime.now().isoformat()
+
+        if document.transaction_depth > 0:
+            # Written when the outermost transaction exits
+            return True
+        return self._schedule_flush()
+
+    def _schedule_flush(self) -> bool:
+        document = self._document
+        delay = Config.REGISTRY_WRITE_BEHIND_SECONDS
+        if delay <= 0:
+            return self.flush()
+
+        if document.timer is None:
+            document.timer = threading.Timer(delay, self._flush_behind)
+            document.timer.daemon = True
+            document.timer.start()
+        return True
+
+    def _flush_behind(self) -> None:
+        try:
+            self.flush()
+        except IOError as e:
+            print(f"Error flushing registry: {e}")
+
+    def _file_version(self) -> Optional[Tuple[Optional[Tuple[int, int, int]], int]]:
+        """
+        Identity of the file (inode, mtime, size; an atomic replace makes a new
+        inode) and size of its journal, or None if neither exists.
+        """
+        try:
+            stat = os.stat(self.file_path)
+            file_identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            file_identity = None
+        journal_size = self._journal_size() if self.journaled else 0
+        if file_identity is None and not journal_size:
+            return None
+        return file_identity, journal_size
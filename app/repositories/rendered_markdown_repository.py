@@ -0,0 +1,130 @@
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+
+class RenderedMarkdownRepository:
+    """
+    Rendered markdown HTML stored as one file per cache key under
+    app/data/markdown_cache, shared by every worker process.
+
+    Files are written atomically. A hit refreshes the file's mtime, so when
+    the directory grows past max_bytes the least recently used files are
+    removed until it is back under 80% of the budget.
+    """
+
+    DEFAULT_DIRECTORY = Path(__file__).parent.parent / "data" / "markdown_cache"
+    SUFFIX = ".html"
+
+    def __init__(self, directory: Path = None, max_bytes: int = 0):
+        """
+        Args:
+            directory (Path): Cache directory
+            max_bytes (int): Size budget of the directory (0 disables the limit)
+        """
+        self.directory = str(directory or self.DEFAULT_DIRECTORY)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Estimated size of the directory, measured on the first write
+        self._total_bytes: Optional[int] = None
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Stored HTML for a key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                html = f.read()
+        except OSError:
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return html
+
+    def put(self, key: str, html: str) -> None:
+        """Store HTML for a key, evicting old files when over budget."""
+        data = html.encode("utf-8")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, self._path(key))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            print(f"Error writing rendered markdown cache: {e}")
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._measure()
+            else:
+                self._total_bytes += len(data)
+            if self.max_bytes and self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def clear(self) -> None:
+        """Remove every stored file."""
+        with self._lock:
+            for entry in self._entries():
+                try:
+                    os.unlink(entry.path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+    def size(self) -> int:
+        """Current size of the stored files in bytes."""
+        with self._lock:
+            self._total_bytes = self._measure()
+            return self._total_bytes
+
+    def _evict(self) -> None:
+        """Remove least recently used files down to 80% of the budget. Called with the lock held."""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat_result = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat_result.st_mtime_ns, stat_result.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.8
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._total_bytes = total
+
+    def _measure(self) -> int:
+        total = 0
+        for entry in self._entries():
+            try:
+                total += entry.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _entries(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                return [entry for entry in entries if entry.name.endswith(self.SUFFIX)]
+        except OSError:
+            return []
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
@@ -0,0 +1,244 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set
+from config import Config
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lesson_progress (
+    course_path TEXT NOT NULL,
+    lesson_path TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    last_position_seconds REAL NOT NULL DEFAULT 0,
+    last_accessed_at TEXT,
+    PRIMARY KEY (course_path, lesson_path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS lesson_progress_last_accessed ON lesson_progress (last_accessed_at);
+CREATE INDEX IF NOT EXISTS lesson_progress_completed ON lesson_progress (completed, course_path);
+CREATE TABLE IF NOT EXISTS course_progress (
+    course_path TEXT PRIMARY KEY,
+    last_updated_at TEXT
+);
+"""
+
+_LESSON_COLUMNS = ("completed", "last_position_seconds", "last_accessed_at")
+
+
+class SqliteProgressRepository:
+    """
+    Progress of every course in one SQLite database in WAL mode, selected
+    with Config.PROGRESS_BACKEND = "sqlite".
+
+    Each lesson is a row keyed by (course path, lesson path), with indexes on
+    the last access time and the completion flag, so cross-course questions
+    (recently watched lessons, completed lessons) are index queries instead of
+    one file per course, and nothing is written into the course directories.
+
+    load() and append_changes() match ProgressRepository: a lesson merge
+    becomes a single-row upsert of the given columns, and all changes of one
+    call share a transaction. Each thread uses its own connection.
+    """
+
+    _local = threading.local()
+
+    def __init__(self, course_directory: Optional[str], database_path: str = None):
+        """
+        Args:
+            course_directory: Course the per-course methods work on (None for cross-course queries only)
+            database_path: SQLite database, defaults to Config.PROGRESS_SQLITE_PATH
+        """
+        if database_path is None:
+            database_path = Config.PROGRESS_SQLITE_PATH
+        self.file_path = os.path.abspath(database_path)
+        self.course_directory = course_directory
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Progress of the course in the shape of a progress file, or None if it has none."""
+        connection = self._connection()
+        course_row = connection.execute(
+            "SELECT last_updated_at FROM course_progress WHERE course_path = ?", (self.course_directory,)
+        ).fetchone()
+        rows = connection.execute(
+            "SELECT lesson_path, completed, last_position_seconds, last_accessed_at "
+            "FROM lesson_progress WHERE course_path = ?",
+            (self.course_directory,)
+        ).fetchall()
+        if course_row is None and not rows:
+            return None
+
+        return {
+            "lessons": {
+                lesson_path: {
+                    "completed": bool(completed),
+                    "last_position_seconds": last_position_seconds,
+                    "last_accessed_at": last_accessed_at
+                }
+                for lesson_path, completed, last_position_seconds, last_accessed_at in rows
+            },
+            "last_updated_at": course_row[0] if course_row else None
+        }
+
+    def has_progress(self) -> bool:
+        """Check if any progress was recorded for the course."""
+        row = self._connection().execute(
+            "SELECT 1 FROM course_progress WHERE course_path = ?", (self.course_directory,)
+        ).fetchone()
+        return row is not None
+
+    def get_completed_lessons(self) -> Set[str]:
+        """Relative paths of the completed lessons of the course."""
+        rows = self._connection().execute(
+            "SELECT lesson_path FROM lesson_progress WHERE completed = 1 AND course_path = ?",
+            (self.course_directory,)
+        )
+        return {row[0] for row in rows}
+
+    def append_changes(self, changes: List[Dict[str, Any]]) -> bool:
+        """
+        Apply the changes ProgressService makes, in one transaction.
+
+        Args:
+            changes: {"merge": ["lessons", lesson_path], "value": columns, "defaults": columns,
+                "latest": columns} or {"set": ["last_updated_at"], "value": iso_time}
+
+        Raises:
+            ValueError: For a change that is not one of these
+        """
+        try:
+            with self._write() as connection:
+                for change in changes:
+                    self._apply_change(connection, change)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error writing progress of {self.course_directory}: {e}")
+            return False
+
+    def get_recent_lessons(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most recently accessed lessons across all courses, newest first."""
+        rows = self._connection().execute(
+            "SELECT course_path, lesson_path, completed, last_position_seconds, last_accessed_at "
+            "FROM lesson_progress WHERE last_accessed_at IS NOT NULL ORDER BY last_accessed_at DESC LIMIT ?",
+            (limit,)
+        )
+        return [
+            {
+                "course_path": course_path,
+                "lesson_path": lesson_path,
+                "completed": bool(completed),
+                "last_position_seconds": last_position_seconds,
+                "last_accessed_at": last_accessed_at
+            }
+            for course_path, lesson_path, completed, last_position_seconds, last_accessed_at in rows
+        ]
+
+    def replace_progress(self, data: Dict[str, Any]) -> int:
+        """
+        Replace the stored progress of the course with a progress file's data, used by the importer.
+
+        Returns:
+            int: Number of lessons stored
+        """
+        lessons = {path: lesson for path, lesson in data.get("lessons", {}).items() if isinstance(lesson, dict)}
+        with self._write() as connection:
+            connection.execute("DELETE FROM lesson_progress WHERE course_path = ?", (self.course_directory,))
+            connection.executemany(
+                "INSERT INTO lesson_progress "
+                "(course_path, lesson_path, completed, last_position_seconds, last_accessed_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (self.course_directory, lesson_path, int(bool(lesson.get("completed", False))),
+                     float(lesson.get("last_position_seconds") or 0.0), lesson.get("last_accessed_at"))
+                    for lesson_path, lesson in lessons.items()
+                ]
+            )
+            self._set_last_updated(connection, data.get("last_updated_at"))
+        return len(lessons)
+
+    @classmethod
+    def reset(cls) -> None:
+        """Close this thread's connections."""
+        connections = getattr(cls._local, "connections", {})
+        cls._local.connections = {}
+        for connection, _ in connections.values():
+            connection.close()
+
+    def _apply_change(self, connection: sqlite3.Connection, change: Dict[str, Any]) -> None:
+        key_path = change.get("merge") or change.get("set")
+        if "set" in change and key_path == ["last_updated_at"]:
+            self._set_last_updated(connection, change["value"])
+            return
+        if "merge" not in change or len(key_path) != 2 or key_path[0] != "lessons":
+            raise ValueError(f"Unsupported progress change: {change}")
+
+        values = dict(change.get("defaults", {}), **change["value"])
+        unknown = set(values) - set(_LESSON_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unsupported lesson fields: {sorted(unknown)}")
+
+        row = {
+            "completed": int(bool(values.get("completed", False))),
+            "last_position_seconds": float(values.get("last_position_seconds") or 0.0),
+            "last_accessed_at": values.get("last_accessed_at")
+        }
+        # Only the merged columns change on an existing row; "latest" ones only move forward
+        latest = set(change.get("latest", ()))
+        updates = ", ".join(
+            f"{column} = CASE WHEN {column} IS NULL OR excluded.{column} > {column} "
+            f"THEN excluded.{column} ELSE {column} END" if column in latest
+            else f"{column} = excluded.{column}"
+            for column in _LESSON_COLUMNS if column in change["value"]
+        )
+        connection.execute(
+            "INSERT INTO lesson_progress "
+            "(course_path, lesson_path, completed, last_position_seconds, last_accessed_at) VALUES (?, ?, ?, ?, ?) "
+            + (f"ON CONFLICT (course_path, lesson_path) DO UPDATE SET {updates}" if updates else "ON CONFLICT DO NOTHING"),
+            (self.course_directory, key_path[1], row["completed"], row["last_position_seconds"], row["last_accessed_at"])
+        )
+        self._set_last_updated(connection, None, keep=True)
+
+    def _set_last_updated(self, connection: sqlite3.Connection, last_updated_at: Optional[str],
+                          keep: bool = False) -> None:
+        """Upsert the course row; with keep, an existing timestamp is left as is."""
+        connection.execute(
+            "INSERT INTO course_progress (course_path, last_updated_at) VALUES (?, ?) "
+            + ("ON CONFLICT DO NOTHING" if keep
+               else "ON CONFLICT (course_path) DO UPDATE SET last_updated_at = excluded.last_updated_at"),
+            (self.course_directory, last_updated_at)
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        state = connections.get(self.file_path)
+        if state is None:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            # Autocommit; transactions are opened explicitly by _write()
+            connection = sqlite3.connect(self.file_path, isolation_level=None, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            # [connection, transaction depth]
+            state = connections[self.file_path] = [connection, 0]
+        return state[0]
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Open (or join) this thread's write transaction and commit it at the outermost exit."""
+        connection = self._connection()
+        state = self._local.connections[self.file_path]
+        if state[1] == 0:
+            connection.execute("BEGIN IMMEDIATE")
+        state[1] += 1
+        try:
+            yield connection
+        except BaseException:
+            state[1] -= 1
+            if state[1] == 0:
+                connection.execute("ROLLBACK")
+            raise
+
+        state[1] -= 1
+        if state[1] == 0:
+            connection.execute("COMMIT")
@@ -0,0 +1,455 @@
+import atexit
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from config import Config
+from app.utils.access_table import AccessTable
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS registry_entries (
+    id INTEGER PRIMARY KEY,
+    section TEXT NOT NULL,
+    key TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    path TEXT NOT NULL,
+    parent_path TEXT NOT NULL,
+    node_type TEXT NOT NULL,
+    registered_at TEXT,
+    last_accessed TEXT,
+    UNIQUE (section, key)
+);
+CREATE INDEX IF NOT EXISTS registry_entries_item_id ON registry_entries (section, item_id);
+CREATE INDEX IF NOT EXISTS registry_entries_path ON registry_entries (path);
+CREATE INDEX IF NOT EXISTS registry_entries_parent_path ON registry_entries (parent_path);
+CREATE INDEX IF NOT EXISTS registry_entries_node_type ON registry_entries (node_type);
+CREATE INDEX IF NOT EXISTS registry_entries_last_accessed ON registry_entries (last_accessed);
+CREATE TABLE IF NOT EXISTS registry_metadata (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_ENTRY_COLUMNS = "title, path, node_type, registered_at, last_accessed"
+
+# Directories sort before courses when a path is registered in both sections
+_SECTION_ORDER = "CASE section WHEN 'directories' THEN 0 ELSE 1 END"
+
+
+class _Database:
+    """Per-process state of one registry database: thread-local connections and the access table."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.local = threading.local()
+        self.accesses = AccessTable(Config.REGISTRY_ACCESS_FLUSH_SECONDS)
+
+
+class SqliteRegistryRepository:
+    """
+    Registry stored in a SQLite database in WAL mode, selected with
+    Config.REGISTRY_BACKEND = "sqlite".
+
+    Each entry is a row with indexed id (directory name), path, parent path,
+    node type and last access columns, so lookups, breadcrumbs, child listings
+    and cleanup are index queries instead of walks over the whole registry.
+    Writes go to the database immediately, each in its own short transaction;
+    WAL keeps readers in other threads and processes unblocked while a write
+    is in progress. Inside transaction() they are queued instead (see there).
+    Each thread uses its own connection.
+
+    The public methods match RegistryRepository, and entries are returned as
+    the same dictionaries. Entries are copies: change them through set_entry.
+    """
+
+    _databases: Dict[str, _Database] = {}
+    _databases_lock = threading.Lock()
+    _atexit_registered = False
+
+    def __init__(self, database_path: str = None):
+        if database_path is None:
+            database_path = Config.REGISTRY_SQLITE_PATH
+        self.file_path = os.path.abspath(database_path)
+        self._database = self._get_database(self.file_path)
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Process-local lock for read-modify-write sequences, as on RegistryRepository."""
+        return self._database.lock
+
+    def exists(self) -> bool:
+        """Check if the database file exists."""
+        return os.path.exists(self.file_path)
+
+    def ensure_exists(self) -> None:
+        """Create the database and its tables unless they exist."""
+        self._connection()
+
+    def get_entry(self, section: str, key: str) -> Optional[Dict[str, Any]]:
+        """Get the entry stored under a registry key."""
+        row = self._reader().execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM registry_entries WHERE section = ? AND key = ?",
+            (section, key)
+        ).fetchone()
+        return self._to_entry(row)
+
+    def set_entry(self, section: str, key: str, entry: Dict[str, Any]) -> None:
+        """Add or replace one entry. A replaced entry keeps its position in registry order."""
+        path = entry["path"]
+        parameters = (section, key, os.path.basename(path), entry["title"], path, os.path.dirname(path),
+                      entry["node_type"], entry.get("registered_at"), entry.get("last_accessed"))
+        self._apply(lambda connection: connection.execute(
+            "INSERT INTO registry_entries "
+            "(section, key, item_id, title, path, parent_path, node_type, registered_at, last_accessed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (section, key) DO UPDATE SET "
+            "item_id = excluded.item_id, title = excluded.title, path = excluded.path, "
+            "parent_path = excluded.parent_path, node_type = excluded.node_type, "
+            "registered_at = excluded.registered_at, last_accessed = excluded.last_accessed",
+            parameters
+        ))
+
+    def remove_entry(self, section: str, key: str) -> Optional[Dict[str, Any]]:
+        """Remove one entry, returning it."""
+        def delete(connection: sqlite3.Connection) -> None:
+            connection.execute("DELETE FROM registry_entries WHERE section = ? AND key = ?", (section, key))
+            self._database.accesses.forget((section, key))
+
+        with self._write_unless_queued():
+            entry = self.get_entry(section, key)
+            if entry is not None:
+                self._apply(delete)
+            return entry
+
+    def get_section(self, section: str) -> Dict[str, Dict[str, Any]]:
+        """All entries of a section, by registry key."""
+        rows = self._reader().execute(
+            f"SELECT key, {_ENTRY_COLUMNS} FROM registry_entries WHERE section = ? ORDER BY id", (section,)
+        )
+        return {row[0]: self._to_entry(row[1:]) for row in rows}
+
+    def get_child_entries(self, parent_path: str) -> List[Dict[str, Any]]:
+        """Entries whose path is a direct child of parent_path."""
+        rows = self._reader().execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM registry_entries WHERE parent_path = ? ORDER BY {_SECTION_ORDER}, id",
+            (parent_path,)
+        )
+        return [self._to_entry(row) for row in rows]
+
+    def get_root_path(self) -> Optional[str]:
+        """Deepest directory containing every registered path, or None if the registry is empty."""
+        connection = self._reader()
+        lowest, highest = connection.execute("SELECT MIN(path), MAX(path) FROM registry_entries").fetchone()
+        if lowest is None:
+            return None
+
+        # Every path sorts between the lowest and the highest, so their common
+        # string prefix is shared by all. A sibling such as "/a/b-c" sorting
+        # between "/a/b" and "/a/b/d" can still fall outside their common
+        # directory; walk up until no path lies outside the candidate.
+        root = os.path.commonpath([lowest, highest])
+        while True:
+            low, high = self._subtree_bounds(root)
+            outside = connection.execute(
+                "SELECT 1 FROM registry_entries WHERE path != ? AND (path < ? OR path >= ?) LIMIT 1",
+                (root, low, high)
+            ).fetchone()
+            parent = os.path.dirname(root)
+            if outside is None or parent == root:
+                return root
+            root = parent
+
+    def get_path_entries(self, path: str) -> Dict[str, Dict[str, Any]]:
+        """Entries registered for path and each of its ancestors, by path, directories first."""
+        ancestors = [path]
+        while os.path.dirname(ancestors[-1]) != ancestors[-1]:
+            ancestors.append(os.path.dirname(ancestors[-1]))
+
+        rows = self._reader().execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM registry_entries WHERE path IN ({', '.join('?' * len(ancestors))}) "
+            f"ORDER BY {_SECTION_ORDER} DESC, id DESC",
+            ancestors
+        )
+        # Later rows win, so the first entry in section order is kept
+        entries = {row[1]: self._to_entry(row) for row in rows}
+        return {ancestor: entries[ancestor] for ancestor in reversed(ancestors) if ancestor in entries}
+
+    def remove_tree(self, path: str) -> int:
+        """Remove the entries of a path and of everything below it, returning how many were removed."""
+        low, high = self._subtree_bounds(path)
+        return self._delete_where("path = ? OR (path >= ? AND path < ?)", (path, low, high))
+
+    def remove_accessed_before(self, cutoff: datetime) -> int:
+        """Remove the entries last accessed at or before cutoff, returning how many were removed."""
+        return self._delete_where("last_accessed <= ?", (cutoff.isoformat(),))
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        def delete(connection: sqlite3.Connection) -> None:
+            connection.execute("DELETE FROM registry_entries")
+            self._database.accesses.clear()
+
+        self._apply(delete)
+
+    def record_access(self, section: str, key: str, when: datetime) -> None:
+        """
+        Record an access to an entry in the access table. Its stored
+        last_accessed is updated only when it is older than
+        Config.REGISTRY_ACCESS_FLUSH_SECONDS; later accesses are applied
+        by apply_pending_accesses() or at exit.
+        """
+        entry = self.get_entry(section, key)
+        if entry is None:
+            return
+
+        try:
+            stored = datetime.fromisoformat(entry["last_accessed"])
+        except (KeyError, TypeError, ValueError):
+            stored = None
+        if self._database.accesses.record((section, key), when, stored):
+            self._set_last_accessed([(section, key, when)])
+
+    def apply_pending_accesses(self) -> int:
+        """Write the newest recorded access times into their entries now, returning how many changed."""
+        pending = [(section, key, when) for (section, key), when in self._database.accesses.pending().items()]
+        if not pending:
+            return 0
+        return self._set_last_accessed(pending)
+
+    def get_access_stats(self, limit: int = 0) -> List[Dict[str, Any]]:
+        """Hit counts and last access times recorded by this process, most accessed first."""
+        stats = []
+        for (section, key), hits, last_access in self._database.accesses.most_accessed(limit):
+            entry = self.get_entry(section, key)
+            if entry is not None:
+                stats.append({
+                    "title": entry["title"],
+                    "path": entry["path"],
+                    "node_type": entry["node_type"],
+                    "hits": hits,
+                    "last_accessed": last_access.isoformat()
+                })
+        return stats
+
+    def find_by_id(self, section: str, item_id: str) -> Optional[Dict[str, Any]]:
+        """Get the first entry of a section whose directory name is item_id."""
+        row = self._reader().execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM registry_entries WHERE section = ? AND item_id = ? ORDER BY id LIMIT 1",
+            (section, item_id)
+        ).fetchone()
+        return self._to_entry(row)
+
+    def find_by_path(self, path: str) -> Optional[Dict[str, Any]]:
+        """Get the entry registered for an absolute path, directories first."""
+        row = self._reader().execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM registry_entries WHERE path = ? ORDER BY {_SECTION_ORDER}, id LIMIT 1",
+            (path,)
+        ).fetchone()
+        return self._to_entry(row)
+
+    def flush(self) -> bool:
+        """Changes are written immediately; only recorded access times can be pending."""
+        self.apply_pending_accesses()
+        return True
+
+    @contextmanager
+    def transaction(self) -> Iterator["SqliteRegistryRepository"]:
+        """
+        Queue the changes made by this thread inside the block and apply them in
+        one short SQLite transaction when the outermost block exits, so the
+        database is not write-locked while the block crawls the filesystem.
+        Queued changes are discarded if the block raises.
+
+        A read by the same thread first applies the changes queued so far (in
+        their own short transaction), so the thread sees its own writes; those
+        are no longer discarded. Other threads see the changes once applied.
+        """
+        self._connection()
+        local = self._database.local
+        if local.transaction_depth == 0:
+            local.queue = []
+        local.transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            local.transaction_depth -= 1
+            if local.transaction_depth == 0:
+                local.queue = None
+            raise
+
+        local.transaction_depth -= 1
+        if local.transaction_depth == 0:
+            self._apply_queue()
+            local.queue = None
+
+    @classmethod
+    def flush_all(cls) -> None:
+        """Write the pending access times of every database, used at interpreter exit."""
+        with cls._databases_lock:
+            paths = list(cls._databases)
+        for path in paths:
+            try:
+                SqliteRegistryRepository(path).apply_pending_accesses()
+            except sqlite3.Error as e:
+                print(f"Error flushing registry: {e}")
+
+    @classmethod
+    def reset(cls) -> None:
+        """Flush and forget every database, closing this thread's connections."""
+        cls.flush_all()
+        with cls._databases_lock:
+            databases, cls._databases = cls._databases, {}
+        for database in databases.values():
+            connection = getattr(database.local, "connection", None)
+            if connection is not None:
+                connection.close()
+
+    @classmethod
+    def _get_database(cls, path: str) -> _Database:
+        with cls._databases_lock:
+            database = cls._databases.get(path)
+            if database is None:
+                database = cls._databases[path] = _Database()
+            if not cls._atexit_registered:
+                atexit.register(cls.flush_all)
+                cls._atexit_registered = True
+            return database
+
+    def _connection(self) -> sqlite3.Connection:
+        local = self._database.local
+        connection = getattr(local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            # Autocommit; transactions are opened explicitly by _write()
+            connection = sqlite3.connect(self.file_path, isolation_level=None, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            local.connection = connection
+            local.depth = 0
+            # Writes queued by an open transaction(), None outside one
+            local.queue = None
+            local.transaction_depth = 0
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's connection, after applying the writes it queued, so reads see them."""
+        connection = self._connection()
+        if self._database.local.queue:
+            self._apply_queue()
+        return connection
+
+    def _apply(self, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run a write now in its own transaction, or queue it inside transaction()."""
+        self._connection()
+        queue = self._database.local.queue
+        if queue is not None:
+            queue.append(operation)
+            return None
+        with self._write() as connection:
+            return operation(connection)
+
+    def _apply_queue(self) -> None:
+        local = self._database.local
+        operations, local.queue = local.queue, []
+        if operations:
+            with self._write() as connection:
+                for operation in operations:
+                    operation(connection)
+
+    @contextmanager
+    def _write_unless_queued(self) -> Iterator[None]:
+        """Make a read and the write depending on it atomic, unless the write is queued anyway."""
+        self._connection()
+        if self._database.local.queue is not None:
+            yield
+        else:
+            with self._write():
+                yield
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Open (or join) this thread's write transaction and commit it at the outermost exit."""
+        connection = self._connection()
+        local = self._database.local
+        if local.depth == 0:
+            connection.execute("BEGIN IMMEDIATE")
+        local.depth += 1
+        try:
+            yield connection
+        except BaseException:
+            local.depth -= 1
+            if local.depth == 0:
+                connection.execute("ROLLBACK")
+            raise
+
+        local.depth -= 1
+        if local.depth == 0:
+            connection.execute(
+                "INSERT INTO registry_metadata (name, value) VALUES ('last_updated', ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+                (datetime.now().isoformat(),)
+            )
+            connection.execute("COMMIT")
+
+    def _delete_where(self, condition: str, parameters: tuple) -> int:
+        def delete(connection: sqlite3.Connection) -> int:
+            removed = connection.execute(
+                f"SELECT section, key FROM registry_entries WHERE {condition}", parameters
+            ).fetchall()
+            connection.execute(f"DELETE FROM registry_entries WHERE {condition}", parameters)
+            for section, key in removed:
+                self._database.accesses.forget((section, key))
+            return len(removed)
+
+        if self._database.local.queue is None:
+            return self._apply(delete)
+
+        # Queued: count the matches now, delete them when the transaction is applied
+        count = self._reader().execute(
+            f"SELECT COUNT(*) FROM registry_entries WHERE {condition}", parameters
+        ).fetchone()[0]
+        self._apply(delete)
+        return count
+
+    def _set_last_accessed(self, accesses: List[tuple]) -> int:
+        """Write access times, returning how many entries changed (or how many were queued)."""
+        def update(connection: sqlite3.Connection) -> int:
+            applied = 0
+            for section, key, when in accesses:
+                cursor = connection.execute(
+                    "UPDATE registry_entries SET last_accessed = ? WHERE section = ? AND key = ?",
+                    (when.isoformat(), section, key)
+                )
+                if cursor.rowcount:
+                    self._database.accesses.mark_persisted((section, key), when)
+                    applied += 1
+                else:
+                    self._database.accesses.forget((section, key))
+            return applied
+
+        applied = self._apply(update)
+        return len(accesses) if applied is None else applied
+
+    @staticmethod
+    def _subtree_bounds(path: str) -> tuple:
+        """[low, high) range of the paths strictly below path."""
+        prefix = path.rstrip(os.sep) + os.sep
+        return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+    @staticmethod
+    def _to_entry(row: Optional[tuple]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        title, path, node_type, registered_at, last_accessed = row
+        return {
+            "title": title,
+            "path": path,
+            "node_type": node_type,
+            "registered_at": registered_at,
+            "last_accessed": last_accessed
+        }
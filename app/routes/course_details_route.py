@@ -2,7 +2,7 @@ from flask import Blueprint, render_template, abort
 from app.services.registry_service import RegistryService
 from app.services.user_preferences_service import UserPreferencesService
 from app.services.course_metadata_service import CourseMetadataService
-from app.services.content_detection_service import ContentDetectionService
+from app.services.course_structure_service import CourseStructureService
 from app.services.directory_service import DirectoryService
 from app.services.progress_service import ProgressService
 from app.models.course_model import NodeType
@@ -31,8 +31,7 @@ def details(course_id):
 
     # Get course metadata and structure
     metadata = CourseMetadataService.get_or_create_metadata(course_path, course_entry["title"])
-    modules = ContentDetectionService.scan_course_modules(course_path)
-    lessons = ContentDetectionService.scan_course_lessons(course_path)
+    modules, lessons = CourseStructureService.get_course_structure(course_path)
 
     # Load progress data and apply to lessons
     progress_service = ProgressService(course_path)
@@ -21,10 +21,12 @@ def view(directory_id):
     if not DirectoryService.validate_directory_exists(directory_path):
         abort(404)
 
-    # Update last accessed
-    registry_service.update_last_accessed(directory_entry["title"], directory_path, NodeType.DIRECTORY)
+    # Registry changes of this request (last accessed, scanned children) are written once
+    with registry_service.transaction():
+        # Update last accessed
+        registry_service.update_last_accessed(directory_entry["title"], directory_path, NodeType.DIRECTORY)
 
-    courses = DirectoryService.scan_directory(directory_path)
+        courses = DirectoryService.scan_directory(directory_path)
 
     breadcrumbs = registry_service.build_breadcrumbs_for_current_page(directory_path, directory_entry["title"])
 
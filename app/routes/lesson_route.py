@@ -38,6 +38,8 @@ def view(course_id, lesson_path):
                          breadcrumbs=lesson_view_data['breadcrumbs'],
                          next_lesson=lesson_view_data['next_lesson'],
                          previous_lesson=lesson_view_data['previous_lesson'],
+                         next_in_other_module=lesson_view_data['next_in_other_module'],
+                         previous_in_other_module=lesson_view_data['previous_in_other_module'],
                          back_to_course_url=lesson_view_data['back_to_course_url'],
                          module_lessons=lesson_view_data['module_lessons'],
                          user_theme=user_theme,
@@ -1,10 +1,14 @@
 import os
 import re
-from typing import List, Set
+from typing import Dict, List, Optional, Tuple
+from config import Config
 from app.models.course_model import NodeType
 from app.models.lesson_data_model import LessonData
 from app.models.module_data_model import ModuleData
 from app.models.lesson_type import LessonType, get_lesson_type_from_extension, ALL_LESSON_EXTENSIONS
+from app.services.media_duration_service import MediaDurationService
+from app.utils.directory_scanner import DirectoryScanner, DirectoryListing, DirectoryTree
+from app.utils.lru_cache import LruCache
 from app.utils.text_formatter import TextFormatter
 
 
@@ -34,11 +38,17 @@ class ContentDetectionService:
     """Service to detect the type of content in directories (Course, Module, Directory)."""
 
     IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp'}
+
+    # directory path -> (NodeType, mtimes of the directories the verdict was decided from)
+    _verdicts = LruCache(max_entries=Config.CONTENT_VERDICT_CACHE_MAX_ENTRIES)
     
     @staticmethod
     def detect_content_type(directory_path: str) -> NodeType:
         """
         Detect if a directory is a Course, Module, or Directory based on its structure.
+
+        Verdicts are cached and reused until one of the directories they were
+        decided from changes.
         
         Args:
             directory_path (str): Path to the directory to analyze
@@ -46,66 +56,92 @@ class ContentDetectionService:
         Returns:
             NodeType: The detected type of content
         """
-        if not os.path.exists(directory_path) or not os.path.isdir(directory_path):
-            return NodeType.DIRECTORY
-            
+        cached = ContentDetectionService._verdicts.get(directory_path)
+        if cached is not None and DirectoryScanner.mtimes_unchanged(cached[1]):
+            return cached[0]
+
         try:
-            items = os.listdir(directory_path)
-            
-            # Get directories and files separately
-            directories = []
-            files = []
-            
-            for item in items:
-                # ignore hidden files and directories
-                if item.startswith('.'):
-                    continue
-                    
-                item_path = os.path.join(directory_path, item)
-                if os.path.isdir(item_path):
-                    directories.append(item_path)
-                else:
-                    files.append(item)
-            
-            # Check if it's a Module (only files, no directories)
-            if not directories and files:
-                # Check if files are lesson-type files
-                if ContentDetectionService._has_lesson_files(files):
-                    return NodeType.MODULE
-                # TODO: if no supported files, return NodeType.UNKNOWN
-                    
-            # Check if it's a Course
-            if ContentDetectionService._is_course_structure(directory_path, directories, files):
-                return NodeType.COURSE
-                
-            # Default to Directory if it contains other directories
+            node_type, mtimes = ContentDetectionService._classify_directory(directory_path)
+        except OSError:
+            # Missing, not a directory, or no permission
+            ContentDetectionService._verdicts.pop(directory_path)
             return NodeType.DIRECTORY
-            
-        except PermissionError:
-            # LOG ERROR MESSAGE
-            return NodeType.DIRECTORY
-    
+
+        ContentDetectionService._verdicts.put(directory_path, (node_type, mtimes))
+        return node_type
+
     @staticmethod
-    def _is_lesson_file(file_path: str) -> bool:
+    def clear_verdicts() -> None:
+        """Forget every cached content type verdict."""
+        ContentDetectionService._verdicts.clear()
+
+    @staticmethod
+    def _classify_directory(directory_path: str) -> Tuple[NodeType, Dict[str, int]]:
         """
-        Check if a file is a lesson file.
-        A lesson file must be:
-        1. A file (not directory)
-        2. Not hidden (doesn't start with '.')
-        3. Have a supported lesson format extension
+        Classify a directory, reading only as much of it as the decision needs.
+
+        The same rules as _classify_tree apply, but the first subdirectory that
+        is not a valid module decides "directory" without reading the others,
+        and a module listing stops at its first nested folder.
+
+        Returns:
+            Tuple[NodeType, Dict[str, int]]: The verdict, and the mtimes of the
+            directories it depends on
+
+        Raises:
+            OSError: If directory_path cannot be read
         """
-        # Check if it's a file
-        if not os.path.isfile(file_path):
-            return False
+        root = DirectoryScanner.list_directory(directory_path, with_mtime=True, keep_entries=True)
+        mtimes = {root.path: root.mtime_ns}
 
-        # Get filename
-        filename = os.path.basename(file_path)
+        if not root.directories:
+            if ContentDetectionService._has_lesson_files(root.files):
+                return NodeType.MODULE, mtimes
+            return NodeType.DIRECTORY, mtimes
 
-        # Check if it's hidden
-        if filename.startswith('.'):
-            return False
+        module_mtimes = {}
+        for name in root.directories:
+            module_path = os.path.join(root.path, name)
+            try:
+                # From the root listing's DirEntry, and like with_mtime taken before listing
+                mtime_ns = root.directory_mtime(name)
+                listing = DirectoryScanner.list_directory(module_path, stop_at_directory=True)
+            except OSError:
+                # Skip directories we can't access
+                continue
+
+            if listing.directories or not ContentDetectionService._has_lesson_files(listing.files):
+                # Only this subdirectory can undo the verdict
+                mtimes[module_path] = mtime_ns
+                return NodeType.DIRECTORY, mtimes
+            module_mtimes[module_path] = mtime_ns
+
+        mtimes.update(module_mtimes)
+        return NodeType.COURSE, mtimes
+
+    @staticmethod
+    def _classify_tree(tree: DirectoryTree) -> NodeType:
+        """Classify an already scanned directory tree."""
+        directories = tree.root.directories
+        files = tree.root.files
+
+        # Check if it's a Module (only files, no directories)
+        if not directories and files:
+            # Check if files are lesson-type files
+            if ContentDetectionService._has_lesson_files(files):
+                return NodeType.MODULE
+            # TODO: if no supported files, return NodeType.UNKNOWN
 
-        # Check if it has a supported extension
+        # Check if it's a Course
+        if ContentDetectionService._is_course_structure(tree):
+            return NodeType.COURSE
+
+        # Default to Directory if it contains other directories
+        return NodeType.DIRECTORY
+
+    @staticmethod
+    def _is_lesson_filename(filename: str) -> bool:
+        """Check if a (non-hidden) filename has a supported lesson extension."""
         _, ext = os.path.splitext(filename.lower())
         return ext in ALL_LESSON_EXTENSIONS
 
@@ -113,13 +149,12 @@ class ContentDetectionService:
     def _has_lesson_files(files: List[str]) -> bool:
         """Check if the files list contains lesson-type files."""
         for file in files:
-            _, ext = os.path.splitext(file.lower())
-            if ext in ALL_LESSON_EXTENSIONS:
+            if ContentDetectionService._is_lesson_filename(file):
                 return True
         return False
     
     @staticmethod
-    def _is_course_structure(directory_path: str, directories: List[str], files: List[str]) -> bool:
+    def _is_course_structure(tree: DirectoryTree) -> bool:
         """
         Check if the directory structure matches a course pattern.
         Course: A folder that has grand children files only (no folders).
@@ -127,43 +162,24 @@ class ContentDetectionService:
         A module cannot contain folders, only files.
         """
         # A course must have at least one subdirectory (module)
-        if not directories:
+        if not tree.root.directories:
             return False
 
         # Check that ALL subdirectories are modules (contain only files, no subdirectories)
-        for subdir_path in directories:
-            try:
-                subdir_items = os.listdir(subdir_path)
-                has_subdirectories = False
-                has_lesson_files = False
-
-                for item in subdir_items:
-                    if item.startswith('.'):
-                        continue
-
-                    item_path = os.path.join(subdir_path, item)
-                    if os.path.isdir(item_path):
-                        # If any subdirectory contains folders, this is NOT a course
-                        has_subdirectories = True
-                        break
-                    else:
-                        # Check if it's a lesson file
-                        _, ext = os.path.splitext(item.lower())
-                        if ext in ALL_LESSON_EXTENSIONS:
-                            has_lesson_files = True
-
-                # If subdirectory contains other directories, this is NOT a course
-                if has_subdirectories:
-                    return False
-
-                # If subdirectory has no lesson files, it's not a valid module
-                if not has_lesson_files:
-                    return False
-
-            except PermissionError:
+        for name in tree.root.directories:
+            listing = tree.children.get(name)
+            if listing is None:
                 # Skip directories we can't access
                 continue
 
+            # If subdirectory contains other directories, this is NOT a course
+            if listing.directories:
+                return False
+
+            # If subdirectory has no lesson files, it's not a valid module
+            if not ContentDetectionService._has_lesson_files(listing.files):
+                return False
+
         # It's a course if all subdirectories are valid modules (contain only files)
         return True
     
@@ -205,76 +221,133 @@ class ContentDetectionService:
         return ""
     
     @staticmethod
-    def calculate_progress(directory_path: str) -> float:
+    def calculate_progress(directory_path: str, node_type: Optional[NodeType] = None) -> Optional[float]:
         """
         Calculate progress for a course/module based on completion tracking.
 
+        A course without recorded progress is at 0% without looking at its lessons.
+        A directory reports the rolled-up progress of the courses below it, or
+        None while that is still being computed in the background.
+
         Args:
             directory_path (str): Path to calculate progress for
+            node_type (NodeType): Type of the directory, if known
 
         Returns:
-            float: Progress percentage (0.0 to 100.0)
+            Optional[float]: Progress percentage (0.0 to 100.0), None while pending
         """
+        from app.services.progress_rollup_service import ProgressRollupService
         from app.services.progress_service import ProgressService
 
+        if node_type == NodeType.DIRECTORY:
+            try:
+                return ProgressRollupService.get_progress_percent(directory_path)
+            except Exception:
+                return 0.0
+
         try:
             progress_service = ProgressService(directory_path)
+            if not progress_service.repository.has_progress():
+                return 0.0
             stats = progress_service.get_course_completion_stats()
             return stats.get("completion_percentage", 0.0)
         except Exception:
             return 0.0
 
     @staticmethod
-    def scan_course_modules(course_directory: str) -> List[ModuleData]:
+    def scan_course(course_directory: str) -> Tuple[List[ModuleData], List[LessonData]]:
         """
-        Scan course directory and construct modules from subdirectories.
+        Scan a course directory once and construct both its modules and its root lessons.
 
         Args:
             course_directory (str): Path to the course directory
 
         Returns:
-            List[ModuleData]: List of modules found in the course directory
+            Tuple[List[ModuleData], List[LessonData]]: Modules and root-level lessons
         """
-        modules = []
+        try:
+            tree = DirectoryScanner.scan_tree(course_directory, keep_entries=True)
+        except OSError:
+            return [], []
+
+        return ContentDetectionService.build_course_structure(tree)
+
+    @staticmethod
+    def build_course_structure(tree: DirectoryTree) -> Tuple[List[ModuleData], List[LessonData]]:
+        """
+        Construct modules and root lessons from an already scanned course tree.
+
+        Args:
+            tree (DirectoryTree): Two-level scan of the course directory
 
+        Returns:
+            Tuple[List[ModuleData], List[LessonData]]: Modules and root-level lessons
+        """
+        modules = ContentDetectionService._build_modules(tree)
+        lessons = ContentDetectionService._build_course_lessons(tree.root)
+        return modules, lessons
+
+    @staticmethod
+    def list_lesson_paths(tree: DirectoryTree) -> List[str]:
+        """
+        Relative paths of the lessons build_course_structure would construct
+        from a scanned course tree, without constructing them.
+
+        Args:
+            tree (DirectoryTree): Two-level scan of the course directory
+
+        Returns:
+            List[str]: Lesson paths relative to the course directory
+        """
+        paths = []
+        for module_name, listing in tree.children.items():
+            if listing is not None:
+                paths.extend(os.path.join(module_name, lesson_file) for lesson_file in listing.files)
+        paths.extend(item for item in tree.root.files if ContentDetectionService._is_lesson_filename(item))
+        return paths
+
+    @staticmethod
+    def analyze_directory(directory_path: str) -> Tuple[NodeType, List[ModuleData], List[LessonData]]:
+        """
+        Classify a directory and, when it is a course, build its modules and root
+        lessons from the same scan.
+
+        Args:
+            directory_path (str): Path to the directory to analyze
+
+        Returns:
+            Tuple[NodeType, List[ModuleData], List[LessonData]]: The detected type, plus
+            modules and root-level lessons (empty unless the directory is a course)
+        """
         try:
-            # Get all subdirectories (potential modules)
-            items = os.listdir(course_directory)
-            module_dirs = []
+            tree = DirectoryScanner.scan_tree(directory_path, keep_entries=True)
+        except OSError:
+            return NodeType.DIRECTORY, [], []
 
-            for item in items:
-                item_path = os.path.join(course_directory, item)
-                if os.path.isdir(item_path) and not item.startswith('.'):
-                    module_dirs.append((item, item_path))
-
-            # Sort module directories using natural sort
-            module_dirs.sort(key=lambda x: natural_sort_key(x[0]))
-
-            for module_number, (module_name, module_path) in enumerate(module_dirs, 1):
-                lessons = ContentDetectionService.scan_module_lessons(module_path)
-
-                # Calculate total duration for the module
-                module_duration = sum(lesson.duration_seconds for lesson in lessons)
-
-                #TODO: Extract this method for reusability
-                # Clean up module title
-                module_title = module_name
-                module_title = TextFormatter.remove_numbering_prefix(module_title)
-
-                module = ModuleData(
-                    title=module_title,
-                    module_number=module_number,
-                    lessons=lessons,
-                    total_duration_seconds=module_duration,
-                    completed=False,  # TODO: Calculate based on lesson completion
-                    directory_name=module_name
-                )
-                modules.append(module)
+        node_type = ContentDetectionService._classify_tree(tree)
+        if node_type != NodeType.COURSE:
+            return node_type, [], []
 
-        except PermissionError:
-            pass
+        modules, lessons = ContentDetectionService.build_course_structure(tree)
+        return node_type, modules, lessons
 
-        return modules
+    @staticmethod
+    def scan_course_modules(course_directory: str) -> List[ModuleData]:
+        """
+        Scan course directory and construct modules from subdirectories.
+
+        Args:
+            course_directory (str): Path to the course directory
+
+        Returns:
+            List[ModuleData]: List of modules found in the course directory
+        """
+        try:
+            tree = DirectoryScanner.scan_tree(course_directory, keep_entries=True)
+        except OSError:
+            return []
+
+        return ContentDetectionService._build_modules(tree)
 
     @staticmethod
     def scan_module_lessons(module_directory: str) -> List[LessonData]:
@@ -287,40 +360,12 @@ class ContentDetectionService:
         Returns:
             List[LessonData]: List of lessons found in the module directory
         """
-        lessons = []
-
         try:
-            lesson_files = os.listdir(module_directory)
-            lesson_files.sort(key=natural_sort_key)
-
-            for lesson_file in lesson_files:
-                if lesson_file.startswith('.'):
-                    continue
-
-                lesson_path = os.path.join(module_directory, lesson_file)
-                if os.path.isfile(lesson_path):
-                    # Determine lesson type based on file extension
-                    ext = os.path.splitext(lesson_file)[1]
-                    lesson_type = get_lesson_type_from_extension(ext)
-
-                    # Extract lesson title (remove extension and numbering)
-                    lesson_title = os.path.splitext(lesson_file)[0]
-                    # Clean up common prefixes like "1. ", "01 - ", etc.
-                    lesson_title = TextFormatter.remove_numbering_prefix(lesson_title)
-
-                    lesson = LessonData(
-                        title=lesson_title,
-                        lesson_type=lesson_type,
-                        duration_seconds=0,  # TODO: Extract actual duration for media files
-                        completed=False,  # TODO: Track completion status
-                        file_path=lesson_path
-                    )
-                    lessons.append(lesson)
+            listing = DirectoryScanner.list_directory(module_directory, keep_entries=True)
+        except OSError:
+            return []
 
-        except PermissionError:
-            pass
-
-        return lessons
+        return ContentDetectionService._build_module_lessons(listing)
 
     @staticmethod
     def scan_course_lessons(course_directory: str) -> List[LessonData]:
@@ -333,43 +378,90 @@ class ContentDetectionService:
         Returns:
             List[LessonData]: List of lessons found in the course root
         """
-        lessons = []
-
         try:
-            items = os.listdir(course_directory)
-            lesson_files = []
+            listing = DirectoryScanner.list_directory(course_directory, keep_entries=True)
+        except OSError:
+            return []
 
-            for item in items:
-                item_path = os.path.join(course_directory, item)
+        return ContentDetectionService._build_course_lessons(listing)
 
-                if ContentDetectionService._is_lesson_file(item_path):
-                    lesson_files.append(item)
+    @staticmethod
+    def _build_modules(tree: DirectoryTree) -> List[ModuleData]:
+        """Construct modules from the subdirectory listings of a scanned course."""
+        modules = []
 
-            # Sort lesson files using natural sort
-            lesson_files.sort(key=natural_sort_key)
+        # Sort module directories using natural sort
+        module_names = sorted(tree.root.directories, key=natural_sort_key)
 
-            for lesson_file in lesson_files:
-                lesson_path = os.path.join(course_directory, lesson_file)
+        for module_number, module_name in enumerate(module_names, 1):
+            listing = tree.children.get(module_name)
+            lessons = ContentDetectionService._build_module_lessons(listing) if listing else []
 
-                # Determine lesson type based on file extension
-                ext = os.path.splitext(lesson_file)[1]
-                lesson_type = get_lesson_type_from_extension(ext)
+            # Calculate total duration for the module
+            module_duration = sum(lesson.duration_seconds for lesson in lessons)
 
-                # Extract lesson title (remove extension and numbering)
-                lesson_title = os.path.splitext(lesson_file)[0]
-                # Clean up common prefixes like "1. ", "01 - ", etc.
-                lesson_title = TextFormatter.remove_numbering_prefix(lesson_title)
+            #TODO: Extract this method for reusability
+            # Clean up module title
+            module_title = module_name
+            module_title = TextFormatter.remove_numbering_prefix(module_title)
 
-                lesson = LessonData(
-                    title=lesson_title,
-                    lesson_type=lesson_type,
-                    duration_seconds=0,  # TODO: Extract actual duration for media files
-                    completed=False,  # TODO: Track completion status
-                    file_path=lesson_path
-                )
-                lessons.append(lesson)
+            module = ModuleData(
+                title=module_title,
+                module_number=module_number,
+                lessons=lessons,
+                total_duration_seconds=module_duration,
+                duration_pending=any(lesson.duration_pending for lesson in lessons),
+                completed=False,  # TODO: Calculate based on lesson completion
+                directory_name=module_name
+            )
+            modules.append(module)
 
-        except PermissionError:
-            pass
+        return modules
 
-        return lessons
+    @staticmethod
+    def _build_module_lessons(listing: DirectoryListing) -> List[LessonData]:
+        """Construct lessons from every file of a module listing."""
+        lesson_files = sorted(listing.files, key=natural_sort_key)
+        return [ContentDetectionService._build_lesson(listing, lesson_file) for lesson_file in lesson_files]
+
+    @staticmethod
+    def _build_course_lessons(listing: DirectoryListing) -> List[LessonData]:
+        """Construct lessons from the lesson-type files of a course root listing."""
+        lesson_files = [item for item in listing.files if ContentDetectionService._is_lesson_filename(item)]
+
+        # Sort lesson files using natural sort
+        lesson_files.sort(key=natural_sort_key)
+
+        return [ContentDetectionService._build_lesson(listing, lesson_file) for lesson_file in lesson_files]
+
+    @staticmethod
+    def _build_lesson(listing: DirectoryListing, lesson_file: str) -> LessonData:
+        """Construct a single lesson from its file name in a directory listing."""
+        lesson_path = os.path.join(listing.path, lesson_file)
+
+        # Determine lesson type based on file extension
+        ext = os.path.splitext(lesson_file)[1]
+        lesson_type = get_lesson_type_from_extension(ext)
+
+        # Extract lesson title (remove extension and numbering)
+        lesson_title = os.path.splitext(lesson_file)[0]
+        # Clean up common prefixes like "1. ", "01 - ", etc.
+        lesson_title = TextFormatter.remove_numbering_prefix(lesson_title)
+
+        # Media durations come from the persistent probe cache, or are pending a background probe
+        duration_seconds = 0
+        duration_pending = False
+        if lesson_type in (LessonType.VIDEO, LessonType.AUDIO):
+            # Keyed by the stat of the listing's DirEntry when it kept one
+            duration = MediaDurationService.lookup_duration(lesson_path, listing.file_stat(lesson_file))
+            duration_pending = duration is None
+            duration_seconds = duration or 0
+
+        return LessonData(
+            title=lesson_title,
+            lesson_type=lesson_type,
+            duration_seconds=duration_seconds,
+            duration_pending=duration_pending,
+            completed=False,  # TODO: Track completion status
+            file_path=lesson_path
+        )
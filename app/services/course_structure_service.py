@@ -0,0 +1,259 @@
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from config import Config
+from app.models.compact_course_structure import CompactCourseStructure
+from app.models.course_playlist_model import CoursePlaylist
+from app.models.lesson_set_model import LessonSet
+from app.models.lesson_data_model import LessonData
+from app.models.module_data_model import ModuleData
+from app.services.content_detection_service import ContentDetectionService
+from app.services.progress_rollup_service import ProgressRollupService
+from app.utils.directory_scanner import DirectoryScanner, DirectoryTree
+from app.utils.lru_cache import LruCache
+
+
+@dataclass
+class CachedCourseStructure:
+    """Scanned structure of a course in compact form, with the directory mtimes and listings it was built from."""
+    structure: CompactCourseStructure
+    directory_mtimes: Dict[str, int]
+    playlist: Optional[CoursePlaylist] = None
+    directory_signatures: Optional[Dict[str, int]] = None
+
+
+def _estimate_size(entry: CachedCourseStructure) -> int:
+    """Rough memory estimate of a cached course, used for the cache byte budget."""
+    return entry.structure.sizeof()
+
+
+class CourseStructureService:
+    """
+    Process-wide cache of scanned course structures.
+
+    A cached course is served as long as the mtimes of the course directory and
+    of its module directories are unchanged. Adding, removing or renaming a
+    lesson or module changes one of those mtimes, so revalidation costs one
+    stat per directory instead of a re-walk. A changed mtime with the same
+    visible entries (a hidden progress or lock file was written) costs one
+    listing of that directory.
+
+    A lighter index of the lesson paths of each course is kept beside it with
+    the same revalidation, for completion counts on course cards, which would
+    otherwise keep thousands of full structures alive.
+    """
+
+    # Disabled while the filesystem watcher keeps the cache current
+    _revalidate = True
+
+    _cache = LruCache(
+        max_entries=Config.COURSE_STRUCTURE_CACHE_MAX_ENTRIES,
+        max_bytes=Config.COURSE_STRUCTURE_CACHE_MAX_BYTES,
+        sizeof=_estimate_size
+    )
+
+    _lesson_sets = LruCache(max_entries=Config.LESSON_SET_CACHE_MAX_ENTRIES)
+
+    @staticmethod
+    def get_course_structure(course_path: str) -> Tuple[List[ModuleData], List[LessonData]]:
+        """
+        Get the modules and root lessons of a course, scanning only when the cached copy is stale.
+
+        The returned objects are materialized from the compact cached form on
+        every call, so callers may set completion flags on them.
+
+        Args:
+            course_path (str): Absolute path to the course directory
+
+        Returns:
+            Tuple[List[ModuleData], List[LessonData]]: Modules and root-level lessons
+        """
+        entry = CourseStructureService._get_current_entry(course_path)
+        return entry.structure.materialize_modules(), entry.structure.materialize_lessons()
+
+    @staticmethod
+    def get_course_playlist(course_path: str) -> CoursePlaylist:
+        """
+        Get the playback-ordered lesson index of a course. It is built once per
+        cached structure and dropped together with it when the course changes.
+
+        Args:
+            course_path (str): Absolute path to the course directory
+
+        Returns:
+            CoursePlaylist: Relative lesson paths with their positions and modules
+        """
+        entry = CourseStructureService._get_current_entry(course_path)
+        if entry.playlist is None:
+            entry.playlist = CourseStructureService._build_playlist(entry)
+        return entry.playlist
+
+    @staticmethod
+    def get_module(course_path: str, directory_name: str) -> Optional[ModuleData]:
+        """
+        Get a copy of a single module of a course by its directory name.
+
+        Args:
+            course_path (str): Absolute path to the course directory
+            directory_name (str): Module directory name
+
+        Returns:
+            Optional[ModuleData]: The module, or None if the course has no such module
+        """
+        entry = CourseStructureService._get_current_entry(course_path)
+        if entry.playlist is None:
+            entry.playlist = CourseStructureService._build_playlist(entry)
+
+        index = entry.playlist.module_indexes.get(directory_name)
+        if index is None:
+            return None
+        return entry.structure.module_at(index)
+
+    @staticmethod
+    def get_lesson_set(course_path: str) -> LessonSet:
+        """
+        Get the relative lesson paths of a course, listing the course only when
+        the indexed copy is stale and no current structure is cached.
+
+        Args:
+            course_path (str): Absolute path to the course directory
+
+        Returns:
+            LessonSet: Lesson paths and count of the course
+        """
+        lesson_set = CourseStructureService._lesson_sets.get(course_path)
+        if lesson_set is not None and (
+            not CourseStructureService._revalidate
+            or DirectoryScanner.mtimes_unchanged(lesson_set.directory_mtimes, lesson_set.directory_signatures)
+        ):
+            return lesson_set
+
+        entry = CourseStructureService._cache.peek(course_path)
+        if entry is not None and (
+            not CourseStructureService._revalidate
+            or DirectoryScanner.mtimes_unchanged(entry.directory_mtimes, entry.directory_signatures)
+        ):
+            if entry.playlist is None:
+                entry.playlist = CourseStructureService._build_playlist(entry)
+            lesson_set = LessonSet(
+                lesson_paths=frozenset(entry.playlist.lesson_paths),
+                directory_mtimes=entry.directory_mtimes,
+                directory_signatures=entry.directory_signatures
+            )
+        else:
+            try:
+                tree = DirectoryScanner.scan_tree(course_path, with_mtime=True)
+            except OSError:
+                CourseStructureService._lesson_sets.pop(course_path)
+                ProgressRollupService.remove_tree(course_path)
+                return LessonSet(lesson_paths=frozenset(), directory_mtimes={})
+            lesson_set = CourseStructureService._lesson_set_from_tree(tree)
+
+        CourseStructureService._store_lesson_set(course_path, lesson_set)
+        return lesson_set
+
+    @staticmethod
+    def invalidate(course_path: str) -> None:
+        """Drop the cached structure and lesson set of a course."""
+        CourseStructureService._cache.pop(course_path)
+        CourseStructureService._drop_lesson_set(course_path)
+
+    @staticmethod
+    def invalidate_path(path: str, keep_lesson_sets: bool = False) -> None:
+        """
+        Drop the cached structure of the course at path and of the course containing it.
+
+        Args:
+            path (str): Changed directory
+            keep_lesson_sets (bool): Keep the lesson sets, for changes that do not
+                add or remove lessons (a probed media duration)
+        """
+        for course_path in (path, os.path.dirname(path)):
+            CourseStructureService._cache.pop(course_path)
+            if not keep_lesson_sets:
+                CourseStructureService._drop_lesson_set(course_path)
+
+    @staticmethod
+    def set_revalidation(enabled: bool) -> None:
+        """
+        Turn the per-request mtime check on or off. It is turned off while an
+        external invalidation source (the filesystem watcher) is running.
+        """
+        CourseStructureService._revalidate = enabled
+
+    @staticmethod
+    def revalidation_enabled() -> bool:
+        """True unless the filesystem watcher keeps the caches current."""
+        return CourseStructureService._revalidate
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop every cached course structure and lesson set."""
+        CourseStructureService._cache.clear()
+        CourseStructureService._lesson_sets.clear()
+        ProgressRollupService.all_lesson_sets_dropped()
+
+    @staticmethod
+    def get_cache_stats() -> Dict[str, Any]:
+        """Hit/miss counters and occupancy of the structure cache."""
+        return CourseStructureService._cache.stats()
+
+    @staticmethod
+    def _get_current_entry(course_path: str) -> CachedCourseStructure:
+        """Return an up-to-date cache entry, rescanning the course if needed."""
+        entry = CourseStructureService._cache.get(course_path)
+        if entry is not None and (
+            not CourseStructureService._revalidate
+            or DirectoryScanner.mtimes_unchanged(entry.directory_mtimes, entry.directory_signatures)
+        ):
+            return entry
+
+        try:
+            tree = DirectoryScanner.scan_tree(course_path, with_mtime=True, keep_entries=True)
+        except OSError:
+            CourseStructureService._cache.pop(course_path)
+            return CachedCourseStructure(structure=CompactCourseStructure(course_path), directory_mtimes={})
+
+        modules, lessons = ContentDetectionService.build_course_structure(tree)
+        entry = CachedCourseStructure(
+            structure=CompactCourseStructure.from_structure(course_path, modules, lessons),
+            directory_mtimes=DirectoryScanner.tree_mtimes(tree),
+            directory_signatures=DirectoryScanner.tree_signatures(tree)
+        )
+        CourseStructureService._cache.put(course_path, entry)
+        CourseStructureService._store_lesson_set(course_path, CourseStructureService._lesson_set_from_tree(tree))
+        return entry
+
+    @staticmethod
+    def _store_lesson_set(course_path: str, lesson_set: LessonSet) -> None:
+        CourseStructureService._lesson_sets.put(course_path, lesson_set)
+        ProgressRollupService.lesson_set_changed(course_path, lesson_set.lesson_paths)
+
+    @staticmethod
+    def _drop_lesson_set(course_path: str) -> None:
+        if CourseStructureService._lesson_sets.pop(course_path) is not None:
+            ProgressRollupService.lesson_set_dropped(course_path)
+
+    @staticmethod
+    def _lesson_set_from_tree(tree: DirectoryTree) -> LessonSet:
+        return LessonSet(
+            lesson_paths=frozenset(ContentDetectionService.list_lesson_paths(tree)),
+            directory_mtimes=DirectoryScanner.tree_mtimes(tree),
+            directory_signatures=DirectoryScanner.tree_signatures(tree)
+        )
+
+    @staticmethod
+    def _build_playlist(entry: CachedCourseStructure) -> CoursePlaylist:
+        """Index the lessons of a cached structure: module lessons first, then root lessons."""
+        structure = entry.structure
+        playlist = CoursePlaylist()
+
+        for index, module in enumerate(structure.modules):
+            playlist.module_indexes[module.directory_name] = index
+            for row in range(module.start, module.end):
+                playlist.add_lesson(structure.relative_path(row), module.directory_name)
+
+        for row in range(structure.root_start, len(structure)):
+            playlist.add_lesson(structure.relative_path(row))
+
+        return playlist
@@ -1,20 +1,31 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
+from config import Config
 from app.models.course_model import Course, NodeType
 from app.services.content_detection_service import ContentDetectionService
 from app.services.registry_service import RegistryService
+from app.utils.directory_scanner import DirectoryScanner
 from app.utils.text_formatter import TextFormatter
 
 
 class DirectoryService:
     @staticmethod
-    def scan_directory(directory_path: str, force_analysis: bool = False) -> List[Course]:
+    def scan_directory(directory_path: str, force_analysis: bool = False, max_workers: Optional[int] = None,
+                       track_access: bool = True) -> List[Course]:
         """
         Scan a directory and return a list of courses/directories.
+
+        Child directories are analyzed (content type, image, progress) on a
+        bounded thread pool when more than one worker is configured. Registry
+        reads and writes stay on the calling thread, and results are merged in
+        listing order, so the output is the same as a serial scan.
         
         Args:
             directory_path (str): The absolute path to the directory to scan
             force_analysis (bool): If True, perform deep analysis even if item is in registry
+            max_workers (int): Worker threads for child analysis, defaults to Config.DIRECTORY_SCAN_WORKERS
+            track_access (bool): Update last_accessed of registered items (off for background crawls)
             
         Returns:
             List[Course]: List of courses and directories found
@@ -26,88 +37,93 @@ class DirectoryService:
             return courses
             
         try:
-            # Get all items in the directory
-            items = os.listdir(directory_path)
-            
-            for item in items:
-                item_path = os.path.join(directory_path, item)
-                
-                # Skip hidden files and directories
-                if item.startswith('.'):
-                    continue
-                    
-                # Only include directories (courses/directories)
-                if os.path.isdir(item_path):
-                    # Format title
-                    formatted_title = DirectoryService._format_title(item)
-                    
-                    # Detect content type first to determine registry section
-                    content_type = ContentDetectionService.detect_content_type(item_path) if force_analysis else None
-
-                    # If not forcing analysis, try to get from registry first
-                    if not force_analysis:
-                        # We need to try both sections since we don't know the type yet
-                        registry_entry = None
-                        for node_type in [NodeType.DIRECTORY, NodeType.COURSE]:
-                            entry = registry_service.get_registry_entry(formatted_title, item_path, node_type)
-                            if entry:
-                                registry_entry = entry
-                                content_type = NodeType(entry["node_type"])
-                                break
-                    else:
-                        registry_entry = None
-                    
-                    if registry_entry and not force_analysis:
-                        print(f"Found in registry: {formatted_title} - skipping deep analysis")
-
-                        registry_service.update_last_accessed(formatted_title, item_path, content_type)
-
-                        node_type = content_type
-
-                        image_absolute_path = ContentDetectionService.find_course_image(item_path)
-                        image_url = DirectoryService._convert_image_path_to_url(image_absolute_path, item, node_type)
-                        progress_percent = ContentDetectionService.calculate_progress(item_path)
-
-                        course = Course(
-                            id=item,
-                            title=formatted_title,
-                            node_type=node_type,
-                            path=item_path,
-                            image_path=image_url
-                        )
-                        course.progress.progress_percent = progress_percent
-                        
-                    else:
-                        print(f"Not in registry: {formatted_title} - performing deep analysis")
-
-                        if content_type is None:
-                            content_type = ContentDetectionService.detect_content_type(item_path)
-
-                        image_absolute_path = ContentDetectionService.find_course_image(item_path)
-                        image_url = DirectoryService._convert_image_path_to_url(image_absolute_path, item, content_type)
-                        progress_percent = ContentDetectionService.calculate_progress(item_path)
-
-                        course = Course(
-                            id=item,
-                            title=formatted_title,
-                            node_type=content_type,
-                            path=item_path,
-                            image_path=image_url
-                        )
-                        course.progress.progress_percent = progress_percent
-
-                        registry_service.register_item(formatted_title, item_path, content_type)
-                    
-                    courses.append(course)
-                    
-        except PermissionError:
+            # Only include directories (courses/directories), hidden ones are skipped
+            items = sorted(DirectoryScanner.list_directory(directory_path).directories)
+        except OSError:
             # Handle permission errors gracefully
-            pass
+            return courses
+
+        # Resolve registry entries up front, on the calling thread
+        children = []
+        for item in items:
+            item_path = os.path.join(directory_path, item)
+            formatted_title = DirectoryService._format_title(item)
+
+            registry_entry = None
+            content_type = None
+            if not force_analysis:
+                # We need to try both sections since we don't know the type yet
+                for node_type in [NodeType.DIRECTORY, NodeType.COURSE]:
+                    entry = registry_service.get_registry_entry(formatted_title, item_path, node_type)
+                    if entry:
+                        registry_entry = entry
+                        content_type = NodeType(entry["node_type"])
+                        break
+
+            if registry_entry:
+                print(f"Found in registry: {formatted_title} - skipping deep analysis")
+            else:
+                print(f"Not in registry: {formatted_title} - performing deep analysis")
+
+            children.append((item, item_path, formatted_title, content_type, registry_entry is not None))
+
+        def analyze(child):
+            item, item_path, formatted_title, content_type, _ = child
+            return DirectoryService._analyze_child(item, item_path, formatted_title, content_type)
+
+        workers = max_workers if max_workers is not None else Config.DIRECTORY_SCAN_WORKERS
+        if workers > 1 and len(children) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(children))) as executor:
+                courses = list(executor.map(analyze, children))
+        else:
+            courses = [analyze(child) for child in children]
+
+        # Apply registry updates in listing order, committed as a single write
+        with registry_service.transaction():
+            for (item, item_path, formatted_title, _, in_registry), course in zip(children, courses):
+                if in_registry:
+                    if track_access:
+                        registry_service.update_last_accessed(formatted_title, item_path, course.node_type)
+                else:
+                    registry_service.register_item(formatted_title, item_path, course.node_type)
             
-        # Sort courses alphabetically by title
-        courses.sort(key=lambda x: x.title.lower())
+        # Sort courses alphabetically by title (directory name breaks ties)
+        courses.sort(key=lambda x: (x.title.lower(), x.id))
         
         return courses
+
+    @staticmethod
+    def _analyze_child(item: str, item_path: str, formatted_title: str, content_type: Optional[NodeType]) -> Course:
+        """
+        Build the card for one child directory. Runs on worker threads, so it
+        must not touch the registry.
+
+        Args:
+            item (str): Directory name, used as the course id
+            item_path (str): Absolute path of the directory
+            formatted_title (str): Display title
+            content_type (NodeType): Type known from the registry, or None to detect it
+
+        Returns:
+            Course: The analyzed course or directory
+        """
+        if content_type is None:
+            content_type = ContentDetectionService.detect_content_type(item_path)
+
+        image_absolute_path = ContentDetectionService.find_course_image(item_path)
+        image_url = DirectoryService._convert_image_path_to_url(image_absolute_path, item, content_type)
+        progress_percent = ContentDetectionService.calculate_progress(item_path, content_type)
+
+        course = Course(
+            id=item,
+            title=formatted_title,
+            node_type=content_type,
+            path=item_path,
+            image_path=image_url
+        )
+        course.progress.progress_percent = progress_percent or 0.0
+        course.progress.progress_pending = progress_percent is None
+        return course
     
     @staticmethod
     def _format_title(directory_name: str) -> str:
@@ -0,0 +1,401 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from typing import Dict, Optional, Set
+from config import Config
+from app.models.course_model import NodeType
+from app.services.progress_rollup_service import ProgressRollupService
+from app.utils.text_formatter import TextFormatter
+
+
+# Sentinel reported by a backend when it lost track of events and everything must be refreshed
+FULL_RESCAN = "*"
+
+
+class InotifyBackend:
+    """Linux inotify backend: one watch per directory, reporting the directories whose entries changed."""
+
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+
+    WATCH_MASK = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, root_path: str):
+        """
+        Raises:
+            OSError: If inotify is unavailable or the watch limit is too low for the tree
+        """
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._paths_by_wd: Dict[int, str] = {}
+        try:
+            self._watch_tree(root_path)
+        except OSError:
+            self.close()
+            raise
+
+    def wait_for_changes(self, timeout: float) -> Set[str]:
+        """Block up to timeout seconds and return the directories whose entries changed."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, name_length = self.EVENT_HEADER.unpack_from(buffer, offset)
+            offset += self.EVENT_HEADER.size
+            name = buffer[offset:offset + name_length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            offset += name_length
+
+            if mask & self.IN_Q_OVERFLOW:
+                return {FULL_RESCAN}
+
+            if mask & self.IN_IGNORED:
+                self._paths_by_wd.pop(wd, None)
+                continue
+
+            directory = self._paths_by_wd.get(wd)
+            if directory is None:
+                continue
+
+            if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                changed.add(directory)
+                continue
+
+            # Hidden files (progress and metadata JSON, temp files) never affect the structure
+            if name.startswith('.'):
+                continue
+
+            changed.add(directory)
+            child_path = os.path.join(directory, name)
+
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    try:
+                        self._watch_tree(child_path)
+                    except OSError:
+                        return {FULL_RESCAN}
+                elif mask & self.IN_MOVED_FROM:
+                    self._unwatch_tree(child_path)
+
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _watch_tree(self, root_path: str) -> None:
+        """Add a watch on root_path and every non-hidden directory below it."""
+        pending = [root_path]
+        while pending:
+            path = pending.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == 28:  # ENOSPC: out of watches, the tree is too big for inotify
+                    raise OSError(error, "inotify watch limit reached")
+                continue
+            self._paths_by_wd[wd] = path
+
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if not entry.name.startswith('.') and entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+            except OSError:
+                continue
+
+    def _unwatch_tree(self, root_path: str) -> None:
+        """Forget the watches of a directory that was moved away."""
+        prefix = root_path + os.sep
+        for wd, path in list(self._paths_by_wd.items()):
+            if path == root_path or path.startswith(prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._paths_by_wd[wd]
+
+
+class PollingBackend:
+    """
+    Portable backend comparing directory mtimes between polls. The poll interval
+    shrinks back to the minimum after a change and doubles while nothing changes.
+    """
+
+    def __init__(self, root_path: str, min_interval: float, max_interval: float,
+                 stop_event: Optional[threading.Event] = None):
+        self.root_path = root_path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._stop_event = stop_event or threading.Event()
+        self._snapshot = self._take_snapshot()
+
+    def wait_for_changes(self, timeout: float) -> Set[str]:
+        """
+        Sleep for the current interval and return the changed directories.
+
+        The interval is slept in slices of at most timeout so that a stop request
+        is noticed promptly; a stopped backend returns without polling.
+        """
+        deadline = time.monotonic() + self.interval
+        remaining = self.interval
+        while remaining > 0:
+            if self._stop_event.wait(min(remaining, timeout)):
+                return set()
+            remaining = deadline - time.monotonic()
+
+        snapshot = self._take_snapshot()
+        changed = {path for path, mtime in snapshot.items() if self._snapshot.get(path) != mtime}
+        changed |= {os.path.dirname(path) for path in self._snapshot.keys() - snapshot.keys()}
+        self._snapshot = snapshot
+
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * 2, self.max_interval)
+
+        return changed
+
+    def close(self) -> None:
+        self._snapshot = {}
+
+    def _take_snapshot(self) -> Dict[str, int]:
+        """Map every non-hidden directory of the tree to its mtime."""
+        snapshot = {}
+        pending = [self.root_path]
+        while pending:
+            path = pending.pop()
+            try:
+                snapshot[path] = os.stat(path).st_mtime_ns
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if not entry.name.startswith('.') and entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+            except OSError:
+                continue
+        return snapshot
+
+
+class FilesystemWatcherService:
+    """
+    Optional background watcher over COURSES_ROOT_DIRECTORY_ABS_PATH.
+
+    When directories are added, removed or renamed it invalidates the affected
+    course structures and refreshes the affected registry entries, so request
+    handlers can trust cached data without checking the filesystem.
+    """
+
+    # Events arriving within this window are handled as one batch
+    DEBOUNCE_SECONDS = 0.2
+
+    _thread: Optional[threading.Thread] = None
+    _stop_event = threading.Event()
+    _backend = None
+    root_path: Optional[str] = None
+    changes_handled = 0
+
+    @staticmethod
+    def start(root_path: str) -> bool:
+        """
+        Start watching root_path in a daemon thread.
+
+        Returns:
+            bool: True if the watcher is running
+        """
+        from app.services.course_structure_service import CourseStructureService
+
+        if FilesystemWatcherService.is_running():
+            return True
+        if not root_path or not os.path.isdir(root_path):
+            print(f"Filesystem watcher not started: {root_path!r} is not a directory")
+            return False
+
+        FilesystemWatcherService.root_path = root_path
+        FilesystemWatcherService._backend = FilesystemWatcherService._create_backend(root_path)
+        FilesystemWatcherService._stop_event.clear()
+
+        thread = threading.Thread(target=FilesystemWatcherService._run, name="filesystem-watcher", daemon=True)
+        FilesystemWatcherService._thread = thread
+        thread.start()
+
+        CourseStructureService.set_revalidation(False)
+        print(f"Filesystem watcher started ({type(FilesystemWatcherService._backend).__name__}) on {root_path}")
+        return True
+
+    @staticmethod
+    def stop() -> None:
+        """Stop the watcher and restore per-request revalidation."""
+        from app.services.course_structure_service import CourseStructureService
+
+        thread = FilesystemWatcherService._thread
+        if thread is None:
+            return
+
+        FilesystemWatcherService._stop_event.set()
+        thread.join(timeout=5)
+        FilesystemWatcherService._backend.close()
+        FilesystemWatcherService._thread = None
+        FilesystemWatcherService._backend = None
+        CourseStructureService.set_revalidation(True)
+
+    @staticmethod
+    def is_running() -> bool:
+        thread = FilesystemWatcherService._thread
+        return thread is not None and thread.is_alive()
+
+    @staticmethod
+    def _create_backend(root_path: str):
+        """Use inotify when requested or available, falling back to polling."""
+        backend = Config.FILESYSTEM_WATCHER_BACKEND.lower()
+        if backend in ("auto", "inotify"):
+            try:
+                return InotifyBackend(root_path)
+            except OSError as e:
+                print(f"inotify unavailable ({e}), falling back to polling")
+        return PollingBackend(
+            root_path,
+            Config.FILESYSTEM_WATCHER_POLL_MIN_SECONDS,
+            Config.FILESYSTEM_WATCHER_POLL_MAX_SECONDS,
+            FilesystemWatcherService._stop_event
+        )
+
+    @staticmethod
+    def _run() -> None:
+        stop_event = FilesystemWatcherService._stop_event
+
+        while not stop_event.is_set():
+            # Replaced by a full rescan, so read on every iteration
+            backend = FilesystemWatcherService._backend
+            try:
+                changed = backend.wait_for_changes(timeout=1.0)
+                if not changed:
+                    continue
+
+                # Let a burst of events (e.g. a copied course) settle into one batch
+                deadline = time.monotonic() + FilesystemWatcherService.DEBOUNCE_SECONDS
+                while time.monotonic() < deadline and FULL_RESCAN not in changed:
+                    changed |= backend.wait_for_changes(timeout=FilesystemWatcherService.DEBOUNCE_SECONDS)
+
+                FilesystemWatcherService.apply_changes(changed)
+            except Exception as e:
+                print(f"Filesystem watcher error: {e}")
+
+    @staticmethod
+    def apply_changes(changed_directories: Set[str]) -> None:
+        """
+        Bring the caches in line with a set of directories whose entries changed.
+
+        For every changed directory: its cached course structure and that of its
+        parent are dropped, its own and its parent's registry entries are
+        re-classified (or removed when gone), and when it is a browsable
+        directory its children are registered or unregistered to match disk.
+        """
+        from app.services.course_structure_service import CourseStructureService
+        from app.services.registry_service import RegistryService
+
+        if FULL_RESCAN in changed_directories:
+            FilesystemWatcherService._full_rescan()
+            return
+
+        registry_service = RegistryService()
+        root_path = FilesystemWatcherService.root_path
+
+        for directory in sorted(changed_directories):
+            CourseStructureService.invalidate_path(directory)
+            ProgressRollupService.directory_changed(directory)
+
+            entry = None
+            if registry_service.find_entry_by_path(directory):
+                entry = registry_service.refresh_path(directory)
+
+            parent = os.path.dirname(directory)
+            if parent != directory and registry_service.find_entry_by_path(parent):
+                registry_service.refresh_path(parent)
+
+            is_listing = directory == root_path or (entry and entry["node_type"] == NodeType.DIRECTORY.value)
+            if is_listing and os.path.isdir(directory):
+                FilesystemWatcherService._sync_children(registry_service, directory)
+
+        FilesystemWatcherService.changes_handled += len(changed_directories)
+
+    @staticmethod
+    def _full_rescan() -> None:
+        """
+        Recover from lost events (queue overflow, a new directory that could
+        not be watched): rebuild the backend, which falls back to polling when
+        inotify is out of watches, then drop every cached structure and
+        reconcile the registered tree below the root with the disk.
+        """
+        from app.services.course_structure_service import CourseStructureService
+        from app.services.registry_service import RegistryService
+
+        root_path = FilesystemWatcherService.root_path
+        if FilesystemWatcherService._backend is not None:
+            FilesystemWatcherService._backend.close()
+            FilesystemWatcherService._backend = FilesystemWatcherService._create_backend(root_path)
+            print(f"Filesystem watcher rebuilt ({type(FilesystemWatcherService._backend).__name__}) after lost events")
+
+        CourseStructureService.clear_cache()
+        ProgressRollupService.all_directories_changed()
+        if not root_path or not os.path.isdir(root_path):
+            return
+
+        registry_service = RegistryService()
+        with registry_service.transaction():
+            pending = [root_path]
+            while pending:
+                directory = pending.pop()
+                FilesystemWatcherService._sync_children(registry_service, directory)
+                for entry in registry_service.get_child_entries(directory):
+                    entry = registry_service.refresh_path(entry["path"])
+                    if entry and entry["node_type"] == NodeType.DIRECTORY.value:
+                        pending.append(entry["path"])
+
+        FilesystemWatcherService.changes_handled += 1
+
+    @staticmethod
+    def _sync_children(registry_service, directory: str) -> None:
+        """Register new child directories and unregister vanished ones."""
+        from app.services.content_detection_service import ContentDetectionService
+
+        registered = {entry["path"] for entry in registry_service.get_child_entries(directory)}
+        on_disk = set()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.startswith('.') and entry.is_dir():
+                    on_disk.add(entry.path)
+
+        for path in registered - on_disk:
+            registry_service.remove_path(path)
+
+        for path in sorted(on_disk - registered):
+            title = TextFormatter.format_directory_title(os.path.basename(path))
+            registry_service.register_item(title, path, ContentDetectionService.detect_content_type(path))
@@ -2,12 +2,17 @@ import os
 from typing import Optional, Tuple, Dict, Any
 from app.utils.path_validator import PathValidator
 from app.models.lesson_type import get_lesson_type_from_extension, LessonType, DOCUMENT_EXTENSIONS
-import markdown
+from app.services.markdown_cache_service import MarkdownCacheService
+from app.services.media_duration_service import MediaDurationService
+from app.utils.markdown_converter_pool import MarkdownConverterPool
 
 
 class LessonService:
     """Service for handling lesson-related operations."""
 
+    MARKDOWN_EXTENSIONS = ['fenced_code', 'tables', 'nl2br', 'codehilite']
+    _markdown_converters = MarkdownConverterPool(MARKDOWN_EXTENSIONS)
+
     @staticmethod
     def build_lesson_path(course_path: str, lesson_path: str) -> str:
         """
@@ -108,11 +113,20 @@ class LessonService:
         is_markdown = False
 
         if lesson_type == LessonType.TEXT and not is_pdf:
-            text_content = LessonService._read_text_file(file_path)
-
             if file_extension.lower() in ['.md', '.markdown']:
                 is_markdown = True
-                text_content = LessonService._render_markdown(text_content)
+                # Rendered HTML is cached by file size and mtime, so unchanged notes are not re-highlighted
+                try:
+                    text_content = MarkdownCacheService.get_or_render(
+                        file_path,
+                        LessonService.MARKDOWN_EXTENSIONS,
+                        lambda: LessonService._render_markdown(LessonService._read_text(file_path))
+                    )
+                except Exception:
+                    # Show the raw text (or the read error), but keep the fallback out of the cache so it is retried
+                    text_content = LessonService._read_text_file(file_path)
+            else:
+                text_content = LessonService._read_text_file(file_path)
 
         return {
             'lesson_type': lesson_type,
@@ -134,17 +148,27 @@ class LessonService:
             str: File content or error message
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return LessonService._read_text(file_path)
         except UnicodeDecodeError:
-            try:
-                with open(file_path, 'r', encoding='latin-1') as f:
-                    return f.read()
-            except Exception:
-                return "Error reading file content. File encoding not supported."
+            return "Error reading file content. File encoding not supported."
         except Exception as e:
             return f"Error reading file content: {str(e)}"
 
+    @staticmethod
+    def _read_text(file_path: str) -> str:
+        """
+        Read text file content, falling back to latin-1 when it is not UTF-8.
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except UnicodeDecodeError:
+            with open(file_path, 'r', encoding='latin-1') as f:
+                return f.read()
+
     @staticmethod
     def _render_markdown(content: str) -> str:
         """
@@ -156,13 +180,7 @@ class LessonService:
         Returns:
             str: Rendered HTML
         """
-        try:
-            return markdown.markdown(
-                content,
-                extensions=['fenced_code', 'tables', 'nl2br', 'codehilite']
-            )
-        except Exception:
-            return content
+        return LessonService._markdown_converters.convert(content)
 
     @staticmethod
     def get_file_metadata(file_path: str, lesson_type: LessonType) -> Dict[str, Any]:
@@ -205,16 +223,13 @@ class LessonService:
                 else:
                     return f"{minutes:02d}:{secs:02d}"
 
-            # TODO: Extract actual duration from media files
-            # For now, generate random placeholder duration for media files
             duration = None
             duration_seconds = 0
 
             if lesson_type in [LessonType.VIDEO, LessonType.AUDIO]:
-                import random
-                # Generate random duration between 1 minute and 2 hours
-                duration_seconds = random.randint(60, 7200)
-                duration = format_duration(duration_seconds)
+                duration_seconds = MediaDurationService.get_duration(file_path, file_stats)
+                if duration_seconds > 0:
+                    duration = format_duration(duration_seconds)
 
             return {
                 'file_size': format_file_size(file_size_bytes),
@@ -233,7 +248,7 @@ class LessonService:
             }
 
     @staticmethod
-    def get_lesson_navigation(course_path: str, current_lesson_path: str) -> Dict[str, Optional[str]]:
+    def get_lesson_navigation(course_path: str, current_lesson_path: str) -> Dict[str, Any]:
         """
         Get next and previous lesson paths for navigation.
 
@@ -242,46 +257,27 @@ class LessonService:
             current_lesson_path (str): Relative path to the current lesson
 
         Returns:
-            Dict[str, Optional[str]]: Dictionary with 'next' and 'previous' lesson paths (relative)
+            Dict[str, Any]: Dictionary with 'next' and 'previous' lesson paths (relative),
+                and 'next_in_other_module' / 'previous_in_other_module' flags set when
+                that lesson belongs to a different module than the current one
         """
-        from app.services.content_detection_service import ContentDetectionService
-
-        # Get all lessons from modules and root
-        all_lessons = []
+        from app.services.course_structure_service import CourseStructureService
 
         try:
-            # Scan modules
-            modules = ContentDetectionService.scan_course_modules(course_path)
-            for module in modules:
-                for lesson in module.lessons:
-                    # Get relative path from course directory
-                    rel_path = os.path.relpath(lesson.file_path, course_path)
-                    all_lessons.append(rel_path)
-
-            # Scan root lessons
-            root_lessons = ContentDetectionService.scan_course_lessons(course_path)
-            for lesson in root_lessons:
-                rel_path = os.path.relpath(lesson.file_path, course_path)
-                all_lessons.append(rel_path)
-
-            # Find current lesson index
-            try:
-                current_index = all_lessons.index(current_lesson_path)
-            except ValueError:
-                # Current lesson not found
-                return {'next': None, 'previous': None}
-
-            # Get next and previous
-            next_lesson = all_lessons[current_index + 1] if current_index + 1 < len(all_lessons) else None
-            previous_lesson = all_lessons[current_index - 1] if current_index > 0 else None
-
-            return {
-                'next': next_lesson,
-                'previous': previous_lesson
-            }
-
+            # Positions and neighbours are precomputed in the cached course playlist
+            playlist = CourseStructureService.get_course_playlist(course_path)
+            navigation = playlist.get_navigation(current_lesson_path)
         except Exception:
-            return {'next': None, 'previous': None}
+            navigation = {'next': None, 'previous': None}
+            playlist = None
+
+        navigation['next_in_other_module'] = (
+            navigation['next'] is not None and playlist.is_module_boundary(current_lesson_path)
+        )
+        navigation['previous_in_other_module'] = (
+            navigation['previous'] is not None and playlist.is_module_boundary(navigation['previous'])
+        )
+        return navigation
 
     @staticmethod
     def get_module_lessons(course_path: str, current_lesson_path: str) -> Optional[Dict[str, Any]]:
@@ -295,7 +291,7 @@ class LessonService:
         Returns:
             Optional[Dict[str, Any]]: Module lessons data or None if not in a module
         """
-        from app.services.content_detection_service import ContentDetectionService
+        from app.services.course_structure_service import CourseStructureService
         from app.services.progress_service import ProgressService
 
         module_dir = os.path.dirname(current_lesson_path)
@@ -307,30 +303,29 @@ class LessonService:
             progress_data = progress_service.get_progress()
             lessons_progress = progress_data.get('lessons', {})
 
-            modules = ContentDetectionService.scan_course_modules(course_path)
-            for module in modules:
-                if module.directory_name == module_dir:
-                    lessons_data = []
-                    for lesson in module.lessons:
-                        rel_path = os.path.relpath(lesson.file_path, course_path)
-                        is_current = (rel_path == current_lesson_path)
-                        is_completed = lessons_progress.get(rel_path, {}).get('completed', False)
-                        lessons_data.append({
-                            'title': lesson.title,
-                            'path': rel_path,
-                            'type': lesson.lesson_type.value,
-                            'is_current': is_current,
-                            'completed': is_completed
-                        })
-                    return {
-                        'module_title': module.title,
-                        'lessons': lessons_data
-                    }
+            module = CourseStructureService.get_module(course_path, module_dir)
+            if module is None:
+                return None
+
+            lessons_data = []
+            for lesson in module.lessons:
+                rel_path = os.path.relpath(lesson.file_path, course_path)
+                is_current = (rel_path == current_lesson_path)
+                is_completed = lessons_progress.get(rel_path, {}).get('completed', False)
+                lessons_data.append({
+                    'title': lesson.title,
+                    'path': rel_path,
+                    'type': lesson.lesson_type.value,
+                    'is_current': is_current,
+                    'completed': is_completed
+                })
+            return {
+                'module_title': module.title,
+                'lessons': lessons_data
+            }
         except Exception:
             return None
 
-        return None
-
     @staticmethod
     def prepare_lesson_view(course_id: str, lesson_path: str, registry_service) -> Optional[Dict[str, Any]]:
         """
@@ -396,6 +391,8 @@ class LessonService:
             'breadcrumbs': breadcrumbs,
             'next_lesson': navigation['next'],
             'previous_lesson': navigation['previous'],
+            'next_in_other_module': navigation['next_in_other_module'],
+            'previous_in_other_module': navigation['previous_in_other_module'],
             'back_to_course_url': back_url,
             'module_lessons': module_lessons
         }
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Sequence
+import markdown
+from config import Config
+from app.repositories.rendered_markdown_repository import RenderedMarkdownRepository
+from app.utils.lru_cache import LruCache
+
+try:
+    import pygments
+except ImportError:  # codehilite falls back to plain <pre> blocks without Pygments
+    pygments = None
+
+
+class MarkdownCacheService:
+    """
+    Two-tier cache of rendered markdown lessons.
+
+    Entries are keyed by (absolute path, size, mtime, extension set, Markdown
+    and Pygments versions), so an edited file or a change of the rendering pipeline is
+    rendered again and stale entries simply age out. The first tier is an
+    in-process LRU bounded by Config.MARKDOWN_CACHE_MAX_BYTES, the second a
+    directory of HTML files shared by the worker processes and bounded by
+    Config.MARKDOWN_DISK_CACHE_MAX_BYTES (0 disables it).
+    """
+
+    _memory = LruCache(
+        max_entries=0,
+        max_bytes=Config.MARKDOWN_CACHE_MAX_BYTES,
+        sizeof=sys.getsizeof
+    )
+    _disk = RenderedMarkdownRepository(max_bytes=Config.MARKDOWN_DISK_CACHE_MAX_BYTES)
+    _lock = threading.Lock()
+    _stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @staticmethod
+    def get_or_render(file_path: str, extensions: Sequence[str], render: Callable[[], str]) -> str:
+        """
+        Get the rendered HTML of a markdown file, calling render on a miss.
+
+        Args:
+            file_path (str): Absolute path to the markdown file
+            extensions (Sequence[str]): Markdown extensions render uses, part of the key
+            render (Callable): Reads and renders the file
+
+        Returns:
+            str: Rendered HTML
+
+        Raises:
+            Exception: Whatever render raises; failed renders are not cached
+        """
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return render()
+
+        key = MarkdownCacheService.cache_key(file_path, stat_result, extensions)
+        html = MarkdownCacheService._memory.get(key)
+        if html is not None:
+            MarkdownCacheService._count("memory_hits")
+            return html
+
+        if Config.MARKDOWN_DISK_CACHE_MAX_BYTES > 0:
+            html = MarkdownCacheService._disk.get(key)
+            if html is not None:
+                MarkdownCacheService._count("disk_hits")
+                MarkdownCacheService._memory.put(key, html)
+                return html
+
+        MarkdownCacheService._count("misses")
+        html = render()
+        MarkdownCacheService._memory.put(key, html)
+        if Config.MARKDOWN_DISK_CACHE_MAX_BYTES > 0:
+            MarkdownCacheService._disk.put(key, html)
+        return html
+
+    @staticmethod
+    def cache_key(file_path: str, stat_result: os.stat_result, extensions: Sequence[str]) -> str:
+        """Hex digest of everything the rendered HTML depends on."""
+        parts = [
+            os.path.abspath(file_path),
+            str(stat_result.st_size),
+            str(stat_result.st_mtime_ns),
+            ",".join(sorted(extensions)),
+            markdown.__version__,
+            pygments.__version__ if pygments is not None else "no-pygments"
+        ]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_stats() -> Dict[str, Any]:
+        """Hits per tier, misses, and the occupancy of both tiers."""
+        with MarkdownCacheService._lock:
+            stats = dict(MarkdownCacheService._stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        stats["memory"] = MarkdownCacheService._memory.stats()
+        stats["disk"] = {
+            "bytes": MarkdownCacheService._disk.size(),
+            "max_bytes": MarkdownCacheService._disk.max_bytes,
+            "evictions": MarkdownCacheService._disk.evictions
+        }
+        return stats
+
+    @staticmethod
+    def clear() -> None:
+        """Drop both tiers and reset the counters."""
+        MarkdownCacheService._memory.clear()
+        MarkdownCacheService._disk.clear()
+        with MarkdownCacheService._lock:
+            MarkdownCacheService._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @staticmethod
+    def _count(name: str) -> None:
+        with MarkdownCacheService._lock:
+            MarkdownCacheService._stats[name] += 1
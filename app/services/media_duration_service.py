@@ -0,0 +1,238 @@
+import atexit
+import os
+import threading
+from typing import Any, Dict, Optional, Set
+from app.models.lesson_type import AUDIO_EXTENSIONS, VIDEO_EXTENSIONS
+from app.repositories.media_duration_repository import MediaDurationRepository
+
+try:
+    import mutagen
+except ImportError:  # pragma: no cover - mutagen is listed in requirements.txt
+    mutagen = None
+
+
+MEDIA_EXTENSIONS = VIDEO_EXTENSIONS | AUDIO_EXTENSIONS
+
+
+class MediaDurationService:
+    """
+    Media durations probed with mutagen, backed by a persistent cache.
+
+    Cache entries are keyed by (device, inode, size, mtime), so a file is probed
+    once and probed again only when it is replaced or modified. The cache is
+    loaded once per process and written back only when durations were added
+    or replaced: SAVE_DELAY_SECONDS after the first unsaved change, so a scan
+    probing many files writes once, and at interpreter exit. A save merges
+    this process's changes into the file, dropping the entries of replaced
+    file versions.
+    """
+
+    SAVE_DELAY_SECONDS = 2.0
+
+    _entries: Optional[Dict[str, Dict[str, Any]]] = None
+    _keys_by_path: Dict[str, str] = {}
+    # Changes since the last save: entries added and keys of replaced versions
+    _added: Dict[str, Dict[str, Any]] = {}
+    _removed: Set[str] = set()
+    _lock = threading.RLock()
+    _save_timer: Optional[threading.Timer] = None
+    _atexit_registered = False
+    repository = MediaDurationRepository()
+
+    @staticmethod
+    def is_media_file(file_path: str) -> bool:
+        """Check if a file has a video or audio extension."""
+        return os.path.splitext(file_path)[1].lower() in MEDIA_EXTENSIONS
+
+    @staticmethod
+    def get_duration(file_path: str, stat_result: Optional[os.stat_result] = None) -> int:
+        """
+        Get the duration of a media file in whole seconds.
+
+        Args:
+            file_path (str): Absolute path to the media file
+            stat_result (os.stat_result): Stat of the file, if the caller already has one
+
+        Returns:
+            int: Duration in seconds, 0 if unknown or not a media file
+        """
+        if not MediaDurationService.is_media_file(file_path):
+            return 0
+
+        try:
+            stat_result = stat_result or os.stat(file_path)
+        except OSError:
+            return 0
+
+        key = MediaDurationService.cache_key(stat_result)
+        cached = MediaDurationService.get_cached_duration(key)
+        if cached is not None:
+            return cached
+
+        duration = MediaDurationService.probe_duration(file_path)
+        MediaDurationService.store_duration(key, file_path, duration)
+        return duration
+
+    @staticmethod
+    def lookup_duration(file_path: str, stat_result: Optional[os.stat_result] = None) -> Optional[int]:
+        """
+        Get the duration of a media file without waiting for a probe when
+        background probing is running: uncached files are queued instead.
+
+        Args:
+            file_path (str): Absolute path to the media file
+            stat_result (os.stat_result): Stat of the file, if the caller already has one
+
+        Returns:
+            Optional[int]: Duration in seconds, or None while the file is pending a probe
+        """
+        from app.services.media_probe_queue_service import MediaProbeQueueService
+
+        if not MediaProbeQueueService.is_running():
+            return MediaDurationService.get_duration(file_path, stat_result)
+
+        if not MediaDurationService.is_media_file(file_path):
+            return 0
+
+        try:
+            key = MediaDurationService.cache_key(stat_result or os.stat(file_path))
+        except OSError:
+            return 0
+
+        cached = MediaDurationService.get_cached_duration(key)
+        if cached is not None:
+            return cached
+
+        MediaProbeQueueService.enqueue(file_path)
+        return None
+
+    @staticmethod
+    def cache_key(stat_result: os.stat_result) -> str:
+        """Cache key identifying one version of one file."""
+        return f"{stat_result.st_dev}:{stat_result.st_ino}:{stat_result.st_size}:{stat_result.st_mtime_ns}"
+
+    @staticmethod
+    def get_cached_duration(key: str) -> Optional[int]:
+        """Return the cached duration for a key, or None if the file was never probed."""
+        with MediaDurationService._lock:
+            entry = MediaDurationService._load_entries().get(key)
+            return entry["duration_seconds"] if entry else None
+
+    @staticmethod
+    def store_duration(key: str, file_path: str, duration: int, details: Optional[Dict[str, Any]] = None) -> None:
+        """Record a probed duration (and optional stream details), replacing the entry of an older version of the same file."""
+        with MediaDurationService._lock:
+            entries = MediaDurationService._load_entries()
+            old_key = MediaDurationService._keys_by_path.get(file_path)
+            if old_key and old_key != key:
+                entries.pop(old_key, None)
+                MediaDurationService._added.pop(old_key, None)
+                MediaDurationService._removed.add(old_key)
+
+            entries[key] = {"path": file_path, "duration_seconds": duration}
+            if details:
+                entries[key]["details"] = details
+            MediaDurationService._keys_by_path[file_path] = key
+            MediaDurationService._added[key] = entries[key]
+            MediaDurationService._removed.discard(key)
+            MediaDurationService._schedule_save()
+
+    @staticmethod
+    def probe_duration(file_path: str) -> int:
+        """
+        Read the duration from the media headers.
+
+        Returns:
+            int: Duration in whole seconds, 0 if the format is unsupported or unreadable
+        """
+        if mutagen is None:
+            return 0
+
+        try:
+            media = mutagen.File(file_path)
+            if media is None or media.info is None:
+                return 0
+            return int(round(media.info.length or 0))
+        except Exception:
+            return 0
+
+    @staticmethod
+    def save() -> None:
+        """Write the durations added or replaced since the last save to disk now."""
+        with MediaDurationService._lock:
+            added, MediaDurationService._added = MediaDurationService._added, {}
+            removed, MediaDurationService._removed = MediaDurationService._removed, set()
+        if not added and not removed:
+            return
+
+        def merge(data):
+            # Keep the durations other worker processes probed meanwhile, but drop
+            # replaced versions, including other processes' entries for the same files
+            durations = data.setdefault("durations", {})
+            paths = {entry["path"] for entry in added.values()}
+            for key in [key for key, entry in durations.items() if key in removed or
+                        (entry.get("path") in paths and key not in added)]:
+                del durations[key]
+            durations.update(added)
+
+        # Without the lock, so probes are not held up by the file I/O
+        try:
+            MediaDurationService.repository.update(merge)
+        except IOError as e:
+            print(f"Error saving media duration cache: {e}")
+            with MediaDurationService._lock:
+                # Retried with the next save, unless changed again meanwhile
+                for key in removed - MediaDurationService._added.keys():
+                    MediaDurationService._removed.add(key)
+                for key, entry in added.items():
+                    if key not in MediaDurationService._removed:
+                        MediaDurationService._added.setdefault(key, entry)
+
+    @staticmethod
+    def reset(repository: Optional[MediaDurationRepository] = None) -> None:
+        """Forget the in-memory cache, optionally switching to another repository."""
+        with MediaDurationService._lock:
+            if MediaDurationService._save_timer is not None:
+                MediaDurationService._save_timer.cancel()
+                MediaDurationService._save_timer = None
+            if repository is not None:
+                MediaDurationService.repository = repository
+            MediaDurationService._entries = None
+            MediaDurationService._keys_by_path = {}
+            MediaDurationService._added = {}
+            MediaDurationService._removed = set()
+
+    @staticmethod
+    def _schedule_save() -> None:
+        """Start the save timer unless one is pending. Called with the lock held."""
+        if MediaDurationService._save_timer is None:
+            timer = threading.Timer(MediaDurationService.SAVE_DELAY_SECONDS, MediaDurationService._save_on_timer)
+            timer.daemon = True
+            MediaDurationService._save_timer = timer
+            timer.start()
+
+        if not MediaDurationService._atexit_registered:
+            atexit.register(MediaDurationService.save)
+            MediaDurationService._atexit_registered = True
+
+    @staticmethod
+    def _save_on_timer() -> None:
+        with MediaDurationService._lock:
+            MediaDurationService._save_timer = None
+        MediaDurationService.save()
+
+    @staticmethod
+    def _load_entries() -> Dict[str, Dict[str, Any]]:
+        """Load the cache from disk on first use."""
+        if MediaDurationService._entries is None:
+            try:
+                data = MediaDurationService.repository.load() or {}
+            except IOError as e:
+                print(f"Error loading media duration cache: {e}")
+                data = {}
+
+            MediaDurationService._entries = data.get("durations", {})
+            MediaDurationService._keys_by_path = {
+                entry["path"]: key for key, entry in MediaDurationService._entries.items()
+            }
+        return MediaDurationService._entries
@@ -0,0 +1,289 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+from config import Config
+
+
+def probe_media_file(file_path: str) -> Dict[str, Any]:
+    """
+    Probe one media file. Runs in a worker process, so it only depends on the
+    file itself and returns plain data.
+
+    Returns:
+        Dict[str, Any]: path, cache key, duration_seconds and any stream details mutagen exposes
+    """
+    from app.services.media_duration_service import MediaDurationService, mutagen
+
+    stat_result = os.stat(file_path)
+    result = {
+        "path": file_path,
+        "key": MediaDurationService.cache_key(stat_result),
+        "duration_seconds": 0,
+        "details": {}
+    }
+
+    if mutagen is None:
+        return result
+
+    try:
+        media = mutagen.File(file_path)
+    except Exception:
+        return result
+
+    if media is not None and media.info is not None:
+        result["duration_seconds"] = int(round(media.info.length or 0))
+        for attribute in ("bitrate", "sample_rate", "channels"):
+            value = getattr(media.info, attribute, None)
+            if isinstance(value, (int, float)) and value:
+                result["details"][attribute] = value
+
+    return result
+
+
+class MediaProbeQueueService:
+    """
+    Background media probing on a process pool.
+
+    Files are queued by priority (lessons of the course being viewed first,
+    library pre-probing last), de-duplicated while pending, and probed by
+    worker processes. Results go to the MediaDurationService cache and the
+    cached structure of the containing course is dropped, so the next page
+    view shows the real values instead of "pending".
+    """
+
+    PRIORITY_INTERACTIVE = 0
+    PRIORITY_BACKGROUND = 10
+
+    # Completion timestamps kept for the throughput figure
+    THROUGHPUT_WINDOW_SECONDS = 60
+
+    _queue: "queue.PriorityQueue" = queue.PriorityQueue()
+    _sequence = itertools.count()
+    _pending: Dict[str, int] = {}
+    _lock = threading.Lock()
+    _executor: Optional[ProcessPoolExecutor] = None
+    _dispatcher: Optional[threading.Thread] = None
+    _slots: Optional[threading.Semaphore] = None
+    _stop_event = threading.Event()
+    _completed_at: deque = deque()
+    _counters = {"queued": 0, "completed": 0, "failed": 0}
+    _started_at: Optional[float] = None
+
+    @staticmethod
+    def start(max_workers: Optional[int] = None) -> None:
+        """Start the process pool and the dispatcher thread."""
+        if MediaProbeQueueService.is_running():
+            return
+
+        workers = max_workers or Config.MEDIA_PROBE_WORKERS
+        MediaProbeQueueService._executor = MediaProbeQueueService._create_pool(workers)
+        # Keep a little more than one job per worker in flight
+        MediaProbeQueueService._slots = threading.Semaphore(workers * 2)
+        MediaProbeQueueService._stop_event.clear()
+        MediaProbeQueueService._started_at = time.time()
+
+        thread = threading.Thread(target=MediaProbeQueueService._dispatch, name="media-probe-dispatcher", daemon=True)
+        MediaProbeQueueService._dispatcher = thread
+        thread.start()
+
+    @staticmethod
+    def _create_pool(workers: int) -> ProcessPoolExecutor:
+        """
+        Process pool whose workers do not fork this process: by the time it starts,
+        the watcher, write-behind and rollup threads may hold locks that a forked
+        child would inherit held forever.
+        """
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+    @staticmethod
+    def stop() -> None:
+        """Stop dispatching, shut the pool down and drop the queued files, so they can be queued again."""
+        if MediaProbeQueueService._dispatcher is not None:
+            MediaProbeQueueService._stop_event.set()
+            MediaProbeQueueService._dispatcher.join(timeout=5)
+            MediaProbeQueueService._executor.shutdown(wait=True, cancel_futures=True)
+            MediaProbeQueueService._dispatcher = None
+            MediaProbeQueueService._executor = None
+
+        with MediaProbeQueueService._lock:
+            MediaProbeQueueService._pending.clear()
+            while True:
+                try:
+                    MediaProbeQueueService._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+    @staticmethod
+    def is_running() -> bool:
+        thread = MediaProbeQueueService._dispatcher
+        return thread is not None and thread.is_alive()
+
+    @staticmethod
+    def enqueue(file_path: str, priority: int = PRIORITY_INTERACTIVE) -> bool:
+        """
+        Queue a file for probing. A file already pending is only re-queued if the new priority is higher.
+
+        Returns:
+            bool: True if the file was queued
+        """
+        with MediaProbeQueueService._lock:
+            current = MediaProbeQueueService._pending.get(file_path)
+            if current is not None and current <= priority:
+                return False
+            MediaProbeQueueService._pending[file_path] = priority
+            MediaProbeQueueService._counters["queued"] += 1
+
+        MediaProbeQueueService._queue.put((priority, next(MediaProbeQueueService._sequence), file_path))
+        return True
+
+    @staticmethod
+    def is_pending(file_path: str) -> bool:
+        """Check if a file is queued or being probed."""
+        return file_path in MediaProbeQueueService._pending
+
+    @staticmethod
+    def get_status() -> Dict[str, Any]:
+        """Queue depth, in-flight jobs, counters and recent throughput."""
+        now = time.time()
+        with MediaProbeQueueService._lock:
+            completed_at = MediaProbeQueueService._completed_at
+            while completed_at and completed_at[0] < now - MediaProbeQueueService.THROUGHPUT_WINDOW_SECONDS:
+                completed_at.popleft()
+
+            window = MediaProbeQueueService.THROUGHPUT_WINDOW_SECONDS
+            if MediaProbeQueueService._started_at:
+                window = min(window, max(now - MediaProbeQueueService._started_at, 1.0))
+
+            return {
+                "running": MediaProbeQueueService.is_running(),
+                "queue_depth": MediaProbeQueueService._queue.qsize(),
+                "pending": len(MediaProbeQueueService._pending),
+                "queued_total": MediaProbeQueueService._counters["queued"],
+                "completed_total": MediaProbeQueueService._counters["completed"],
+                "failed_total": MediaProbeQueueService._counters["failed"],
+                "throughput_per_second": round(len(completed_at) / window, 2)
+            }
+
+    @staticmethod
+    def probe_library(root_path: str, max_workers: Optional[int] = None) -> int:
+        """
+        Probe every media file under root_path that is not cached yet, blocking until done.
+        Used by `manage_registry.py probe-media`.
+
+        Returns:
+            int: Number of files probed
+        """
+        from app.services.media_duration_service import MediaDurationService
+
+        pending = []
+        for path in MediaProbeQueueService._find_media_files(root_path):
+            try:
+                key = MediaDurationService.cache_key(os.stat(path))
+            except OSError:
+                # Broken symlink, or deleted since the listing
+                continue
+            if MediaDurationService.get_cached_duration(key) is None:
+                pending.append(path)
+        if not pending:
+            return 0
+
+        probed = 0
+        with MediaProbeQueueService._create_pool(max_workers or Config.MEDIA_PROBE_WORKERS) as executor:
+            futures = {executor.submit(probe_media_file, path): path for path in pending}
+            for finished, future in enumerate(as_completed(futures), start=1):
+                try:
+                    MediaProbeQueueService._store_result(future.result(), invalidate=False)
+                    probed += 1
+                except Exception as e:
+                    print(f"Error probing {futures[future]}: {e}")
+                    MediaProbeQueueService._store_failure(futures[future], e, invalidate=False)
+                if finished % 100 == 0:
+                    print(f"  {finished}/{len(pending)} files, {probed} probed")
+                    MediaDurationService.save()
+
+        MediaDurationService.save()
+        return probed
+
+    @staticmethod
+    def _dispatch() -> None:
+        """Move queued files to the process pool, keeping a bounded number in flight."""
+        while not MediaProbeQueueService._stop_event.is_set():
+            try:
+                _, _, file_path = MediaProbeQueueService._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            MediaProbeQueueService._slots.acquire()
+            try:
+                future = MediaProbeQueueService._executor.submit(probe_media_file, file_path)
+            except RuntimeError:
+                # Pool shut down while dispatching
+                MediaProbeQueueService._slots.release()
+                break
+            future.add_done_callback(lambda f, path=file_path: MediaProbeQueueService._on_done(path, f))
+
+    @staticmethod
+    def _on_done(file_path: str, future) -> None:
+        MediaProbeQueueService._slots.release()
+        try:
+            MediaProbeQueueService._store_result(future.result(), invalidate=True)
+            outcome = "completed"
+        except Exception as e:
+            MediaProbeQueueService._store_failure(file_path, e, invalidate=True)
+            outcome = "failed"
+
+        with MediaProbeQueueService._lock:
+            MediaProbeQueueService._pending.pop(file_path, None)
+            MediaProbeQueueService._counters[outcome] += 1
+            MediaProbeQueueService._completed_at.append(time.time())
+
+    @staticmethod
+    def _store_result(result: Dict[str, Any], invalidate: bool) -> None:
+        from app.services.course_structure_service import CourseStructureService
+        from app.services.media_duration_service import MediaDurationService
+
+        MediaDurationService.store_duration(result["key"], result["path"], result["duration_seconds"], result["details"])
+        if invalidate:
+            # The lesson lives in a module or in the course root; its lessons are unchanged
+            CourseStructureService.invalidate_path(os.path.dirname(result["path"]), keep_lesson_sets=True)
+
+    @staticmethod
+    def _store_failure(file_path: str, error: Exception, invalidate: bool) -> None:
+        """
+        Cache a failed probe as a zero duration under the file's key, so the
+        same version of a broken file is not queued again on every structure build.
+        """
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            # Gone: nothing to retry
+            return
+
+        from app.services.media_duration_service import MediaDurationService
+
+        MediaProbeQueueService._store_result({
+            "path": file_path,
+            "key": MediaDurationService.cache_key(stat_result),
+            "duration_seconds": 0,
+            "details": {"probe_error": str(error) or type(error).__name__}
+        }, invalidate=invalidate)
+
+    @staticmethod
+    def _find_media_files(root_path: str) -> List[str]:
+        from app.services.media_duration_service import MediaDurationService
+
+        media_files = []
+        for directory, directories, files in os.walk(root_path):
+            directories[:] = [d for d in directories if not d.startswith('.')]
+            media_files.extend(
+                os.path.join(directory, name) for name in files
+                if not name.startswith('.') and MediaDurationService.is_media_file(name)
+            )
+        return sorted(media_files)
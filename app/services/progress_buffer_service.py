@@ -0,0 +1,153 @@
+import atexit
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from config import Config
+from app.utils.lru_cache import LruCache
+
+
+class ProgressBufferService:
+    """
+    Write-coalescing buffer for playback positions.
+
+    The player reports its position every few seconds. Positions are kept in
+    memory per (course, lesson), a report equal to the last one is dropped
+    (remembered for the MAX_TRACKED_LESSONS most recently reported lessons),
+    and the courses with pending positions are written once per
+    Config.PROGRESS_FLUSH_INTERVAL_SECONDS (0 writes through), before any
+    other progress change of the course (completion) and at interpreter exit.
+    A flushed report time never replaces a newer stored last access. Reads
+    through ProgressService see the pending positions.
+    """
+
+    _lock = threading.Lock()
+    # Serializes flushes, so an older batch of a course is never written after a newer one
+    _flush_lock = threading.Lock()
+    # course path -> lesson path -> (position seconds, reported at)
+    _pending: Dict[str, Dict[str, Tuple[float, str]]] = {}
+    # Lessons whose last reported position is kept to drop repeats
+    MAX_TRACKED_LESSONS = 4096
+
+    # (course path, lesson path) -> last reported position, least recently reported evicted first
+    _last_positions = LruCache(max_entries=MAX_TRACKED_LESSONS)
+    _timer: Optional[threading.Timer] = None
+    _atexit_registered = False
+    _stats = {"recorded": 0, "dropped": 0, "writes": 0}
+
+    @staticmethod
+    def record_position(course_path: str, lesson_path: str, position_seconds: float) -> bool:
+        """
+        Buffer a playback position.
+
+        Returns:
+            bool: False if the position equals the last one reported for the lesson
+        """
+        with ProgressBufferService._lock:
+            key = (course_path, lesson_path)
+            if ProgressBufferService._last_positions.get(key) == position_seconds:
+                ProgressBufferService._stats["dropped"] += 1
+                return False
+
+            ProgressBufferService._last_positions.put(key, position_seconds)
+            course_pending = ProgressBufferService._pending.setdefault(course_path, {})
+            course_pending[lesson_path] = (position_seconds, datetime.now().isoformat())
+            ProgressBufferService._stats["recorded"] += 1
+            write_through = Config.PROGRESS_FLUSH_INTERVAL_SECONDS <= 0
+            if not write_through:
+                ProgressBufferService._schedule_flush()
+
+        if write_through:
+            ProgressBufferService.flush_course(course_path)
+        return True
+
+    @staticmethod
+    def apply_pending(course_path: str, progress_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Overlay the buffered positions of a course on progress data loaded from disk."""
+        with ProgressBufferService._lock:
+            pending = dict(ProgressBufferService._pending.get(course_path, {}))
+
+        lessons = progress_data.setdefault("lessons", {}) if pending else {}
+        for lesson_path, (position_seconds, reported_at) in pending.items():
+            lesson = lessons.setdefault(lesson_path, {"completed": False, "last_accessed_at": None})
+            lesson["last_position_seconds"] = position_seconds
+            lesson["last_accessed_at"] = max(lesson.get("last_accessed_at") or reported_at, reported_at)
+        return progress_data
+
+    @staticmethod
+    def flush_course(course_path: str) -> None:
+        """Write the buffered positions of one course, in one write."""
+        from app.services.progress_service import ProgressService
+
+        with ProgressBufferService._flush_lock:
+            with ProgressBufferService._lock:
+                positions = ProgressBufferService._pending.pop(course_path, None)
+            if not positions:
+                return
+
+            try:
+                ProgressService(course_path).update_playback_positions(positions)
+                with ProgressBufferService._lock:
+                    ProgressBufferService._stats["writes"] += 1
+            except IOError as e:
+                print(f"Error writing playback positions of {course_path}: {e}")
+                with ProgressBufferService._lock:
+                    # Keep them for the next flush unless newer ones arrived meanwhile
+                    course_pending = ProgressBufferService._pending.setdefault(course_path, {})
+                    for lesson_path, position in positions.items():
+                        course_pending.setdefault(lesson_path, position)
+                    ProgressBufferService._schedule_flush()
+
+    @staticmethod
+    def flush_all() -> None:
+        """Write the buffered positions of every course, used by the timer and at interpreter exit."""
+        with ProgressBufferService._lock:
+            if ProgressBufferService._timer is not None:
+                ProgressBufferService._timer.cancel()
+                ProgressBufferService._timer = None
+            course_paths = list(ProgressBufferService._pending)
+
+        for course_path in course_paths:
+            ProgressBufferService.flush_course(course_path)
+
+    @staticmethod
+    def forget(course_path: str, lesson_path: str) -> None:
+        """Forget the last reported position of a lesson after it was written another way."""
+        with ProgressBufferService._lock:
+            ProgressBufferService._last_positions.pop((course_path, lesson_path))
+
+    @staticmethod
+    def get_stats() -> Dict[str, Any]:
+        """Positions recorded and dropped, progress writes made, and courses with pending positions."""
+        with ProgressBufferService._lock:
+            stats = dict(ProgressBufferService._stats)
+            stats["pending_courses"] = len(ProgressBufferService._pending)
+        return stats
+
+    @staticmethod
+    def reset() -> None:
+        """Write pending positions and forget the buffer state."""
+        ProgressBufferService.flush_all()
+        with ProgressBufferService._lock:
+            ProgressBufferService._last_positions.clear()
+            ProgressBufferService._stats = {"recorded": 0, "dropped": 0, "writes": 0}
+
+    @staticmethod
+    def _schedule_flush() -> None:
+        """Start the flush timer unless one is pending. Called with the lock held."""
+        if ProgressBufferService._timer is None:
+            # Write-through mode only gets here to retry a failed write
+            delay = max(Config.PROGRESS_FLUSH_INTERVAL_SECONDS, 1)
+            timer = threading.Timer(delay, ProgressBufferService._flush_on_timer)
+            timer.daemon = True
+            ProgressBufferService._timer = timer
+            timer.start()
+
+        if not ProgressBufferService._atexit_registered:
+            atexit.register(ProgressBufferService.flush_all)
+            ProgressBufferService._atexit_registered = True
+
+    @staticmethod
+    def _flush_on_timer() -> None:
+        with ProgressBufferService._lock:
+            ProgressBufferService._timer = None
+        ProgressBufferService.flush_all()
@@ -0,0 +1,418 @@
+import os
+import queue
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from config import Config
+from app.models.course_model import NodeType
+from app.utils.directory_scanner import DirectoryScanner
+
+
+class _CourseCounters:
+    """Lessons and completed lessons of one tracked course."""
+    __slots__ = ("lesson_paths", "completed_paths", "completed", "total")
+
+    def __init__(self, lesson_paths: FrozenSet[str], completed_paths: Set[str]):
+        self.lesson_paths = lesson_paths
+        # May name lessons that no longer exist; only the intersection is counted
+        self.completed_paths = completed_paths
+        self.total = len(lesson_paths)
+        self.completed = len(lesson_paths.intersection(completed_paths))
+
+
+class ProgressRollupService:
+    """
+    (completed, total) lesson counters per course, summed up the directory
+    hierarchy so the progress of a directory is one dictionary lookup.
+
+    The first read of a directory seeds it on a background thread: the
+    courses below it are discovered on disk (with the cached content type
+    verdicts, so directories nobody browsed yet count too) and tracked. From
+    then on completion changes made through ProgressService and rebuilt
+    lesson sets update the course and add the difference to each ancestor,
+    O(depth). Seeded directories whose entries changed are seeded again and
+    lesson sets dropped by cache invalidation are rebuilt, both in the
+    background. Changed directories are reported by the filesystem watcher;
+    without it, a read checks the directories below it on the background
+    thread, at most once per Config.PROGRESS_ROLLUP_REVALIDATE_SECONDS.
+    While any of this work is queued or running below a directory, it has no
+    counts. Changes written by other processes are picked up when the
+    course's completion is next computed.
+    """
+
+    _lock = threading.RLock()
+    _courses: Dict[str, _CourseCounters] = {}
+    # directory path -> [completed, total] over the tracked courses below it
+    _directories: Dict[str, List[int]] = {}
+    # Seeded directory -> the directories below it (itself included) whose courses are all tracked
+    _seeded: Dict[str, FrozenSet[str]] = {}
+    # mtime of every seeded directory when it was last discovered
+    _mtimes: Dict[str, int] = {}
+    # Last time each directory was checked against disk (monotonic)
+    _revalidated_at: Dict[str, float] = {}
+    # Tracked courses whose lesson set was dropped and must be rebuilt
+    _stale: Set[str] = set()
+    # directory path -> number of stale courses below it
+    _stale_below: Dict[str, int] = {}
+
+    # Background seeding: (job, path) items run in order by one daemon thread
+    _jobs: "queue.Queue" = queue.Queue()
+    _scheduled: Set[Tuple[str, str]] = set()
+    _worker: Optional[threading.Thread] = None
+    # directory path -> number of queued or running jobs changing the counts at or below it
+    _pending: Dict[str, int] = {}
+    # Jobs that change counts, as opposed to "revalidate", which only schedules them
+    COUNTING_JOBS = ("seed", "track", "refresh")
+
+    @staticmethod
+    def track_course(course_path: str, lesson_paths: FrozenSet[str], completed_paths: Iterable[str]) -> None:
+        """Set the lessons and completed lessons of a course, tracking it if needed."""
+        counters = _CourseCounters(lesson_paths, set(completed_paths))
+        with ProgressRollupService._lock:
+            ProgressRollupService._set_stale(course_path, False)
+            ProgressRollupService._replace(course_path, counters)
+
+    @staticmethod
+    def lesson_set_changed(course_path: str, lesson_paths: FrozenSet[str]) -> None:
+        """Recount a tracked course after its lessons were added or removed."""
+        with ProgressRollupService._lock:
+            ProgressRollupService._set_stale(course_path, False)
+            counters = ProgressRollupService._courses.get(course_path)
+            if counters is not None and counters.lesson_paths != lesson_paths:
+                ProgressRollupService._replace(course_path, _CourseCounters(lesson_paths, counters.completed_paths))
+
+    @staticmethod
+    def lesson_set_dropped(course_path: str) -> None:
+        """Mark a tracked course for a lesson set rebuild before its directories are read again."""
+        with ProgressRollupService._lock:
+            if course_path in ProgressRollupService._courses:
+                ProgressRollupService._set_stale(course_path, True)
+
+    @staticmethod
+    def all_lesson_sets_dropped() -> None:
+        """Mark every tracked course for a lesson set rebuild."""
+        with ProgressRollupService._lock:
+            for course_path in ProgressRollupService._courses:
+                ProgressRollupService._set_stale(course_path, True)
+
+    @staticmethod
+    def completion_changed(course_path: str, lesson_path: str, completed: bool) -> None:
+        """Apply a lesson completion change to a tracked course."""
+        with ProgressRollupService._lock:
+            counters = ProgressRollupService._courses.get(course_path)
+            if counters is None or (lesson_path in counters.completed_paths) == completed:
+                return
+
+            if completed:
+                counters.completed_paths.add(lesson_path)
+            else:
+                counters.completed_paths.discard(lesson_path)
+            if lesson_path in counters.lesson_paths:
+                delta = 1 if completed else -1
+                counters.completed += delta
+                ProgressRollupService._add_to_ancestors(course_path, delta, 0)
+
+    @staticmethod
+    def course_discovered(course_path: str) -> None:
+        """A course was registered: track it in the background if a directory above it is seeded."""
+        with ProgressRollupService._lock:
+            if course_path in ProgressRollupService._courses:
+                return
+            if not any(directory in ProgressRollupService._seeded
+                       for directory in ProgressRollupService._ancestors(course_path)):
+                return
+        ProgressRollupService._schedule("track", course_path)
+
+    @staticmethod
+    def directory_changed(directory_path: str) -> None:
+        """The entries of a directory changed: seed it again in the background if it is seeded."""
+        with ProgressRollupService._lock:
+            if directory_path not in ProgressRollupService._seeded:
+                return
+        ProgressRollupService._schedule("seed", directory_path)
+
+    @staticmethod
+    def all_directories_changed() -> None:
+        """Events were lost: seed every seeded directory again in the background."""
+        with ProgressRollupService._lock:
+            seeded = set(ProgressRollupService._seeded)
+        for directory in sorted(seeded):
+            if not any(ancestor in seeded for ancestor in ProgressRollupService._ancestors(directory)):
+                ProgressRollupService._schedule("seed", directory)
+
+    @staticmethod
+    def remove_tree(path: str) -> None:
+        """Stop tracking the course at path and every course below it."""
+        prefix = path.rstrip(os.sep) + os.sep
+        with ProgressRollupService._lock:
+            removed = [course_path for course_path in ProgressRollupService._courses
+                       if course_path == path or course_path.startswith(prefix)]
+            for course_path in removed:
+                ProgressRollupService._replace(course_path, None)
+                ProgressRollupService._set_stale(course_path, False)
+
+    @staticmethod
+    def get_counts(directory_path: str) -> Optional[Tuple[int, int]]:
+        """
+        (completed, total) lessons of the courses below a directory, or None
+        while it is being seeded or a reseed or lesson set rebuild below it
+        is pending. O(1) on the calling thread: all disk access is scheduled.
+        """
+        from app.services.course_structure_service import CourseStructureService
+
+        with ProgressRollupService._lock:
+            seeded = directory_path in ProgressRollupService._seeded
+            has_stale = directory_path in ProgressRollupService._stale_below
+            revalidate = False
+            if seeded and CourseStructureService.revalidation_enabled():
+                now = time.monotonic()
+                last = ProgressRollupService._revalidated_at.get(directory_path)
+                if last is None or now - last >= Config.PROGRESS_ROLLUP_REVALIDATE_SECONDS:
+                    ProgressRollupService._revalidated_at[directory_path] = now
+                    revalidate = True
+
+        if not seeded:
+            ProgressRollupService._schedule("seed", directory_path)
+            return None
+        if revalidate:
+            ProgressRollupService._schedule("revalidate", directory_path)
+        if has_stale:
+            ProgressRollupService._schedule("refresh", directory_path)
+
+        with ProgressRollupService._lock:
+            if ProgressRollupService._pending.get(directory_path):
+                return None
+            counts = ProgressRollupService._directories.get(directory_path)
+        return (counts[0], counts[1]) if counts else (0, 0)
+
+    @staticmethod
+    def get_progress_percent(directory_path: str) -> Optional[float]:
+        """Completion percentage of all lessons below a directory, None while its counts are pending."""
+        counts = ProgressRollupService.get_counts(directory_path)
+        if counts is None:
+            return None
+        completed, total = counts
+        return round(completed / total * 100, 2) if total > 0 else 0.0
+
+    @staticmethod
+    def seed(directory_path: str) -> None:
+        """
+        Discover the courses below a directory on disk and track the ones not
+        tracked yet, blocking. Tracked courses below it that are no longer
+        there are dropped. Runs on the background thread for get_counts().
+        """
+        from app.services.content_detection_service import ContentDetectionService
+
+        courses = []
+        directories = []
+        mtimes = {}
+        pending = [directory_path]
+        while pending:
+            current = pending.pop()
+            try:
+                listing = DirectoryScanner.list_directory(current, with_mtime=True)
+            except OSError:
+                continue
+            directories.append(current)
+            mtimes[current] = listing.mtime_ns
+            for child in sorted(listing.directory_paths()):
+                node_type = ContentDetectionService.detect_content_type(child)
+                if node_type == NodeType.COURSE:
+                    courses.append(child)
+                elif node_type == NodeType.DIRECTORY:
+                    pending.append(child)
+
+        prefix = directory_path.rstrip(os.sep) + os.sep
+        discovered = set(courses)
+        with ProgressRollupService._lock:
+            gone = [path for path in ProgressRollupService._courses
+                    if path.startswith(prefix) and path not in discovered]
+        for course_path in gone:
+            ProgressRollupService.remove_tree(course_path)
+
+        for course_path in courses:
+            with ProgressRollupService._lock:
+                if course_path in ProgressRollupService._courses:
+                    continue
+            ProgressRollupService._track_from_disk(course_path)
+        ProgressRollupService._refresh_stale(directory_path)
+
+        seeded_at = time.monotonic()
+        with ProgressRollupService._lock:
+            for directory in list(ProgressRollupService._seeded):
+                if directory == directory_path or directory.startswith(prefix):
+                    del ProgressRollupService._seeded[directory]
+                    ProgressRollupService._mtimes.pop(directory, None)
+                    ProgressRollupService._revalidated_at.pop(directory, None)
+            ProgressRollupService._mtimes.update(mtimes)
+            ProgressRollupService._revalidated_at.update(dict.fromkeys(directories, seeded_at))
+            for directory in directories:
+                below = directory.rstrip(os.sep) + os.sep
+                ProgressRollupService._seeded[directory] = frozenset(
+                    path for path in directories if path == directory or path.startswith(below)
+                )
+            # Seeded directories above it now include the rediscovered subtree
+            for directory in ProgressRollupService._ancestors(directory_path):
+                subtree = ProgressRollupService._seeded.get(directory)
+                if subtree is not None:
+                    ProgressRollupService._seeded[directory] = frozenset(
+                        path for path in subtree if path != directory_path and not path.startswith(prefix)
+                    ) | frozenset(directories)
+
+    @staticmethod
+    def wait_for_background() -> None:
+        """Block until the scheduled seeding and lesson set rebuilds are done."""
+        ProgressRollupService._jobs.join()
+
+    @staticmethod
+    def reset() -> None:
+        """Finish the background work, then forget every tracked course."""
+        ProgressRollupService.wait_for_background()
+        with ProgressRollupService._lock:
+            ProgressRollupService._courses = {}
+            ProgressRollupService._directories = {}
+            ProgressRollupService._seeded = {}
+            ProgressRollupService._mtimes = {}
+            ProgressRollupService._revalidated_at = {}
+            ProgressRollupService._stale = set()
+            ProgressRollupService._stale_below = {}
+
+    @staticmethod
+    def _replace(course_path: str, counters: Optional[_CourseCounters]) -> None:
+        """Swap the counters of a course and add the difference up the hierarchy. Called with the lock held."""
+        previous = ProgressRollupService._courses.pop(course_path, None)
+        if counters is not None:
+            ProgressRollupService._courses[course_path] = counters
+
+        completed_delta = (counters.completed if counters else 0) - (previous.completed if previous else 0)
+        total_delta = (counters.total if counters else 0) - (previous.total if previous else 0)
+        if completed_delta or total_delta:
+            ProgressRollupService._add_to_ancestors(course_path, completed_delta, total_delta)
+
+    @staticmethod
+    def _add_to_ancestors(course_path: str, completed_delta: int, total_delta: int) -> None:
+        directories = ProgressRollupService._directories
+        for directory in ProgressRollupService._ancestors(course_path):
+            counts = directories.setdefault(directory, [0, 0])
+            counts[0] += completed_delta
+            counts[1] += total_delta
+            if counts == [0, 0]:
+                del directories[directory]
+
+    @staticmethod
+    def _ancestors(path: str) -> List[str]:
+        """Parent directories of path, up to the library root (or the filesystem root)."""
+        root = Config.COURSES_ROOT_DIRECTORY_ABS_PATH.rstrip(os.sep)
+        ancestors = []
+        current = os.path.dirname(path)
+        while True:
+            ancestors.append(current)
+            parent = os.path.dirname(current)
+            if current == root or parent == current:
+                return ancestors
+            current = parent
+
+    @staticmethod
+    def _set_stale(course_path: str, stale: bool) -> None:
+        """Mark or unmark a course for a lesson set rebuild, counted on its ancestors. Called with the lock held."""
+        if (course_path in ProgressRollupService._stale) == stale:
+            return
+        if stale:
+            ProgressRollupService._stale.add(course_path)
+        else:
+            ProgressRollupService._stale.discard(course_path)
+        ProgressRollupService._count_below(ProgressRollupService._stale_below, course_path, 1 if stale else -1)
+
+    @staticmethod
+    def _count_below(counts: Dict[str, int], path: str, delta: int) -> None:
+        """Add delta to the count of every ancestor of path. Called with the lock held."""
+        for directory in ProgressRollupService._ancestors(path):
+            count = counts.get(directory, 0) + delta
+            if count:
+                counts[directory] = count
+            else:
+                del counts[directory]
+
+    @staticmethod
+    def _revalidate(directory_path: str) -> None:
+        """Seed again the directories below a seeded one whose mtime changed since they were discovered."""
+        with ProgressRollupService._lock:
+            mtimes = {directory: ProgressRollupService._mtimes.get(directory)
+                      for directory in ProgressRollupService._seeded.get(directory_path, ())}
+
+        changed = set()
+        for directory, recorded in mtimes.items():
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            if mtime_ns != recorded:
+                changed.add(directory)
+
+        for directory in sorted(changed):
+            # A reseed of a changed ancestor covers it
+            if not any(ancestor in changed for ancestor in ProgressRollupService._ancestors(directory)):
+                ProgressRollupService._schedule("seed", directory)
+
+    @staticmethod
+    def _track_from_disk(course_path: str) -> None:
+        """Track a course with its lesson set and the completed lessons on record."""
+        from app.services.course_structure_service import CourseStructureService
+        from app.services.progress_service import ProgressService
+
+        lesson_set = CourseStructureService.get_lesson_set(course_path)
+        ProgressRollupService.track_course(
+            course_path, lesson_set.lesson_paths, ProgressService(course_path).get_completed_lessons()
+        )
+
+    @staticmethod
+    def _refresh_stale(directory_path: str) -> None:
+        """Rebuild the dropped lesson sets of tracked courses below a directory."""
+        from app.services.course_structure_service import CourseStructureService
+
+        prefix = directory_path.rstrip(os.sep) + os.sep
+        with ProgressRollupService._lock:
+            stale = [path for path in ProgressRollupService._stale if path.startswith(prefix)]
+        for course_path in stale:
+            # Reports the rebuilt set through lesson_set_changed
+            CourseStructureService.get_lesson_set(course_path)
+
+    @staticmethod
+    def _schedule(job: str, path: str) -> None:
+        """Queue a background job unless the same one is already queued."""
+        with ProgressRollupService._lock:
+            if (job, path) in ProgressRollupService._scheduled:
+                return
+            ProgressRollupService._scheduled.add((job, path))
+            if job in ProgressRollupService.COUNTING_JOBS:
+                # Counted on path itself as well as on its ancestors
+                ProgressRollupService._count_below(ProgressRollupService._pending, os.path.join(path, ""), 1)
+            worker = ProgressRollupService._worker
+            if worker is None or not worker.is_alive():
+                worker = threading.Thread(target=ProgressRollupService._work, name="progress-rollup", daemon=True)
+                ProgressRollupService._worker = worker
+                worker.start()
+        ProgressRollupService._jobs.put((job, path))
+
+    @staticmethod
+    def _work() -> None:
+        jobs = {
+            "seed": ProgressRollupService.seed,
+            "track": ProgressRollupService._track_from_disk,
+            "refresh": ProgressRollupService._refresh_stale,
+            "revalidate": ProgressRollupService._revalidate
+        }
+        while True:
+            job, path = ProgressRollupService._jobs.get()
+            # Changes arriving while the job runs schedule it again
+            with ProgressRollupService._lock:
+                ProgressRollupService._scheduled.discard((job, path))
+            try:
+                jobs[job](path)
+            except Exception as e:
+                print(f"Error updating progress rollups ({job} {path}): {e}")
+            finally:
+                if job in ProgressRollupService.COUNTING_JOBS:
+                    with ProgressRollupService._lock:
+                        ProgressRollupService._count_below(ProgressRollupService._pending, os.path.join(path, ""), -1)
+                ProgressRollupService._jobs.task_done()
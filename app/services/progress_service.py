@@ -1,21 +1,92 @@
+import os
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set, Tuple
+from config import Config
 from app.repositories.progress_repository import ProgressRepository
+from app.repositories.sqlite_progress_repository import SqliteProgressRepository
 from app.models.lesson_progress_model import LessonProgress
+from app.services.progress_buffer_service import ProgressBufferService
+from app.services.progress_rollup_service import ProgressRollupService
 
 
 class ProgressService:
     """Service for managing course progress and lesson completion."""
 
-    def __init__(self, course_directory: str):
-        self.repository = ProgressRepository(course_directory)
+    def __init__(self, course_directory: str, repository=None):
+        if repository is not None:
+            self.repository = repository
+        elif Config.PROGRESS_BACKEND == "sqlite":
+            self.repository = SqliteProgressRepository(course_directory)
+        else:
+            self.repository = ProgressRepository(course_directory)
+
+    @staticmethod
+    def get_recent_lessons(course_paths: List[str], limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Most recently accessed lessons across courses, newest first.
+
+        Args:
+            course_paths: Courses to look at; the SQLite backend answers for
+                every course from its index and ignores them
+            limit: Maximum number of lessons
+
+        Returns:
+            List[Dict[str, Any]]: course_path, lesson_path, completed,
+            last_position_seconds and last_accessed_at of each lesson
+        """
+        if Config.PROGRESS_BACKEND == "sqlite":
+            # Buffered positions are written first, so the index sees them
+            ProgressBufferService.flush_all()
+            return SqliteProgressRepository(None).get_recent_lessons(limit)
+
+        lessons = []
+        for course_path in course_paths:
+            service = ProgressService(course_path)
+            if not service.repository.has_progress():
+                continue
+            for lesson_path, lesson in service.get_progress().get("lessons", {}).items():
+                if lesson.get("last_accessed_at"):
+                    lessons.append({
+                        "course_path": course_path,
+                        "lesson_path": lesson_path,
+                        "completed": lesson.get("completed", False),
+                        "last_position_seconds": lesson.get("last_position_seconds", 0.0),
+                        "last_accessed_at": lesson["last_accessed_at"]
+                    })
+        lessons.sort(key=lambda lesson: lesson["last_accessed_at"], reverse=True)
+        return lessons[:limit]
+
+    @staticmethod
+    def import_to_sqlite(course_paths: List[str], database_path: str = None) -> int:
+        """
+        Copy the per-course progress files into the SQLite progress store,
+        replacing what it holds for those courses.
+
+        Args:
+            course_paths: Courses whose progress files are imported
+            database_path: SQLite database, defaults to Config.PROGRESS_SQLITE_PATH
+
+        Returns:
+            int: Number of courses imported
+        """
+        imported = 0
+        for course_path in course_paths:
+            json_repository = ProgressRepository(course_path)
+            if not json_repository.has_progress():
+                continue
+            data = json_repository.load()
+            if data is None:
+                continue
+            SqliteProgressRepository(course_path, database_path).replace_progress(data)
+            imported += 1
+        return imported
 
     def get_progress(self) -> Dict[str, Any]:
-        """Load all progress data for the course."""
+        """Load all progress data for the course, including buffered playback positions."""
         data = self.repository.load()
         if not data:
-            return self._create_default_progress()
-        return data
+            data = self._create_default_progress()
+        return ProgressBufferService.apply_pending(self.repository.course_directory, data)
 
     def get_lesson_progress(self, lesson_path: str) -> Optional[LessonProgress]:
         """Get progress for a specific lesson."""
@@ -40,30 +111,32 @@ class ProgressService:
         last_position_seconds: Optional[float] = None
     ) -> bool:
         """Update progress for a specific lesson."""
-        progress_data = self.get_progress()
-
-        if "lessons" not in progress_data:
-            progress_data["lessons"] = {}
-
-        if lesson_path not in progress_data["lessons"]:
-            progress_data["lessons"][lesson_path] = {
-                "completed": False,
-                "last_position_seconds": 0.0,
-                "last_accessed_at": None
-            }
+        # Buffered positions are written first, so they cannot overwrite this change later
+        ProgressBufferService.flush_course(self.repository.course_directory)
+        if last_position_seconds is not None:
+            ProgressBufferService.forget(self.repository.course_directory, lesson_path)
 
-        lesson_data = progress_data["lessons"][lesson_path]
+        lesson_fields = {"last_accessed_at": datetime.now().isoformat()}
 
         if completed is not None:
-            lesson_data["completed"] = completed
+            lesson_fields["completed"] = completed
 
         if last_position_seconds is not None:
-            lesson_data["last_position_seconds"] = last_position_seconds
-
-        lesson_data["last_accessed_at"] = datetime.now().isoformat()
-        progress_data["last_updated_at"] = datetime.now().isoformat()
+            lesson_fields["last_position_seconds"] = last_position_seconds
 
-        return self.repository.save(progress_data)
+        # Merged into the latest file under its lock, so concurrent workers keep
+        # each other's fields; a single journal append when the file is journaled
+        success = self.repository.append_changes([
+            {
+                "merge": ["lessons", lesson_path],
+                "value": lesson_fields,
+                "defaults": {"completed": False, "last_position_seconds": 0.0, "last_accessed_at": None}
+            },
+            {"set": ["last_updated_at"], "value": datetime.now().isoformat()}
+        ])
+        if success and completed is not None:
+            ProgressRollupService.completion_changed(self.repository.course_directory, lesson_path, completed)
+        return success
 
     def mark_lesson_completed(self, lesson_path: str) -> bool:
         """Mark a lesson as completed."""
@@ -77,22 +150,145 @@ class ProgressService:
         """Update the playback position for a video/audio lesson."""
         return self.update_lesson_progress(lesson_path, last_position_seconds=position_seconds)
 
-    def get_course_completion_stats(self) -> Dict[str, Any]:
-        """Get overall completion statistics for the course."""
-        from app.services.content_detection_service import ContentDetectionService
+    def update_playback_positions(self, positions: Dict[str, Tuple[float, str]]) -> bool:
+        """
+        Write several playback positions in one write.
 
-        progress_data = self.get_progress()
-        progress_lessons = progress_data.get("lessons", {})
+        Args:
+            positions: lesson path -> (position in seconds, ISO time it was reported)
+        """
+        changes = [
+            {
+                "merge": ["lessons", lesson_path],
+                "value": {"last_position_seconds": position_seconds, "last_accessed_at": reported_at},
+                "defaults": {"completed": False},
+                # Reported before the flush: a newer access written meanwhile (e.g. completion) wins
+                "latest": ["last_accessed_at"]
+            }
+            for lesson_path, (position_seconds, reported_at) in positions.items()
+        ]
+        changes.append({"set": ["last_updated_at"], "value": datetime.now().isoformat()})
+        return self.repository.append_changes(changes)
+
+    def apply_operations(self, operations: List[Dict[str, Any]]) -> int:
+        """
+        Apply a batch of lesson operations in order, in one write.
+
+        Args:
+            operations: dicts with an "op" of "position" (with lesson_path and
+                position_seconds), "complete" or "incomplete" (with lesson_path),
+                or "complete_module" (with module, the module directory name)
+
+        Returns:
+            int: Number of lesson changes written
+
+        Raises:
+            ValueError: If an operation is malformed or names an unknown module;
+                nothing is written then
+        """
+        return self.write_prepared_operations(self.prepare_operations(operations))
+
+    def prepare_operations(self, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Validate a batch of lesson operations (see apply_operations) and turn it
+        into repository changes, without writing anything.
+
+        Raises:
+            ValueError: If an operation is malformed or names an unknown module
+        """
+        now = datetime.now().isoformat()
+        changes = []
+        for operation in operations:
+            for lesson_path, fields in self._operation_fields(operation):
+                fields["last_accessed_at"] = now
+                changes.append({
+                    "merge": ["lessons", lesson_path],
+                    "value": fields,
+                    "defaults": {"completed": False, "last_position_seconds": 0.0, "last_accessed_at": None}
+                })
+        return changes
+
+    def write_prepared_operations(self, changes: List[Dict[str, Any]]) -> int:
+        """
+        Write the changes of prepare_operations in one write.
+
+        Returns:
+            int: Number of lesson changes written
+        """
+        if not changes:
+            return 0
 
-        # Get actual total lesson count from the course
         course_directory = self.repository.course_directory
-        modules = ContentDetectionService.scan_course_modules(course_directory)
-        root_lessons = ContentDetectionService.scan_course_lessons(course_directory)
+        # Buffered positions are written first, so they cannot overwrite this batch later
+        ProgressBufferService.flush_course(course_directory)
+        for change in changes:
+            if "last_position_seconds" in change["value"]:
+                ProgressBufferService.forget(course_directory, change["merge"][1])
+
+        now = datetime.now().isoformat()
+        if not self.repository.append_changes(changes + [{"set": ["last_updated_at"], "value": now}]):
+            raise IOError(f"Failed to write progress of {course_directory}")
+        for change in changes:
+            if "completed" in change["value"]:
+                ProgressRollupService.completion_changed(
+                    course_directory, change["merge"][1], change["value"]["completed"]
+                )
+        return len(changes)
+
+    def _operation_fields(self, operation: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """(lesson path, fields to merge) pairs of one batch operation."""
+        if not isinstance(operation, dict):
+            raise ValueError("Each operation must be an object")
 
-        total_lessons = sum(len(module.lessons) for module in modules) + len(root_lessons)
+        op = operation.get("op")
+        if op == "complete_module":
+            from app.services.course_structure_service import CourseStructureService
 
-        # Count completed lessons from progress data
-        completed_lessons = sum(1 for lesson in progress_lessons.values() if lesson.get("completed", False))
+            course_directory = self.repository.course_directory
+            module_name = operation.get("module")
+            module = CourseStructureService.get_module(course_directory, module_name) if module_name else None
+            if module is None:
+                raise ValueError(f"Module not found: {module_name}")
+            return [
+                (os.path.relpath(lesson.file_path, course_directory), {"completed": True})
+                for lesson in module.lessons
+            ]
+
+        lesson_path = operation.get("lesson_path")
+        if not lesson_path or not isinstance(lesson_path, str):
+            raise ValueError(f"lesson_path is required for '{op}'")
+
+        if op == "position":
+            position_seconds = operation.get("position_seconds")
+            if isinstance(position_seconds, bool) or not isinstance(position_seconds, (int, float)):
+                raise ValueError("position_seconds is required for 'position'")
+            return [(lesson_path, {"last_position_seconds": float(position_seconds)})]
+        if op == "complete":
+            return [(lesson_path, {"completed": True})]
+        if op == "incomplete":
+            return [(lesson_path, {"completed": False})]
+        raise ValueError(f"Unknown operation: {op}")
+
+    def get_completed_lessons(self) -> Set[str]:
+        """Relative paths of the lessons marked as completed."""
+        return self.repository.get_completed_lessons()
+
+    def get_course_completion_stats(self) -> Dict[str, Any]:
+        """
+        Get overall completion statistics for the course.
+
+        Completed lessons are counted against the indexed lesson set of the
+        course, so lessons deleted since they were completed are not counted.
+        """
+        from app.services.course_structure_service import CourseStructureService
+
+        course_directory = self.repository.course_directory
+        lesson_set = CourseStructureService.get_lesson_set(course_directory)
+        completed_paths = self.get_completed_lessons()
+        total_lessons = lesson_set.count
+        completed_lessons = lesson_set.count_completed(completed_paths)
+        # Also picks up completions written by other processes
+        ProgressRollupService.track_course(course_directory, lesson_set.lesson_paths, completed_paths)
 
         completion_percentage = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0.0
 
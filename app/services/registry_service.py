@@ -1,51 +1,34 @@
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Optional, Any
+from config import Config
 from app.models.course_model import NodeType
-from app.repositories.registry_repository import RegistryRepository
+from app.repositories.registry_repository import REGISTRY_SECTIONS, RegistryRepository
+from app.repositories.sqlite_registry_repository import SqliteRegistryRepository
+from app.services.progress_rollup_service import ProgressRollupService
+from app.utils.text_formatter import TextFormatter
 
 
 class RegistryService:
     """Unified service to manage the registry for both directories and courses with their metadata and node types."""
 
-    def __init__(self):
-        self.repository = RegistryRepository()
+    def __init__(self, repository=None):
+        if repository is not None:
+            self.repository = repository
+        elif Config.REGISTRY_BACKEND == "sqlite":
+            self.repository = SqliteRegistryRepository()
+        else:
+            self.repository = RegistryRepository()
         self._ensure_registry_exists()
 
     def _ensure_registry_exists(self) -> None:
-        """Ensure the registry file exists with proper structure."""
+        """Ensure the registry exists with proper structure."""
         if not self.repository.exists():
-            self._create_empty_registry()
+            self.repository.ensure_exists()
 
     def _create_empty_registry(self) -> None:
-        """Create an empty registry file."""
-        registry_data = {
-            "directories": {},
-            "courses": {},
-            "metadata": {
-                "version": "1.0",
-                "last_updated": None,
-                "description": "Unified registry for directories and courses with their metadata and node types"
-            }
-        }
-        self._save_registry(registry_data)
-
-    def _load_registry(self) -> Dict[str, Any]:
-        """Load the registry from file."""
-        try:
-            data = self.repository.load()
-            if not data:
-                self._create_empty_registry()
-                return self._load_registry()
-            return data
-        except IOError:
-            self._create_empty_registry()
-            return self._load_registry()
-
-    def _save_registry(self, registry_data: Dict[str, Any]) -> None:
-        """Save the registry to file."""
-        registry_data["metadata"]["last_updated"] = datetime.now().isoformat()
-        self.repository.save(registry_data)
+        """Create an empty registry."""
+        self.repository.clear()
 
     def _get_registry_section(self, node_type: NodeType) -> str:
         """Get the appropriate registry section based on node type."""
@@ -59,21 +42,16 @@ class RegistryService:
 
     def is_registered(self, title: str, path: str, node_type: NodeType) -> bool:
         """Check if an item is already registered."""
-        registry_data = self._load_registry()
-        section = self._get_registry_section(node_type)
-        registry_key = f"{title}|{path}"
-        return registry_key in registry_data[section]
+        return self.get_registry_entry(title, path, node_type) is not None
 
     def get_registry_entry(self, title: str, path: str, node_type: NodeType) -> Optional[Dict[str, Any]]:
         """Get registry entry for an item."""
-        registry_data = self._load_registry()
         section = self._get_registry_section(node_type)
         registry_key = f"{title}|{path}"
-        return registry_data[section].get(registry_key)
+        return self.repository.get_entry(section, registry_key)
 
     def register_item(self, title: str, path: str, node_type: NodeType) -> Dict[str, Any]:
         """Register a new item in the registry."""
-        registry_data = self._load_registry()
         section = self._get_registry_section(node_type)
         registry_key = f"{title}|{path}"
 
@@ -85,79 +63,122 @@ class RegistryService:
             "last_accessed": datetime.now().isoformat()
         }
 
-        registry_data[section][registry_key] = entry
-        self._save_registry(registry_data)
+        self.repository.set_entry(section, registry_key, entry)
+        if node_type == NodeType.COURSE:
+            ProgressRollupService.course_discovered(path)
 
         return entry
 
     def update_last_accessed(self, title: str, path: str, node_type: NodeType) -> None:
-        """Update the last accessed timestamp for an item."""
-        registry_data = self._load_registry()
+        """
+        Record an access to an item. The stored timestamp is written at most once
+        per Config.REGISTRY_ACCESS_FLUSH_SECONDS per item.
+        """
         section = self._get_registry_section(node_type)
-        registry_key = f"{title}|{path}"
+        self.repository.record_access(section, f"{title}|{path}", datetime.now())
 
-        if registry_key in registry_data[section]:
-            registry_data[section][registry_key]["last_accessed"] = datetime.now().isoformat()
-            self._save_registry(registry_data)
+    def get_access_stats(self, limit: int = 0) -> list[Dict[str, Any]]:
+        """Hit counts of registry items since the process started, most accessed first."""
+        return self.repository.get_access_stats(limit)
 
     def get_all_directories(self) -> Dict[str, Any]:
         """Get all directory registry entries."""
-        registry_data = self._load_registry()
-        return registry_data["directories"]
+        return self.repository.get_section("directories")
 
     def get_all_courses(self) -> Dict[str, Any]:
         """Get all course registry entries."""
-        registry_data = self._load_registry()
-        return registry_data["courses"]
+        return self.repository.get_section("courses")
 
     def get_directory_by_id(self, directory_id: str) -> Optional[Dict[str, Any]]:
         """Get a directory entry by its ID (directory name)."""
-        directories = self.get_all_directories()
-        for key, entry in directories.items():
-            # Extract directory name from path
-            directory_name = os.path.basename(entry["path"])
-            if directory_name == directory_id:
-                return entry
-        return None
+        return self.repository.find_by_id("directories", directory_id)
 
     def get_course_by_id(self, course_id: str) -> Optional[Dict[str, Any]]:
         """Get a course entry by its ID (course name)."""
-        courses = self.get_all_courses()
-        for key, entry in courses.items():
-            # Extract course name from path
-            course_name = os.path.basename(entry["path"])
-            if course_name == course_id:
-                return entry
-        return None
+        return self.repository.find_by_id("courses", course_id)
 
-    def cleanup_old_entries(self, days_threshold: int = 30) -> int:
-        """Remove entries that haven't been accessed for a specified number of days."""
-        registry_data = self._load_registry()
-        current_time = datetime.now()
-        removed_count = 0
+    def find_entry_by_path(self, path: str) -> Optional[Dict[str, Any]]:
+        """Get the registry entry registered for an absolute path, in either section."""
+        return self.repository.find_by_path(path)
+
+    def get_child_entries(self, parent_path: str) -> list[Dict[str, Any]]:
+        """Get the registry entries whose path is a direct child of parent_path."""
+        return self.repository.get_child_entries(parent_path)
 
-        # Clean both directories and courses
-        for section in ["directories", "courses"]:
-            entries_to_remove = []
-            for key, entry in registry_data[section].items():
-                last_accessed = datetime.fromisoformat(entry["last_accessed"])
-                days_since_access = (current_time - last_accessed).days
+    def remove_path(self, path: str) -> int:
+        """Remove the entries registered for a path and for everything below it."""
+        ProgressRollupService.remove_tree(path)
+        return self.repository.remove_tree(path)
+
+    def refresh_path(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Re-classify a registered path after it changed on disk.
 
-                if days_since_access > days_threshold:
-                    entries_to_remove.append(key)
+        The entry is removed if the directory is gone, moved to the right
+        section if its node type changed, and left untouched otherwise.
+
+        Returns:
+            The current entry, or None if the path no longer exists
+        """
+        from app.services.content_detection_service import ContentDetectionService
+
+        if not os.path.isdir(path):
+            self.remove_path(path)
+            return None
+
+        node_type = ContentDetectionService.detect_content_type(path)
+        with self.repository.lock:
+            existing = self.find_entry_by_path(path)
+            if existing and existing["node_type"] == node_type.value:
+                return existing
+
+            title = TextFormatter.format_directory_title(os.path.basename(path))
+            for section in ["directories", "courses"]:
+                self.repository.remove_entry(section, f"{title}|{path}")
+
+            entry = {
+                "title": title,
+                "path": path,
+                "node_type": node_type.value,
+                "registered_at": existing["registered_at"] if existing else datetime.now().isoformat(),
+                "last_accessed": existing["last_accessed"] if existing else datetime.now().isoformat()
+            }
+            self.repository.set_entry(self._get_registry_section(node_type), f"{title}|{path}", entry)
 
-            for key in entries_to_remove:
-                del registry_data[section][key]
-                removed_count += 1
+        # A course that became a directory no longer counts; a new course is tracked on the next read
+        ProgressRollupService.remove_tree(path)
+        if node_type == NodeType.COURSE:
+            ProgressRollupService.course_discovered(path)
+        return entry
 
-        if removed_count > 0:
-            self._save_registry(registry_data)
+    def cleanup_old_entries(self, days_threshold: int = 30) -> int:
+        """Remove entries that haven't been accessed for a specified number of days."""
+        with self.repository.lock:
+            # Access times not written yet still count
+            self.repository.apply_pending_accesses()
 
-        return removed_count
+            # More than days_threshold whole days since the last access
+            cutoff = datetime.now() - timedelta(days=days_threshold + 1)
+            return self.repository.remove_accessed_before(cutoff)
 
     def clear_all_entries(self) -> None:
         """Clear all registry entries."""
         self._create_empty_registry()
+
+    def transaction(self):
+        """
+        Batch the registry changes made inside a `with` block into one write.
+
+        Example:
+            with registry_service.transaction():
+                for child in children:
+                    registry_service.register_item(...)
+        """
+        return self.repository.transaction()
+
+    def flush(self) -> None:
+        """Write pending registry changes to disk now instead of on the write-behind timer."""
+        self.repository.flush()
         
     def build_breadcrumbs_from_path(self, item_path: str, item_title: str) -> list[Dict[str, Any]]:
         """
@@ -172,21 +193,14 @@ class RegistryService:
         """
         breadcrumbs = [{"title": "Home", "url": "/"}]
 
-        # Find the root path by looking at all registry entries and finding the shortest common ancestor
-        all_paths = []
-        for entry in self.get_all_directories().values():
-            all_paths.append(entry["path"])
-        for entry in self.get_all_courses().values():
-            all_paths.append(entry["path"])
+        # The root is the deepest common ancestor of all registered paths, cached by the repository
+        root_path = self.repository.get_root_path()
 
-        if not all_paths:
+        if root_path is None:
             # No registry entries, just return home
             breadcrumbs.append({"title": item_title, "url": None})
             return breadcrumbs
 
-        # Find common root by getting the directory that's parent to all paths
-        root_path = os.path.commonpath(all_paths)
-
         # Get relative path from root
         try:
             relative_path = os.path.relpath(item_path, root_path)
@@ -202,26 +216,14 @@ class RegistryService:
 
         segments = relative_path.split(os.sep)
         accumulated_path = root_path
+        # Registered entries along the path, in one lookup
+        path_entries = self.repository.get_path_entries(item_path)
 
         # Build breadcrumbs for each segment
         for i, segment in enumerate(segments):
             accumulated_path = os.path.join(accumulated_path, segment)
 
-            # Look up this path in registry
-            found_entry = None
-
-            # Check directories
-            for entry in self.get_all_directories().values():
-                if entry["path"] == accumulated_path:
-                    found_entry = entry
-                    break
-
-            # Check courses if not found
-            if not found_entry:
-                for entry in self.get_all_courses().values():
-                    if entry["path"] == accumulated_path:
-                        found_entry = entry
-                        break
+            found_entry = path_entries.get(accumulated_path)
 
             if found_entry:
                 title = found_entry["title"]
@@ -264,15 +266,37 @@ class RegistryService:
             if not old_registry:
                 return
 
-            registry_data = self._load_registry()
-
-            for key, entry in old_registry.get("registry", {}).items():
-                node_type = NodeType(entry["node_type"])
-                section = self._get_registry_section(node_type)
-                registry_data[section][key] = entry
+            with self.transaction():
+                for key, entry in old_registry.get("registry", {}).items():
+                    node_type = NodeType(entry["node_type"])
+                    section = self._get_registry_section(node_type)
+                    self.repository.set_entry(section, key, entry)
 
-            self._save_registry(registry_data)
             print(f"Migrated {len(old_registry.get('registry', {}))} entries from directory registry")
 
         except Exception as e:
-            print(f"Error migrating directory registry: {e}")
\ No newline at end of file
+            print(f"Error migrating directory registry: {e}")
+
+    def migrate_from_json_registry(self, json_registry_path: str = None) -> int:
+        """
+        Copy the entries of a JSON registry file into this registry, used to move
+        to the SQLite backend. Existing entries with the same key are replaced.
+
+        Args:
+            json_registry_path: JSON registry file, defaults to RegistryRepository.DEFAULT_REGISTRY_PATH
+
+        Returns:
+            int: Number of entries copied
+        """
+        json_repository = RegistryRepository(json_registry_path)
+        if json_repository.file_path == getattr(self.repository, "file_path", None):
+            return 0
+
+        json_registry = json_repository.load() or {}
+        migrated = 0
+        with self.transaction():
+            for section in REGISTRY_SECTIONS:
+                for key, entry in json_registry.get(section, {}).items():
+                    self.repository.set_entry(section, key, entry)
+                    migrated += 1
+        return migrated
\ No newline at end of file
@@ -0,0 +1,153 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from config import Config
+from app.models.course_model import NodeType
+
+
+class WarmupService:
+    """
+    Startup crawl of the library that prefills the registry, the content type
+    verdicts and the course structure cache before the first visitor arrives.
+
+    Directories are crawled breadth-first with DirectoryService.scan_directory,
+    which analyzes the children of each directory on a bounded thread pool and
+    keeps registry writes on the crawling thread. Progress is exposed through
+    get_status() for the readiness endpoint.
+    """
+
+    STATE_DISABLED = "disabled"
+    STATE_RUNNING = "running"
+    STATE_READY = "ready"
+    STATE_STOPPED = "stopped"
+    STATE_FAILED = "failed"
+
+    _thread: Optional[threading.Thread] = None
+    _stop_event = threading.Event()
+    _lock = threading.Lock()
+    _status: Dict[str, Any] = {"state": STATE_DISABLED}
+
+    @staticmethod
+    def start(root_path: str, max_workers: Optional[int] = None) -> None:
+        """Crawl root_path on a background thread."""
+        if WarmupService.is_running():
+            return
+
+        WarmupService._stop_event.clear()
+        WarmupService._reset_status(root_path)
+        thread = threading.Thread(
+            target=WarmupService.crawl,
+            args=(root_path, max_workers),
+            name="library-warmup",
+            daemon=True
+        )
+        WarmupService._thread = thread
+        thread.start()
+
+    @staticmethod
+    def stop() -> None:
+        """Stop crawling after the directory being scanned."""
+        WarmupService._stop_event.set()
+        if WarmupService._thread is not None:
+            WarmupService._thread.join(timeout=5)
+            WarmupService._thread = None
+
+    @staticmethod
+    def is_running() -> bool:
+        thread = WarmupService._thread
+        return thread is not None and thread.is_alive()
+
+    @staticmethod
+    def is_ready() -> bool:
+        """
+        True unless the crawl is still running. A crawl that failed or was
+        stopped leaves the caches cold but the server working, so it counts as
+        ready and get_status() reports it as degraded.
+        """
+        return WarmupService._status["state"] != WarmupService.STATE_RUNNING
+
+    @staticmethod
+    def get_status() -> Dict[str, Any]:
+        """Crawl state, whether it ended degraded, directories discovered and warmed, and the warm percentage."""
+        with WarmupService._lock:
+            status = dict(WarmupService._status)
+
+        status["degraded"] = status["state"] in (WarmupService.STATE_FAILED, WarmupService.STATE_STOPPED)
+        if status["state"] == WarmupService.STATE_DISABLED:
+            return status
+
+        discovered = status["directories_discovered"]
+        status["percent_warm"] = round(status["directories_warmed"] / discovered * 100, 1) if discovered else 0.0
+        end = status["finished_at"] or time.time()
+        status["elapsed_seconds"] = round(end - status["started_at"], 2)
+        return status
+
+    @staticmethod
+    def crawl(root_path: str, max_workers: Optional[int] = None) -> None:
+        """
+        Crawl root_path and every directory below it, blocking until done.
+
+        Args:
+            root_path (str): Library root, usually Config.COURSES_ROOT_DIRECTORY_ABS_PATH
+            max_workers (int): Worker threads per directory, defaults to Config.WARMUP_WORKERS
+        """
+        from app.services.directory_service import DirectoryService
+
+        WarmupService._reset_status(root_path)
+        workers = max_workers or Config.WARMUP_WORKERS
+        pending = [root_path]
+
+        try:
+            while pending and not WarmupService._stop_event.is_set():
+                directory_path = pending.pop(0)
+                # Registers new items and fills the content type verdicts
+                items = DirectoryService.scan_directory(directory_path, max_workers=workers, track_access=False)
+                WarmupService._warm_courses([item.path for item in items if item.node_type == NodeType.COURSE], workers)
+                subdirectories = [item.path for item in items if item.node_type == NodeType.DIRECTORY]
+                pending.extend(subdirectories)
+
+                with WarmupService._lock:
+                    status = WarmupService._status
+                    status["directories_warmed"] += 1
+                    status["directories_discovered"] += len(subdirectories)
+                    status["courses_warmed"] += sum(1 for item in items if item.node_type == NodeType.COURSE)
+        except Exception as e:
+            print(f"Library warm-up failed: {e}")
+            WarmupService._finish(WarmupService.STATE_FAILED, str(e))
+            return
+
+        WarmupService._finish(WarmupService.STATE_STOPPED if pending else WarmupService.STATE_READY)
+
+    @staticmethod
+    def _warm_courses(course_paths: List[str], workers: int) -> None:
+        """Fill the structure cache and lesson sets of the given courses."""
+        from app.services.course_structure_service import CourseStructureService
+
+        if workers > 1 and len(course_paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(course_paths))) as executor:
+                list(executor.map(CourseStructureService.get_course_structure, course_paths))
+        else:
+            for course_path in course_paths:
+                CourseStructureService.get_course_structure(course_path)
+
+    @staticmethod
+    def _reset_status(root_path: str) -> None:
+        with WarmupService._lock:
+            WarmupService._status = {
+                "state": WarmupService.STATE_RUNNING,
+                "root_path": root_path,
+                "directories_discovered": 1,
+                "directories_warmed": 0,
+                "courses_warmed": 0,
+                "started_at": time.time(),
+                "finished_at": None,
+                "error": None
+            }
+
+    @staticmethod
+    def _finish(state: str, error: Optional[str] = None) -> None:
+        with WarmupService._lock:
+            WarmupService._status["state"] = state
+            WarmupService._status["finished_at"] = time.time()
+            WarmupService._status["error"] = error
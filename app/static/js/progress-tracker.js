@@ -10,6 +10,7 @@ class ProgressTracker {
         this.lessonType = lessonType;
         this.isCompleted = false;
         this.savePositionInterval = null;
+        this.pendingPosition = null;
     }
 
     async init() {
@@ -47,6 +48,7 @@ class ProgressTracker {
                 videoPlayer.addEventListener('ended', () => this.markCompleted());
                 videoPlayer.addEventListener('timeupdate', () => this.savePlaybackPositionThrottled(videoPlayer));
                 videoPlayer.addEventListener('pause', () => this.savePlaybackPosition(videoPlayer));
+                this.setupUnloadFlush(videoPlayer);
             }
         } else if (this.lessonType === 'audio') {
             const audioPlayer = document.getElementById('lessonAudioPlayer');
@@ -54,6 +56,7 @@ class ProgressTracker {
                 audioPlayer.addEventListener('ended', () => this.markCompleted());
                 audioPlayer.addEventListener('timeupdate', () => this.savePlaybackPositionThrottled(audioPlayer));
                 audioPlayer.addEventListener('pause', () => this.savePlaybackPosition(audioPlayer));
+                this.setupUnloadFlush(audioPlayer);
             }
         } else {
             const nextBtn = document.querySelector('.ls-nav-button-next');
@@ -82,6 +85,9 @@ class ProgressTracker {
     }
 
     savePlaybackPositionThrottled(player) {
+        if (player && player.currentTime > 0) {
+            this.pendingPosition = player.currentTime;
+        }
         if (!this.savePositionInterval) {
             this.savePositionInterval = setTimeout(() => {
                 this.savePlaybackPosition(player);
@@ -93,6 +99,7 @@ class ProgressTracker {
     async savePlaybackPosition(player) {
         if (!player || player.currentTime === 0) return;
 
+        this.pendingPosition = null;
         try {
             await fetch(`/api/progress/${this.courseId}/playback-position`, {
                 method: 'POST',
@@ -109,6 +116,50 @@ class ProgressTracker {
         }
     }
 
+    setupUnloadFlush(player) {
+        // pagehide also fires when the page goes into the back/forward cache
+        window.addEventListener('pagehide', () => this.flushPendingUpdates(player));
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'hidden') {
+                this.flushPendingUpdates(player);
+            }
+        });
+    }
+
+    flushPendingUpdates(player) {
+        if (this.pendingPosition === null) return;
+        if (player && player.currentTime > 0) {
+            this.pendingPosition = player.currentTime;
+        }
+
+        const payload = JSON.stringify({
+            course_id: this.courseId,
+            operations: [{
+                op: 'position',
+                lesson_path: this.lessonPath,
+                position_seconds: this.pendingPosition
+            }]
+        });
+        this.pendingPosition = null;
+        if (this.savePositionInterval) {
+            clearTimeout(this.savePositionInterval);
+            this.savePositionInterval = null;
+        }
+
+        // A string body is sent as text/plain, which the batch endpoint accepts
+        if (navigator.sendBeacon && navigator.sendBeacon('/api/progress/batch', payload)) {
+            return;
+        }
+        fetch('/api/progress/batch', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: payload,
+            keepalive: true
+        }).catch((error) => console.error('Error flushing progress:', error));
+    }
+
     async toggleCompletion() {
         if (this.isCompleted) {
             await this.markIncomplete();
@@ -0,0 +1,78 @@
+import threading
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class AccessTable:
+    """
+    Thread-safe in-memory record of accesses per key: hit count, last access
+    time, and the last access time that was persisted.
+
+    record() tells the caller when the persisted time is older than the flush
+    interval, so a key is written at most once per interval however often it
+    is accessed.
+    """
+
+    def __init__(self, flush_interval_seconds: float = 60):
+        self.flush_interval_seconds = flush_interval_seconds
+        # key -> [hits, last access, last persisted access]
+        self._entries: Dict[Hashable, list] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: Hashable, when: datetime, persisted: Optional[datetime] = None) -> bool:
+        """
+        Record an access.
+
+        Args:
+            key (Hashable): Accessed key
+            when (datetime): Time of the access
+            persisted (datetime): Access time currently stored for the key, used the first time it is seen
+
+        Returns:
+            bool: True if the caller should persist `when` now
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [0, None, persisted]
+            entry[0] += 1
+            entry[1] = when
+
+            if entry[2] is None or (when - entry[2]).total_seconds() >= self.flush_interval_seconds:
+                entry[2] = when
+                return True
+            return False
+
+    def pending(self) -> Dict[Hashable, datetime]:
+        """Keys whose last access is newer than the persisted one, with that access time."""
+        with self._lock:
+            return {key: entry[1] for key, entry in self._entries.items() if entry[2] is None or entry[1] > entry[2]}
+
+    def mark_persisted(self, key: Hashable, when: datetime) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2] = max(entry[2], when) if entry[2] else when
+
+    def forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def hits(self, key: Hashable) -> int:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry else 0
+
+    def most_accessed(self, limit: int = 0) -> List[Tuple[Hashable, int, datetime]]:
+        """(key, hits, last access) sorted by hits, optionally limited to the top entries."""
+        with self._lock:
+            rows = sorted(((key, entry[0], entry[1]) for key, entry in self._entries.items()),
+                          key=lambda row: row[1], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
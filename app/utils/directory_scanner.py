@@ -0,0 +1,178 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class DirectoryListing:
+    """Non-hidden entries of a single directory, split into subdirectories and files."""
+    path: str
+    directories: List[str] = field(default_factory=list)
+    files: List[str] = field(default_factory=list)
+    mtime_ns: Optional[int] = None
+    # Subdirectory and file name -> its os.DirEntry, kept when listed with keep_entries
+    directory_entries: Dict[str, os.DirEntry] = field(default_factory=dict, repr=False)
+    file_entries: Dict[str, os.DirEntry] = field(default_factory=dict, repr=False)
+
+    def directory_paths(self) -> List[str]:
+        """Absolute paths of the subdirectories."""
+        return [os.path.join(self.path, name) for name in self.directories]
+
+    def directory_mtime(self, name: str) -> int:
+        """
+        mtime of a subdirectory listed with keep_entries, from its DirEntry
+        (cached on the entry, and read from the listing itself on Windows).
+
+        Raises:
+            OSError: If the subdirectory is gone
+        """
+        return self.directory_entries[name].stat().st_mtime_ns
+
+    def file_stat(self, name: str) -> Optional[os.stat_result]:
+        """Stat of a file listed with keep_entries, from its DirEntry; None if not kept or gone."""
+        entry = self.file_entries.get(name)
+        if entry is None:
+            return None
+        try:
+            return entry.stat()
+        except OSError:
+            return None
+
+    def signature(self) -> int:
+        """Hash of the listed names, independent of listing order."""
+        return hash((tuple(sorted(self.directories)), tuple(sorted(self.files))))
+
+
+@dataclass
+class DirectoryTree:
+    """
+    Two-level snapshot of a directory: its own listing plus the listing of
+    every direct subdirectory. This is exactly the depth needed to classify a
+    directory and to build the modules and lessons of a course.
+
+    Subdirectories that could not be read map to None.
+    """
+    root: DirectoryListing
+    children: Dict[str, Optional[DirectoryListing]] = field(default_factory=dict)
+
+
+class DirectoryScanner:
+    """Utility class for listing directories with os.scandir in a single pass."""
+
+    @staticmethod
+    def list_directory(directory_path: str, with_mtime: bool = False,
+                       stop_at_directory: bool = False, keep_entries: bool = False) -> DirectoryListing:
+        """
+        List a directory, skipping hidden entries.
+
+        The file type comes from the DirEntry returned by os.scandir, which on
+        most platforms is read from the directory itself, so no extra stat call
+        is made per entry (symlinks are the exception).
+
+        Args:
+            directory_path (str): Path to the directory to list
+            with_mtime (bool): Also record the directory mtime, taken before
+                listing so that a concurrent change is never masked
+            stop_at_directory (bool): Stop at the first subdirectory found; the
+                listing is then incomplete and only tells that one exists
+            keep_entries (bool): Keep the DirEntry of every entry, so stats are
+                read with directory_mtime() and file_stat() instead of os.stat
+
+        Returns:
+            DirectoryListing: The subdirectory and file names found
+
+        Raises:
+            OSError: If the directory cannot be read (missing, not a directory, no permission)
+        """
+        listing = DirectoryListing(path=directory_path)
+        if with_mtime:
+            listing.mtime_ns = os.stat(directory_path).st_mtime_ns
+
+        with os.scandir(directory_path) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+
+                try:
+                    if entry.is_dir():
+                        listing.directories.append(entry.name)
+                        if keep_entries:
+                            listing.directory_entries[entry.name] = entry
+                        if stop_at_directory:
+                            break
+                    elif entry.is_file():
+                        listing.files.append(entry.name)
+                        if keep_entries:
+                            listing.file_entries[entry.name] = entry
+                except OSError:
+                    # Broken symlinks and vanished entries are ignored
+                    continue
+
+        return listing
+
+    @staticmethod
+    def scan_tree(directory_path: str, with_mtime: bool = False, keep_entries: bool = False) -> DirectoryTree:
+        """
+        List a directory and each of its direct subdirectories.
+
+        Args:
+            directory_path (str): Path to the directory to scan
+            with_mtime (bool): Also record the mtime of every listed directory
+            keep_entries (bool): Keep the DirEntry of every entry (see list_directory)
+
+        Returns:
+            DirectoryTree: The two-level snapshot
+
+        Raises:
+            OSError: If the top-level directory cannot be read
+        """
+        tree = DirectoryTree(root=DirectoryScanner.list_directory(directory_path, with_mtime, keep_entries=keep_entries))
+
+        for name in tree.root.directories:
+            try:
+                tree.children[name] = DirectoryScanner.list_directory(
+                    os.path.join(directory_path, name), with_mtime, keep_entries=keep_entries
+                )
+            except OSError:
+                tree.children[name] = None
+
+        return tree
+
+    @staticmethod
+    def tree_mtimes(tree: DirectoryTree) -> Dict[str, int]:
+        """
+        Map every directory of a tree scanned with_mtime to its recorded mtime.
+        Unreadable subdirectories are left out.
+        """
+        listings = [tree.root] + [listing for listing in tree.children.values() if listing is not None]
+        return {listing.path: listing.mtime_ns for listing in listings if listing.mtime_ns is not None}
+
+    @staticmethod
+    def tree_signatures(tree: DirectoryTree) -> Dict[str, int]:
+        """Map every readable directory of a tree to the signature of its listing."""
+        listings = [tree.root] + [listing for listing in tree.children.values() if listing is not None]
+        return {listing.path: listing.signature() for listing in listings}
+
+    @staticmethod
+    def mtimes_unchanged(mtimes: Dict[str, int], signatures: Optional[Dict[str, int]] = None) -> bool:
+        """
+        Check with one stat per directory that none of the recorded mtimes changed.
+
+        With signatures, a directory whose mtime changed is listed again and
+        counts as unchanged if its non-hidden entries are the same, as after
+        an atomic rewrite of a hidden progress file; its new mtime is then
+        recorded so the next check is one stat again.
+        """
+        try:
+            for path, mtime_ns in mtimes.items():
+                if os.stat(path).st_mtime_ns == mtime_ns:
+                    continue
+                if signatures is None or path not in signatures:
+                    return False
+                listing = DirectoryScanner.list_directory(path, with_mtime=True)
+                if listing.signature() != signatures[path]:
+                    return False
+                mtimes[path] = listing.mtime_ns
+        except OSError:
+            return False
+        return True
@@ -0,0 +1,90 @@
+import hashlib
+import os
+import threading
+from typing import Dict, Optional
+from config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locking, writes stay atomic
+    fcntl = None
+
+
+class FileLock:
+    """
+    Advisory lock for a file with fcntl.flock, so several worker processes
+    can read-modify-write the same JSON file without losing updates.
+
+    The lock file lives in Config.FILE_LOCK_DIRECTORY, named after a hash of
+    the locked file's absolute path, so nothing is created next to the file
+    itself (course directories stay untouched and may be read-only).
+
+    The lock is reentrant per thread: nested acquisitions of the same path
+    reuse the held lock, and an exclusive request inside a shared one
+    upgrades it. On platforms without fcntl it does nothing.
+
+    Example:
+        with FileLock(file_path, exclusive=True):
+            data = load()
+            ...
+            save(data)
+    """
+
+    SUFFIX = ".lock"
+
+    # path -> [fd, exclusive, depth] for the locks held by the current thread
+    _held = threading.local()
+
+    def __init__(self, path: str, exclusive: bool = True):
+        self.lock_path = FileLock.lock_path_for(path)
+        self.exclusive = exclusive
+
+    @staticmethod
+    def lock_path_for(path: str) -> str:
+        """Lock file used for path."""
+        digest = hashlib.sha1(os.path.abspath(path).encode("utf-8", "surrogateescape")).hexdigest()
+        return os.path.join(Config.FILE_LOCK_DIRECTORY, digest + FileLock.SUFFIX)
+
+    def __enter__(self) -> "FileLock":
+        if fcntl is None:
+            return self
+
+        held = self._held_locks()
+        state = held.get(self.lock_path)
+        if state is not None:
+            if self.exclusive and not state[1]:
+                fcntl.flock(state[0], fcntl.LOCK_EX)
+                state[1] = True
+            state[2] += 1
+            return self
+
+        directory = os.path.dirname(self.lock_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+        except BaseException:
+            os.close(fd)
+            raise
+        held[self.lock_path] = [fd, self.exclusive, 1]
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if fcntl is None:
+            return
+
+        held = self._held_locks()
+        state = held[self.lock_path]
+        state[2] -= 1
+        if state[2] == 0:
+            del held[self.lock_path]
+            # Closing the descriptor releases the lock
+            os.close(state[0])
+
+    @classmethod
+    def _held_locks(cls) -> Dict[str, list]:
+        held: Optional[Dict[str, list]] = getattr(cls._held, "locks", None)
+        if held is None:
+            held = cls._held.locks = {}
+        return held
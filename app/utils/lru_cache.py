@@ -0,0 +1,109 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class LruCache:
+    """
+    Thread-safe least-recently-used cache bounded by entry count and by an
+    estimated memory budget, with hit/miss/eviction counters.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 0,
+                 sizeof: Optional[Callable[[Any], int]] = None):
+        """
+        Args:
+            max_entries (int): Maximum number of entries (0 disables the limit)
+            max_bytes (int): Maximum estimated size of all values in bytes (0 disables the limit)
+            sizeof (Callable): Estimates the size of a value in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value and mark it as recently used, or None on a miss."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value without touching recency or counters."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insert or replace a value, evicting least recently used entries to stay in budget."""
+        size = self._sizeof(value)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove an entry and return its value, if present."""
+        with self._lock:
+            value = self._entries.get(key)
+            self._discard(key)
+            return value
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def keys(self) -> List[Hashable]:
+        """Snapshot of the cached keys, least recently used first."""
+        with self._lock:
+            return list(self._entries.keys())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _discard(self, key: Hashable) -> None:
+        if key in self._entries:
+            del self._entries[key]
+            self._total_bytes -= self._sizes.pop(key, 0)
+
+    def _evict(self) -> None:
+        # Always keep the most recent entry, even if it alone exceeds the budget
+        while len(self._entries) > 1 and (
+            (self.max_entries and len(self._entries) > self.max_entries)
+            or (self.max_bytes and self._total_bytes > self.max_bytes)
+        ):
+            key = next(iter(self._entries))
+            self._discard(key)
+            self.evictions += 1
@@ -0,0 +1,37 @@
+import threading
+from typing import List, Sequence
+import markdown
+
+
+class MarkdownConverterPool:
+    """
+    One pre-built markdown.Markdown converter per thread, reset between documents.
+
+    Building a converter loads the extensions, creates the codehilite
+    formatter and compiles the inline patterns, which costs more than
+    rendering a short note. A converter is not thread-safe, so each thread
+    gets its own, built on its first document and reused afterwards.
+    """
+
+    def __init__(self, extensions: Sequence[str]):
+        self.extensions: List[str] = list(extensions)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def convert(self, text: str) -> str:
+        """Render markdown text to HTML with this thread's converter."""
+        converter = getattr(self._local, "converter", None)
+        if converter is None:
+            converter = self._local.converter = markdown.Markdown(extensions=self.extensions)
+            with self._lock:
+                self.created += 1
+
+        try:
+            return converter.convert(text)
+        except Exception:
+            # A failed conversion may leave partial state behind; build a fresh converter next time
+            self._local.converter = None
+            raise
+        finally:
+            converter.reset()
@@ -0,0 +1,126 @@
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class _TrieNode:
+    __slots__ = ("path", "children", "values")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.values: List[Any] = []
+
+
+class PathTrie:
+    """
+    Prefix tree of absolute paths, one node per path component, with values
+    attached to the nodes of registered paths.
+
+    Lookups, ancestor walks and child listings cost O(depth) regardless of
+    how many paths are stored. The common root of all paths is cached and
+    recomputed on the first call after a change. Not thread-safe; callers
+    hold their own lock.
+    """
+
+    def __init__(self):
+        # Virtual node above the first path component
+        self._top = _TrieNode("")
+        self._size = 0
+        self._common_root: Optional[str] = None
+        self._common_root_valid = True
+
+    def insert(self, path: str, value: Any) -> None:
+        """Attach value to path, once."""
+        node = self._top
+        for part_path, part in self._components(path):
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = _TrieNode(part_path)
+            node = child
+        if value not in node.values:
+            node.values.append(value)
+            self._size += 1
+            self._common_root_valid = False
+
+    def remove(self, path: str, value: Any) -> None:
+        """Detach value from path, pruning nodes left without values or children."""
+        trail = [(self._top, None)]
+        for _, part in self._components(path):
+            node = trail[-1][0].children.get(part)
+            if node is None:
+                return
+            trail.append((node, part))
+
+        node = trail[-1][0]
+        if value not in node.values:
+            return
+        node.values.remove(value)
+        self._size -= 1
+        self._common_root_valid = False
+
+        for depth in range(len(trail) - 1, 0, -1):
+            node, part = trail[depth]
+            if node.values or node.children:
+                break
+            del trail[depth - 1][0].children[part]
+
+    def get(self, path: str) -> List[Any]:
+        """Values attached to path."""
+        node = self._find(path)
+        return list(node.values) if node else []
+
+    def walk(self, path: str) -> Iterator[Tuple[str, List[Any]]]:
+        """(path, values) of path and each of its ancestors that has values, from the top down."""
+        node = self._top
+        for _, part in self._components(path):
+            node = node.children.get(part)
+            if node is None:
+                return
+            if node.values:
+                yield node.path, list(node.values)
+
+    def children(self, path: str) -> List[Any]:
+        """Values attached to the direct children of path."""
+        node = self._find(path)
+        if node is None:
+            return []
+        return [value for child in node.children.values() for value in child.values]
+
+    def common_root(self) -> Optional[str]:
+        """Deepest path containing every stored path (os.path.commonpath), or None when empty."""
+        if not self._common_root_valid:
+            self._common_root = self._compute_common_root()
+            self._common_root_valid = True
+        return self._common_root
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _compute_common_root(self) -> Optional[str]:
+        if not self._size:
+            return None
+        node = self._top
+        # Descend while the paths do not branch and no path ends here
+        while len(node.children) == 1 and not node.values:
+            node = next(iter(node.children.values()))
+        return node.path or None
+
+    def _find(self, path: str) -> Optional[_TrieNode]:
+        node = self._top
+        for _, part in self._components(path):
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    @staticmethod
+    def _components(path: str) -> List[Tuple[str, str]]:
+        """(path so far, component) pairs; the leading separator of an absolute path is its own component."""
+        parts = os.path.normpath(path).split(os.sep)
+        components = []
+        for index, part in enumerate(parts):
+            if index > 0 and not part:
+                continue
+            part_path = os.sep.join(parts[:index + 1]) or os.sep
+            components.append((part_path, part))
+        return components
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Content Detection Syscall Benchmark
+
+Generates a synthetic library and counts the filesystem calls (stat, lstat,
+listdir, scandir) needed to classify every top-level folder and build the
+modules and lessons of every course, comparing the previous listdir + stat
+implementation against the os.scandir based scanner.
+
+A second section classifies every folder of a nested "programming/"
+hierarchy (categories holding courses) the way the directory pages do:
+reading full two-level trees, with the early-exit classifier, and with
+the early-exit classifier again once its verdicts are cached.
+
+The legacy code never looked at media durations, so the scanner is measured
+with duration lookups turned off, and then again with them on and a warm
+duration cache (one stat per media file to validate its cache key).
+
+Usage:
+    python benchmarks/bench_content_detection.py [courses] [modules] [lessons]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from app.models.lesson_type import ALL_LESSON_EXTENSIONS
+from app.repositories.media_duration_repository import MediaDurationRepository
+from app.services.content_detection_service import ContentDetectionService
+from app.services.media_duration_service import MediaDurationService
+from app.utils.directory_scanner import DirectoryListing, DirectoryScanner
+
+
+def build_library(root: str, courses: int, modules: int, lessons: int) -> None:
+    """Create a library of courses, each with modules of lesson files."""
+    for c in range(courses):
+        course_dir = os.path.join(root, f"{c:03d}-course")
+        os.makedirs(course_dir)
+        open(os.path.join(course_dir, "cover.jpg"), "w").close()
+        open(os.path.join(course_dir, "intro.mp4"), "w").close()
+        for m in range(modules):
+            module_dir = os.path.join(course_dir, f"{m:02d}-module")
+            os.makedirs(module_dir)
+            for l in range(lessons):
+                open(os.path.join(module_dir, f"{l:02d}-lesson.mp4"), "w").close()
+
+
+class CountingEntry:
+    """os.DirEntry proxy counting the stat() calls that are not served from the entry's cache."""
+
+    def __init__(self, entry, counter: Counter):
+        self._entry = entry
+        self._counter = counter
+        self._stat = None
+
+    def stat(self, *, follow_symlinks=True):
+        if self._stat is None:
+            self._counter["entry.stat"] += 1
+            self._stat = self._entry.stat(follow_symlinks=follow_symlinks)
+        return self._stat
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+
+class CountingScandir:
+    """os.scandir iterator yielding CountingEntry proxies."""
+
+    def __init__(self, iterator, counter: Counter):
+        self._iterator = iterator
+        self._counter = counter
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._iterator.close()
+
+    def __iter__(self):
+        for entry in self._iterator:
+            yield CountingEntry(entry, self._counter)
+
+
+@contextmanager
+def count_calls(counter: Counter):
+    """
+    Count calls to the os functions that hit the filesystem, and DirEntry.stat()
+    calls, which on Linux are a stat system call too (Windows reads them from
+    the directory listing).
+    """
+    originals = {name: getattr(os, name) for name in ("stat", "lstat", "listdir", "scandir")}
+
+    def wrap(name, func):
+        def wrapper(*args, **kwargs):
+            counter[name] += 1
+            result = func(*args, **kwargs)
+            return CountingScandir(result, counter) if name == "scandir" else result
+        return wrapper
+
+    for name, func in originals.items():
+        setattr(os, name, wrap(name, func))
+    try:
+        yield
+    finally:
+        for name, func in originals.items():
+            setattr(os, name, func)
+
+
+def legacy_render(root: str) -> None:
+    """The previous listdir + per-entry stat implementation, for reference."""
+    def is_course(path, directories):
+        if not directories:
+            return False
+        for subdir in directories:
+            has_lessons = False
+            for item in os.listdir(subdir):
+                if item.startswith('.'):
+                    continue
+                if os.path.isdir(os.path.join(subdir, item)):
+                    return False
+                if os.path.splitext(item.lower())[1] in ALL_LESSON_EXTENSIONS:
+                    has_lessons = True
+            if not has_lessons:
+                return False
+        return True
+
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if not (os.path.exists(path) and os.path.isdir(path)):
+            continue
+        directories = [os.path.join(path, i) for i in os.listdir(path)
+                       if not i.startswith('.') and os.path.isdir(os.path.join(path, i))]
+        if not is_course(path, directories):
+            continue
+        # scan_course_modules + scan_module_lessons
+        for item in os.listdir(path):
+            module = os.path.join(path, item)
+            if os.path.isdir(module) and not item.startswith('.'):
+                for lesson in os.listdir(module):
+                    if not lesson.startswith('.'):
+                        os.path.isfile(os.path.join(module, lesson))
+        # scan_course_lessons
+        for item in os.listdir(path):
+            os.path.isfile(os.path.join(path, item))
+
+
+def scanner_render(root: str) -> None:
+    """The same work through ContentDetectionService."""
+    for name in os.listdir(root):
+        ContentDetectionService.analyze_directory(os.path.join(root, name))
+
+
+def build_hierarchy(root: str, categories: int, courses: int, modules: int, lessons: int) -> None:
+    """Create programming/<category>/<course> folders; categories are plain directories."""
+    for c in range(categories):
+        build_library(os.path.join(root, "programming", f"{c:02d}-category"), courses, modules, lessons)
+
+
+def hierarchy_folders(root: str):
+    """Every folder a visitor browsing the hierarchy gets classified."""
+    programming = os.path.join(root, "programming")
+    folders = [programming]
+    for category in sorted(os.listdir(programming)):
+        category_path = os.path.join(programming, category)
+        folders.append(category_path)
+        folders.extend(os.path.join(category_path, course) for course in sorted(os.listdir(category_path)))
+    return folders
+
+
+def tree_classify(folders) -> None:
+    """Classification from full two-level scans, as before the early-exit classifier."""
+    for folder in folders:
+        ContentDetectionService._classify_tree(DirectoryScanner.scan_tree(folder))
+
+
+def early_exit_classify(folders) -> None:
+    for folder in folders:
+        ContentDetectionService.detect_content_type(folder)
+
+
+@contextmanager
+def durations_disabled():
+    """Skip media duration lookups and the stats keying them, which the legacy code did not do."""
+    original_get_duration = MediaDurationService.get_duration
+    original_file_stat = DirectoryListing.file_stat
+    MediaDurationService.get_duration = staticmethod(lambda file_path, stat_result=None: 0)
+    DirectoryListing.file_stat = lambda self, name: None
+    try:
+        yield
+    finally:
+        MediaDurationService.get_duration = original_get_duration
+        DirectoryListing.file_stat = original_file_stat
+
+
+def run(label: str, func, target) -> None:
+    counter = Counter()
+    start = time.perf_counter()
+    with count_calls(counter):
+        func(target)
+    elapsed = time.perf_counter() - start
+    total = sum(counter.values())
+    details = ", ".join(f"{name}={count}" for name, count in sorted(counter.items()))
+    print(f"{label:<10} {total:>8} calls ({details}) in {elapsed * 1000:.1f} ms")
+
+
+def main():
+    courses = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    modules = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    lessons = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    with tempfile.TemporaryDirectory() as workdir:
+        root = os.path.join(workdir, "library")
+        build_library(root, courses, modules, lessons)
+        Config.FILE_LOCK_DIRECTORY = os.path.join(workdir, "locks")
+        MediaDurationService.reset(MediaDurationRepository(os.path.join(workdir, "durations.json")))
+
+        print(f"Library: {courses} courses x {modules} modules x {lessons} lessons")
+        run("legacy", legacy_render, root)
+        with durations_disabled():
+            run("scandir", scanner_render, root)
+
+        scanner_render(root)  # warm the duration cache
+        run("+durations", scanner_render, root)
+
+        hierarchy_root = os.path.join(workdir, "hierarchy")
+        build_hierarchy(hierarchy_root, 10, 10, modules, lessons)
+        folders = hierarchy_folders(hierarchy_root)
+        print(f"\nClassifying {len(folders)} folders of programming/")
+        run("full tree", tree_classify, folders)
+        ContentDetectionService.clear_verdicts()
+        run("early exit", early_exit_classify, folders)
+        run("cached", early_exit_classify, folders)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Directory Scan Benchmark
+
+Generates a library root with many course folders and times
+DirectoryService.scan_directory serially and on a thread pool, on a cold
+registry and duration cache (deep analysis of every child) and on warm ones.
+
+The registry and duration cache are written to a temporary working
+directory, never to app/data.
+
+Usage:
+    python benchmarks/bench_directory_scan.py [courses] [workers]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.course_structure_service import CourseStructureService
+from app.services.directory_service import DirectoryService
+from app.repositories.media_duration_repository import MediaDurationRepository
+from app.repositories.registry_repository import RegistryRepository
+from app.services.media_duration_service import MediaDurationService
+
+# Relative to the temporary working directory
+DURATIONS_PATH = "durations.json"
+
+
+def build_library(root: str, courses: int, modules: int = 5, lessons: int = 10) -> None:
+    """Create a root of course folders, each with modules of lesson files."""
+    for c in range(courses):
+        course_dir = os.path.join(root, f"course-{c:04d}")
+        os.makedirs(course_dir)
+        open(os.path.join(course_dir, "cover.jpg"), "w").close()
+        for m in range(modules):
+            module_dir = os.path.join(course_dir, f"{m:02d}-module")
+            os.makedirs(module_dir)
+            for l in range(lessons):
+                open(os.path.join(module_dir, f"{l:02d}-lesson.mp4"), "w").close()
+
+
+def timed_scan(root: str, workers: int, cold: bool):
+    """Run one scan and return (seconds, result)."""
+    if cold:
+        RegistryRepository.reset()
+        for path in (RegistryRepository.DEFAULT_REGISTRY_PATH, DURATIONS_PATH):
+            if os.path.exists(path):
+                os.remove(path)
+        MediaDurationService.reset(MediaDurationRepository(DURATIONS_PATH))
+    CourseStructureService.clear_cache()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = DirectoryService.scan_directory(root, max_workers=workers)
+    return time.perf_counter() - start, result
+
+
+def main():
+    courses = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    with tempfile.TemporaryDirectory() as workdir:
+        root = os.path.join(workdir, "library")
+        build_library(root, courses)
+        os.chdir(workdir)
+
+        print(f"Library: {courses} course folders, {workers} workers")
+        for cold in (True, False):
+            serial_time, serial_result = timed_scan(root, 1, cold)
+            parallel_time, parallel_result = timed_scan(root, workers, cold)
+            assert [c.id for c in serial_result] == [c.id for c in parallel_result]
+
+            label = "cold" if cold else "warm"
+            print(f"{label}: serial {serial_time * 1000:.1f} ms, parallel {parallel_time * 1000:.1f} ms "
+                  f"({serial_time / parallel_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
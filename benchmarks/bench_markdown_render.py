@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Markdown Render Benchmark
+
+Times rendering lesson notes of several sizes with the lesson extensions,
+building a new markdown.Markdown pipeline per document (markdown.markdown,
+as LessonService did before) and with the thread-local MarkdownConverterPool
+that reuses one converter per thread. The rendered cache is not involved.
+
+The pool saves the fixed cost of building the pipeline (loading the
+extensions, creating the codehilite formatter, compiling the inline
+patterns), a few hundred microseconds per document. That dominates a short
+note, but a long note spends tens of milliseconds in block parsing and
+Pygments highlighting, which the pool does not change, so the speedup
+tends to 1.0x as documents grow. Timing noise on a long note is larger
+than that saving, so the two variants are timed in alternating rounds and
+each figure is the best of ROUNDS; a single back-to-back run can land on
+either side of 1.0x for the larger documents.
+
+Usage:
+    python benchmarks/bench_markdown_render.py [renders]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import markdown
+from app.services.lesson_service import LessonService
+from app.utils.markdown_converter_pool import MarkdownConverterPool
+
+
+SHORT_NOTE = "# Setup\n\nInstall the **toolchain** and run `make`.\n"
+
+CODE_BLOCK = "```python\ndef greet(name):\n    return f\"Hello, {name}\"\n```\n"
+
+TABLE = "| Command | Purpose |\n|---------|---------|\n| make | build |\n| make test | test |\n"
+
+
+def build_document(sections: int) -> str:
+    parts = ["# Lesson notes\n"]
+    for index in range(sections):
+        parts.append(f"\n## Part {index + 1}\n\nSome *text* with a [link](https://example.com).\n\n")
+        parts.append(CODE_BLOCK if index % 2 == 0 else TABLE)
+    return "".join(parts)
+
+
+ROUNDS = 10
+
+
+def per_render_us(renders_by_name, text: str, renders: int) -> dict:
+    """Best time per render of each variant, timed in alternating rounds so drift hits both alike."""
+    best = dict.fromkeys(renders_by_name, float("inf"))
+    for render in renders_by_name.values():
+        render(text)  # warm imports and the pooled converter
+    for _ in range(ROUNDS):
+        for name, render in renders_by_name.items():
+            start = time.perf_counter()
+            for _ in range(renders):
+                render(text)
+            best[name] = min(best[name], time.perf_counter() - start)
+    return {name: elapsed / renders * 1_000_000 for name, elapsed in best.items()}
+
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    extensions = LessonService.MARKDOWN_EXTENSIONS
+    pool = MarkdownConverterPool(extensions)
+
+    documents = [
+        ("short note", SHORT_NOTE),
+        ("4 sections", build_document(4)),
+        ("40 sections", build_document(40)),
+    ]
+
+    print(f"{renders} renders per document, best of {ROUNDS} rounds, extensions: {', '.join(extensions)}")
+    print(f"{'document':<12} {'bytes':>7} {'new pipeline':>14} {'pooled':>10} {'speedup':>8}")
+    for label, text in documents:
+        times = per_render_us({
+            "fresh": lambda t: markdown.markdown(t, extensions=extensions),
+            "pooled": pool.convert
+        }, text, renders)
+        fresh, pooled = times["fresh"], times["pooled"]
+        assert pool.convert(text) == markdown.markdown(text, extensions=extensions)
+        print(f"{label:<12} {len(text):>7} {fresh:>11.1f} us {pooled:>7.1f} us {fresh / pooled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
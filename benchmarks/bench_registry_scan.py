@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Registry Scan Benchmark
+
+Times DirectoryService.scan_directory on a root with many course folders
+with the previous registry storage (every RegistryService call re-parses
+registry.json and every change rewrites it, reproduced here by
+FileBackedRegistryService) and with the in-memory registry. JSON parses
+and writes are counted for both.
+
+Child analysis runs serially and the structure cache is cleared before
+each scan, so only the registry work differs between the two runs.
+
+Usage:
+    python benchmarks/bench_registry_scan.py [courses]
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_directory_scan import build_library
+from app.models.course_model import NodeType
+from app.repositories.base_json_repository import BaseJsonRepository
+from app.repositories.media_duration_repository import MediaDurationRepository
+from app.repositories.registry_repository import RegistryRepository
+from app.services.course_structure_service import CourseStructureService
+from app.services import directory_service
+from app.services.directory_service import DirectoryService
+from app.services.media_duration_service import MediaDurationService
+
+
+@contextmanager
+def count_json(counter: Counter):
+    """Count JSON parses and writes."""
+    original_load, original_dump = json.load, json.dump
+
+    def load(*args, **kwargs):
+        counter["parses"] += 1
+        return original_load(*args, **kwargs)
+
+    def dump(*args, **kwargs):
+        counter["writes"] += 1
+        return original_dump(*args, **kwargs)
+
+    json.load, json.dump = load, dump
+    try:
+        yield
+    finally:
+        json.load, json.dump = original_load, original_dump
+
+
+class FileBackedRegistryService:
+    """The registry calls scan_directory makes, as implemented before the in-memory registry."""
+
+    def __init__(self):
+        self.repository = BaseJsonRepository(RegistryRepository.DEFAULT_REGISTRY_PATH)
+        if not self.repository.exists():
+            self.repository.save({"directories": {}, "courses": {}, "metadata": {}})
+
+    def get_registry_entry(self, title, path, node_type):
+        return self.repository.load()[self._section(node_type)].get(f"{title}|{path}")
+
+    def register_item(self, title, path, node_type):
+        data = self.repository.load()
+        now = datetime.now().isoformat()
+        data[self._section(node_type)][f"{title}|{path}"] = {
+            "title": title, "path": path, "node_type": node_type.value, "registered_at": now, "last_accessed": now
+        }
+        self.repository.save(data)
+
+    def update_last_accessed(self, title, path, node_type):
+        data = self.repository.load()
+        entry = data[self._section(node_type)].get(f"{title}|{path}")
+        if entry:
+            entry["last_accessed"] = datetime.now().isoformat()
+            self.repository.save(data)
+
+    def transaction(self):
+        return contextlib.nullcontext()
+
+    @staticmethod
+    def _section(node_type):
+        return "directories" if node_type == NodeType.DIRECTORY else "courses"
+
+
+@contextmanager
+def file_backed_registry():
+    """Run scan_directory against the previous, file-backed registry."""
+    original = directory_service.RegistryService
+    directory_service.RegistryService = FileBackedRegistryService
+    try:
+        yield
+    finally:
+        directory_service.RegistryService = original
+
+
+def timed_scan(root: str, label: str) -> None:
+    CourseStructureService.clear_cache()
+    counter = Counter()
+    start = time.perf_counter()
+    with count_json(counter), contextlib.redirect_stdout(io.StringIO()):
+        DirectoryService.scan_directory(root, max_workers=1)
+        RegistryRepository.flush_all()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed * 1000:>9.1f} ms  parses={counter['parses']:<6} writes={counter['writes']}")
+
+
+def run(root: str, label: str) -> None:
+    RegistryRepository.reset()
+    if os.path.exists(RegistryRepository.DEFAULT_REGISTRY_PATH):
+        os.remove(RegistryRepository.DEFAULT_REGISTRY_PATH)
+    timed_scan(root, f"{label} (empty)")
+    timed_scan(root, f"{label} (registered)")
+
+
+def main():
+    courses = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+
+    with tempfile.TemporaryDirectory() as workdir:
+        root = os.path.join(workdir, "library")
+        build_library(root, courses, modules=1, lessons=1)
+        os.chdir(workdir)
+        MediaDurationService.reset(MediaDurationRepository("durations.json"))
+
+        print(f"Library: {courses} course folders")
+        with file_backed_registry():
+            run(root, "file")
+        run(root, "in-memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Cached Course Structure Memory Benchmark
+
+Builds a synthetic library of courses in memory and uses tracemalloc to
+measure what the structure cache retains for it: the previous form (lists
+of LessonData/ModuleData dataclasses with absolute paths) against
+CompactCourseStructure. It also times materializing one course back to
+dataclasses, which is what every request for a cached course pays.
+
+Usage:
+    python benchmarks/bench_structure_memory.py [lessons] [modules] [lessons_per_module]
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.compact_course_structure import CompactCourseStructure
+from app.models.lesson_data_model import LessonData
+from app.models.lesson_type import LessonType
+from app.models.module_data_model import ModuleData
+
+LIBRARY_ROOT = "/srv/courses"
+
+
+def build_course(course_number: int, modules: int, lessons: int):
+    """Modules and root lessons of one course, as the scanner builds them."""
+    course_path = os.path.join(LIBRARY_ROOT, f"{course_number:05d}-course-title")
+    module_list = []
+    for m in range(1, modules + 1):
+        module_dir = f"{m:02d}-module-title"
+        lesson_list = [
+            LessonData(
+                title=f"Lesson title {l}",
+                lesson_type=LessonType.VIDEO,
+                duration_seconds=300 + l,
+                file_path=os.path.join(course_path, module_dir, f"{l:02d}-lesson-title.mp4")
+            )
+            for l in range(1, lessons + 1)
+        ]
+        module_list.append(ModuleData(
+            title=f"Module title {m}",
+            module_number=m,
+            lessons=lesson_list,
+            total_duration_seconds=sum(lesson.duration_seconds for lesson in lesson_list),
+            directory_name=module_dir
+        ))
+    return course_path, module_list, []
+
+
+def measure(build) -> int:
+    """Bytes still allocated after build() returns, while its result is alive."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    total_lessons = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    modules = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    lessons = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    courses = max(1, total_lessons // (modules * lessons))
+
+    def dataclass_library():
+        return [build_course(c, modules, lessons) for c in range(courses)]
+
+    def compact_library():
+        return [CompactCourseStructure.from_structure(*build_course(c, modules, lessons)) for c in range(courses)]
+
+    print(f"Library: {courses} courses x {modules} modules x {lessons} lessons "
+          f"= {courses * modules * lessons} lessons")
+
+    dataclass_bytes = measure(dataclass_library)
+    compact_bytes = measure(compact_library)
+    print(f"dataclasses: {dataclass_bytes / 1024 / 1024:.1f} MiB")
+    print(f"compact:     {compact_bytes / 1024 / 1024:.1f} MiB ({dataclass_bytes / compact_bytes:.2f}x smaller)")
+
+    compact = CompactCourseStructure.from_structure(*build_course(0, modules, lessons))
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        compact.materialize_modules()
+    elapsed = (time.perf_counter() - start) / runs
+    print(f"materialize one course ({modules * lessons} lessons): {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
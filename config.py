@@ -11,3 +11,60 @@ class Config:
     HOST = os.getenv("HOST", "127.0.0.1")
     PORT = int(os.getenv("PORT", "5000"))
     COURSES_ROOT_DIRECTORY_ABS_PATH = os.getenv("COURSES_ROOT_DIRECTORY_ABS_PATH", "")
+
+
+    # Course structure cache (process-wide, revalidated by directory mtimes)
+    COURSE_STRUCTURE_CACHE_MAX_ENTRIES = int(os.getenv("COURSE_STRUCTURE_CACHE_MAX_ENTRIES", "256"))
+    COURSE_STRUCTURE_CACHE_MAX_BYTES = int(os.getenv("COURSE_STRUCTURE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    # Lesson paths per course, used for completion counts on course cards
+    LESSON_SET_CACHE_MAX_ENTRIES = int(os.getenv("LESSON_SET_CACHE_MAX_ENTRIES", "4096"))
+
+    # Rendered markdown lessons: in-memory LRU budget, and budget of the shared on-disk tier (0 = disabled)
+    MARKDOWN_CACHE_MAX_BYTES = int(os.getenv("MARKDOWN_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    MARKDOWN_DISK_CACHE_MAX_BYTES = int(os.getenv("MARKDOWN_DISK_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+    # Content type verdicts, each revalidated by the mtimes of the directories it was decided from
+    CONTENT_VERDICT_CACHE_MAX_ENTRIES = int(os.getenv("CONTENT_VERDICT_CACHE_MAX_ENTRIES", "4096"))
+
+    # Registry kept in memory per process; changes are written behind after this many seconds (0 = write through)
+    REGISTRY_WRITE_BEHIND_SECONDS = float(os.getenv("REGISTRY_WRITE_BEHIND_SECONDS", "2"))
+    # last_accessed of an item is written at most once per this many seconds
+    REGISTRY_ACCESS_FLUSH_SECONDS = float(os.getenv("REGISTRY_ACCESS_FLUSH_SECONDS", "60"))
+    # Registry storage: "json" (registry.json) or "sqlite" (indexed table in WAL mode)
+    REGISTRY_BACKEND = os.getenv("REGISTRY_BACKEND", "json").lower()
+    REGISTRY_SQLITE_PATH = os.getenv("REGISTRY_SQLITE_PATH", "app/data/registry.sqlite3")
+
+    # Registry and progress files append changes to a journal, compacted into the JSON snapshot
+    # once the journal is larger than both the snapshot and this many bytes
+    JSON_JOURNAL_ENABLED = os.getenv("JSON_JOURNAL_ENABLED", "False").lower() == "true"
+    JSON_JOURNAL_COMPACT_BYTES = int(os.getenv("JSON_JOURNAL_COMPACT_BYTES", str(256 * 1024)))
+    # Advisory lock files of the JSON repositories (kept out of the course directories)
+    FILE_LOCK_DIRECTORY = os.getenv("FILE_LOCK_DIRECTORY", "app/data/locks")
+
+    # Progress storage: "json" (a progress file in each course directory) or "sqlite" (one indexed database)
+    PROGRESS_BACKEND = os.getenv("PROGRESS_BACKEND", "json").lower()
+    PROGRESS_SQLITE_PATH = os.getenv("PROGRESS_SQLITE_PATH", "app/data/progress.sqlite3")
+
+    # Filesystem watcher keeping the registry and structure caches current
+    FILESYSTEM_WATCHER_ENABLED = os.getenv("FILESYSTEM_WATCHER_ENABLED", "False").lower() == "true"
+    FILESYSTEM_WATCHER_BACKEND = os.getenv("FILESYSTEM_WATCHER_BACKEND", "auto")  # auto, inotify or polling
+    FILESYSTEM_WATCHER_POLL_MIN_SECONDS = float(os.getenv("FILESYSTEM_WATCHER_POLL_MIN_SECONDS", "1"))
+    FILESYSTEM_WATCHER_POLL_MAX_SECONDS = float(os.getenv("FILESYSTEM_WATCHER_POLL_MAX_SECONDS", "30"))
+
+    # Playback positions are buffered in memory and written per course at most once per this many seconds
+    # (and before completion changes); 0 writes every position through
+    PROGRESS_FLUSH_INTERVAL_SECONDS = float(os.getenv("PROGRESS_FLUSH_INTERVAL_SECONDS", "10"))
+    # Without the watcher, a directory's rolled-up progress is checked against disk at most once per this many seconds
+    PROGRESS_ROLLUP_REVALIDATE_SECONDS = float(os.getenv("PROGRESS_ROLLUP_REVALIDATE_SECONDS", "30"))
+
+    # Worker threads analyzing child directories in DirectoryService.scan_directory (1 = serial)
+    DIRECTORY_SCAN_WORKERS = int(os.getenv("DIRECTORY_SCAN_WORKERS", "8"))
+
+    # Background media probing on a process pool
+    MEDIA_PROBE_BACKGROUND_ENABLED = os.getenv("MEDIA_PROBE_BACKGROUND_ENABLED", "False").lower() == "true"
+    MEDIA_PROBE_WORKERS = int(os.getenv("MEDIA_PROBE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+    # Startup crawl of the library prefilling the registry and caches
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "False").lower() == "true"
+    WARMUP_WORKERS = int(os.getenv("WARMUP_WORKERS", "4"))
@@ -8,14 +8,14 @@ This script provides utilities to manage the directory registry.
 import sys
 import json
 from config import Config
-from app.services.directory_registry_service import DirectoryRegistryService
+from app.services.registry_service import RegistryService
 from app.services.directory_service import DirectoryService
 
 
 def show_registry():
     """Display all entries in the registry."""
-    registry_service = DirectoryRegistryService()
-    entries = registry_service.get_all_entries()
+    registry_service = RegistryService()
+    entries = {**registry_service.get_all_directories(), **registry_service.get_all_courses()}
     
     if not entries:
         print("Registry is empty.")
@@ -28,7 +28,6 @@ def show_registry():
         print(f"Title: {entry['title']}")
         print(f"Path: {entry['path']}")
         print(f"Type: {entry['node_type']}")
-        print(f"Color: {entry['color']}")
         print(f"Registered: {entry['registered_at']}")
         print(f"Last Accessed: {entry['last_accessed']}")
         print("-" * 80)
@@ -36,7 +35,7 @@ def show_registry():
 
 def cleanup_registry(days=30):
     """Clean up old registry entries."""
-    registry_service = DirectoryRegistryService()
+    registry_service = RegistryService()
     removed_count = registry_service.cleanup_old_entries(days)
     
     if removed_count > 0:
@@ -47,7 +46,7 @@ def cleanup_registry(days=30):
 
 def clear_registry():
     """Clear all entries from the registry."""
-    registry_service = DirectoryRegistryService()
+    registry_service = RegistryService()
     registry_service.clear_all_entries()
     print("Registry cleared successfully.")
 
@@ -55,13 +54,45 @@ def clear_registry():
 def force_analyze():
     """Force analysis of the root directory, ignoring registry cache."""
     print(f"Force analyzing root directory: {Config.COURSES_ROOT_DIRECTORY_ABS_PATH}")
-    courses = DirectoryService.force_analyze_directory(Config.COURSES_ROOT_DIRECTORY_ABS_PATH)
+    with RegistryService().transaction():
+        courses = DirectoryService.force_analyze_directory(Config.COURSES_ROOT_DIRECTORY_ABS_PATH)
     print(f"Analysis complete. Found {len(courses)} courses/directories.")
     
     for course in courses:
         print(f"  - {course.title} ({course.node_type.value})")
 
 
+def migrate_sqlite():
+    """Copy the JSON registry into the SQLite registry used with REGISTRY_BACKEND=sqlite."""
+    from app.repositories.sqlite_registry_repository import SqliteRegistryRepository
+
+    registry_service = RegistryService(SqliteRegistryRepository())
+    migrated = registry_service.migrate_from_json_registry()
+    print(f"Migrated {migrated} entries to {registry_service.repository.file_path}")
+    if Config.REGISTRY_BACKEND != "sqlite":
+        print("Set REGISTRY_BACKEND=sqlite to use it.")
+
+
+def import_progress_sqlite():
+    """Copy the progress file of every registered course into the SQLite store used with PROGRESS_BACKEND=sqlite."""
+    from app.services.progress_service import ProgressService
+
+    course_paths = [entry["path"] for entry in RegistryService().get_all_courses().values()]
+    imported = ProgressService.import_to_sqlite(course_paths)
+    print(f"Imported the progress of {imported} of {len(course_paths)} registered courses into {Config.PROGRESS_SQLITE_PATH}")
+    if Config.PROGRESS_BACKEND != "sqlite":
+        print("Set PROGRESS_BACKEND=sqlite to use it.")
+
+
+def probe_media():
+    """Probe the duration of every media file in the library that is not cached yet."""
+    from app.services.media_probe_queue_service import MediaProbeQueueService
+
+    print(f"Probing media files in: {Config.COURSES_ROOT_DIRECTORY_ABS_PATH}")
+    probed = MediaProbeQueueService.probe_library(Config.COURSES_ROOT_DIRECTORY_ABS_PATH)
+    print(f"Probing complete. Probed {probed} new media files.")
+
+
 def main():
     """Main function to handle command line arguments."""
     if len(sys.argv) < 2:
@@ -70,6 +101,9 @@ def main():
         print("  python manage_registry.py cleanup [days] - Remove entries older than N days (default: 30)")
         print("  python manage_registry.py clear         - Clear all registry entries")
         print("  python manage_registry.py force-analyze - Force analysis of root directory (ignore cache)")
+        print("  python manage_registry.py probe-media   - Probe durations of all uncached media files")
+        print("  python manage_registry.py migrate-sqlite - Copy registry.json into the SQLite registry")
+        print("  python manage_registry.py import-progress-sqlite - Copy course progress files into the SQLite progress store")
         return
     
     command = sys.argv[1].lower()
@@ -87,9 +121,15 @@ def main():
             print("Operation cancelled.")
     elif command == "force-analyze":
         force_analyze()
+    elif command == "probe-media":
+        probe_media()
+    elif command == "migrate-sqlite":
+        migrate_sqlite()
+    elif command == "import-progress-sqlite":
+        import_progress_sqlite()
     else:
         print(f"Unknown command: {command}")
-        print("Use 'show', 'cleanup', 'clear', or 'force-analyze'")
+        print("Use 'show', 'cleanup', 'clear', 'force-analyze', 'probe-media', 'migrate-sqlite', or 'import-progress-sqlite'")
 
 
 if __name__ == "__main__":
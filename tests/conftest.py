@@ -10,3 +10,22 @@ def prefs_service(tmp_path):
     """
     test_file = tmp_path / "prefs.json"
     return UserPreferencesService(preferences_file=test_file)
+
+
+@pytest.fixture(autouse=True)
+def isolated_file_locks(tmp_path_factory, monkeypatch):
+    """Keep advisory lock files out of app/data during tests."""
+    from config import Config
+
+    monkeypatch.setattr(Config, "FILE_LOCK_DIRECTORY", str(tmp_path_factory.mktemp("locks")))
+
+
+@pytest.fixture(autouse=True)
+def isolated_media_duration_cache(tmp_path):
+    """Keep the media duration cache out of app/data during tests."""
+    from app.repositories.media_duration_repository import MediaDurationRepository
+    from app.services.media_duration_service import MediaDurationService
+
+    MediaDurationService.reset(MediaDurationRepository(tmp_path / "media_durations.json"))
+    yield
+    MediaDurationService.reset(MediaDurationRepository())
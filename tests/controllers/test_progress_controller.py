@@ -0,0 +1,63 @@
+import json
+import os
+import pytest
+from config import Config
+from app import create_app
+from app.models.course_model import NodeType
+from app.repositories.registry_repository import RegistryRepository
+from app.services.course_structure_service import CourseStructureService
+from app.services.progress_buffer_service import ProgressBufferService
+from app.services.progress_service import ProgressService
+from app.services.registry_service import RegistryService
+
+
+@pytest.fixture
+def courses(tmp_path, monkeypatch):
+    """Two registered courses; the registry lives in tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, "PROGRESS_FLUSH_INTERVAL_SECONDS", 60)
+    ProgressBufferService.reset()
+    paths = {}
+    for name in ["python", "rust"]:
+        course_path = tmp_path / "library" / name
+        os.makedirs(course_path / "01-basics")
+        (course_path / "01-basics" / "01-intro.mp4").write_text("x")
+        RegistryService().register_item(name.title(), str(course_path), NodeType.COURSE)
+        paths[name] = str(course_path)
+    yield paths
+    ProgressBufferService.reset()
+    RegistryRepository.flush_all()
+    for course_path in paths.values():
+        CourseStructureService.invalidate(course_path)
+
+
+@pytest.fixture
+def client():
+    return create_app().test_client()
+
+
+def test_batch_accepts_a_text_plain_beacon_body(courses, client):
+    body = {"course_id": "python", "operations": [
+        {"op": "complete", "lesson_path": "01-basics/01-intro.mp4"},
+        {"course_id": "rust", "op": "position", "lesson_path": "01-basics/01-intro.mp4", "position_seconds": 12},
+    ]}
+
+    response = client.post("/api/progress/batch", data=json.dumps(body), content_type="text/plain;charset=UTF-8")
+
+    assert response.status_code == 200
+    assert response.get_json()["applied"] == {"python": 1, "rust": 1}
+    assert ProgressService(courses["python"]).get_lesson_progress("01-basics/01-intro.mp4").completed
+    assert ProgressService(courses["rust"]).get_lesson_progress("01-basics/01-intro.mp4").last_position_seconds == 12.0
+
+
+def test_batch_with_an_invalid_course_writes_no_course(courses, client):
+    body = {"operations": [
+        {"course_id": "python", "op": "complete", "lesson_path": "01-basics/01-intro.mp4"},
+        {"course_id": "rust", "op": "complete_module", "module": "99-missing"},
+    ]}
+
+    response = client.post("/api/progress/batch", data=json.dumps(body), content_type="text/plain")
+
+    assert response.status_code == 400
+    assert ProgressService(courses["python"]).get_lesson_progress("01-basics/01-intro.mp4") is None
+    assert ProgressService(courses["rust"]).get_lesson_progress("01-basics/01-intro.mp4") is None
@@ -0,0 +1,108 @@
+import json
+import os
+import pytest
+from app.repositories.base_json_repository import BaseJsonRepository
+
+
+def test_transaction_commits_the_last_save_once(tmp_path, monkeypatch):
+    repository = BaseJsonRepository(str(tmp_path / "data.json"))
+    writes = []
+    original = BaseJsonRepository._write_file
+    monkeypatch.setattr(BaseJsonRepository, "_write_file",
+                        lambda self, data: writes.append(self.file_path) or original(self, data))
+
+    with repository.transaction():
+        for count in range(5):
+            repository.save({"count": count})
+            assert repository.load() == {"count": count}
+        assert not (tmp_path / "data.json").exists()
+
+    assert len(writes) == 1
+    with open(tmp_path / "data.json") as f:
+        assert json.load(f) == {"count": 4}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.json"]
+
+
+def test_failed_transaction_discards_pending_data(tmp_path):
+    repository = BaseJsonRepository(str(tmp_path / "data.json"))
+    repository.save({"count": 0})
+
+    with pytest.raises(RuntimeError):
+        with repository.transaction():
+            repository.save({"count": 1})
+            raise RuntimeError("scan failed")
+
+    assert repository.load() == {"count": 0}
+
+
+def test_journal_appends_changes_and_replays_them(tmp_path):
+    repository = BaseJsonRepository(str(tmp_path / "progress.json"), journaled=True)
+    repository.save({"lessons": {"a.mp4": {"position": 0}}})
+
+    for position in range(1, 4):
+        repository.set_value(["lessons", "a.mp4"], {"position": position})
+    repository.delete_value(["lessons", "missing.mp4"])
+
+    with open(tmp_path / "progress.json") as f:
+        assert json.load(f) == {"lessons": {"a.mp4": {"position": 0}}}
+    with open(repository.journal_path) as f:
+        assert len(f.readlines()) == 4
+    assert repository.load() == {"lessons": {"a.mp4": {"position": 3}}}
+
+
+def test_journal_ignores_a_torn_line_and_compacts(tmp_path, monkeypatch):
+    from config import Config
+
+    monkeypatch.setattr(Config, "JSON_JOURNAL_COMPACT_BYTES", 200)
+    repository = BaseJsonRepository(str(tmp_path / "progress.json"), journaled=True)
+    repository.set_value(["lessons", "a.mp4"], {"position": 1})
+    with open(repository.journal_path, "a") as f:
+        f.write('{"set": ["lessons", "b.mp4"], "val')
+
+    assert repository.load() == {"lessons": {"a.mp4": {"position": 1}}}
+
+    for position in range(2, 10):
+        repository.set_value(["lessons", "a.mp4"], {"position": position})
+
+    # Folded into the snapshot once the journal outgrew it and the threshold
+    assert repository._journal_size() < 200
+    assert repository.load()["lessons"]["a.mp4"] == {"position": 9}
+
+
+def test_load_takes_no_lock_and_works_in_a_read_only_directory(tmp_path):
+    course = tmp_path / "course"
+    course.mkdir()
+    (course / "progress.json").write_text('{"lessons": {"a.mp4": {"completed": true}}}')
+    os.chmod(course, 0o555)
+    try:
+        repository = BaseJsonRepository(str(course / "progress.json"), journaled=True)
+        assert repository.load() == {"lessons": {"a.mp4": {"completed": True}}}
+        assert BaseJsonRepository(str(course / "missing.json")).load() is None
+        assert sorted(p.name for p in course.iterdir()) == ["progress.json"]
+    finally:
+        os.chmod(course, 0o755)
+
+
+def test_load_racing_a_compaction_is_retried(tmp_path):
+    path = str(tmp_path / "progress.json")
+    writer = BaseJsonRepository(path, journaled=True)
+    writer.save({"lessons": {"a.mp4": {"position": 0}}})
+    writer.set_value(["lessons", "a.mp4"], {"position": 1})
+    writer.set_value(["lessons", "b.mp4"], {"position": 2})
+
+    reader = BaseJsonRepository(path, journaled=True)
+    replays = []
+
+    def replay_after_compaction(data):
+        # The reader has loaded the old snapshot; compaction now replaces it and empties the journal
+        if not replays:
+            writer.compact()
+        replays.append(dict(data))
+        BaseJsonRepository._replay_journal(reader, data)
+
+    reader._replay_journal = replay_after_compaction
+
+    expected = {"lessons": {"a.mp4": {"position": 1}, "b.mp4": {"position": 2}}}
+    assert reader.load() == expected
+    assert len(replays) == 1
+    assert writer._journal_size() == 0
@@ -0,0 +1,88 @@
+import json
+import multiprocessing
+import os
+import pytest
+from config import Config
+from app.models.course_model import NodeType
+from app.repositories.base_json_repository import BaseJsonRepository
+from app.repositories.registry_repository import RegistryRepository
+
+pytest.importorskip("fcntl")
+
+WORKERS = 4
+UPDATES = 25
+
+
+def _update_progress(course_directory, worker):
+    from app.services.progress_service import ProgressService
+
+    for index in range(UPDATES):
+        service = ProgressService(course_directory)
+        service.update_playback_position(f"module/{worker}-{index}.mp4", index)
+        service.update_playback_position("shared.mp4", index)
+        if index % 5 == 0:
+            service.mark_lesson_completed("shared.mp4")
+
+
+def _register_items(worker):
+    from app.services.registry_service import RegistryService
+
+    # Forget the registry state inherited from the parent process
+    RegistryRepository._documents = {}
+    for index in range(UPDATES):
+        RegistryService().register_item(f"Item {worker}-{index}", f"/library/{worker}/{index}", NodeType.COURSE)
+    RegistryRepository.flush_all()
+
+
+def _read_continuously(file_path, stop, errors):
+    repository = BaseJsonRepository(file_path)
+    while not stop.is_set():
+        try:
+            repository.load()
+        except IOError:
+            errors.value += 1
+
+
+def _hammer(target, args_per_worker, watched_file):
+    context = multiprocessing.get_context("fork")
+    stop, errors = context.Event(), context.Value("i", 0)
+    reader = context.Process(target=_read_continuously, args=(watched_file, stop, errors))
+    reader.start()
+    workers = [context.Process(target=target, args=args) for args in args_per_worker]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(timeout=60)
+    stop.set()
+    reader.join(timeout=10)
+
+    assert [process.exitcode for process in workers] == [0] * len(workers)
+    assert errors.value == 0
+
+
+@pytest.mark.parametrize("journaled", [False, True])
+def test_concurrent_progress_updates_are_not_lost(tmp_path, monkeypatch, journaled):
+    monkeypatch.setattr(Config, "JSON_JOURNAL_ENABLED", journaled)
+    monkeypatch.setattr(Config, "JSON_JOURNAL_COMPACT_BYTES", 4096)
+    course_directory = str(tmp_path)
+    progress_file = os.path.join(course_directory, ".learn_sphere_progress.json")
+
+    _hammer(_update_progress, [(course_directory, worker) for worker in range(WORKERS)], progress_file)
+
+    lessons = BaseJsonRepository(progress_file, journaled=journaled).load()["lessons"]
+    assert len(lessons) == WORKERS * UPDATES + 1
+    assert lessons["shared.mp4"]["completed"] is True
+
+
+def test_concurrent_registry_writers_merge(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, "REGISTRY_WRITE_BEHIND_SECONDS", 0)
+    registry_file = os.path.abspath(RegistryRepository.DEFAULT_REGISTRY_PATH)
+
+    try:
+        _hammer(_register_items, [(worker,) for worker in range(WORKERS)], registry_file)
+
+        with open(registry_file) as f:
+            assert len(json.load(f)["courses"]) == WORKERS * UPDATES
+    finally:
+        RegistryRepository.reset()
@@ -0,0 +1,70 @@
+import pytest
+from config import Config
+from app.repositories.progress_repository import ProgressRepository
+from app.repositories.sqlite_progress_repository import SqliteProgressRepository
+from app.services.progress_buffer_service import ProgressBufferService
+from app.services.progress_service import ProgressService
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    database_path = str(tmp_path / "progress.sqlite3")
+    monkeypatch.setattr(Config, "PROGRESS_BACKEND", "sqlite")
+    monkeypatch.setattr(Config, "PROGRESS_SQLITE_PATH", database_path)
+    monkeypatch.setattr(Config, "PROGRESS_FLUSH_INTERVAL_SECONDS", 60)
+    yield database_path
+    ProgressBufferService.reset()
+    SqliteProgressRepository.reset()
+
+
+def test_lesson_merges_are_upserts_of_the_given_columns(database, tmp_path):
+    service = ProgressService(str(tmp_path / "python"))
+    assert not service.repository.has_progress()
+
+    service.mark_lesson_completed("01/intro.mp4")
+    service.update_playback_position("01/intro.mp4", 42.0)
+    service.update_playback_positions({"01/setup.mp4": (7.0, "2026-01-01T00:00:00")})
+
+    progress = service.get_progress()
+    assert progress["lessons"]["01/intro.mp4"]["completed"] is True
+    assert progress["lessons"]["01/intro.mp4"]["last_position_seconds"] == 42.0
+    assert progress["lessons"]["01/setup.mp4"] == {
+        "completed": False, "last_position_seconds": 7.0, "last_accessed_at": "2026-01-01T00:00:00"
+    }
+    assert service.get_completed_lessons() == {"01/intro.mp4"}
+    assert service.repository.has_progress()
+
+    # A position reported earlier does not move the last access back
+    service.update_playback_positions({"01/setup.mp4": (9.0, "2025-01-01T00:00:00")})
+    setup = service.get_progress()["lessons"]["01/setup.mp4"]
+    assert (setup["last_position_seconds"], setup["last_accessed_at"]) == (9.0, "2026-01-01T00:00:00")
+    # Nothing is written into the course directory
+    assert not (tmp_path / "python").exists()
+
+
+def test_recent_lessons_span_courses(database, tmp_path):
+    for course, lesson, accessed_at in [("python", "a.mp4", "2026-01-02"), ("rust", "b.mp4", "2026-01-03"),
+                                        ("python", "c.mp4", "2026-01-01")]:
+        ProgressService(str(tmp_path / course)).update_playback_positions({lesson: (1.0, accessed_at)})
+
+    recent = ProgressService.get_recent_lessons([], limit=2)
+
+    assert [(lesson["course_path"], lesson["lesson_path"]) for lesson in recent] == [
+        (str(tmp_path / "rust"), "b.mp4"), (str(tmp_path / "python"), "a.mp4")
+    ]
+
+
+def test_progress_files_are_imported(database, tmp_path):
+    course = tmp_path / "python"
+    course.mkdir()
+    ProgressRepository(str(course)).save({
+        "lessons": {"01/intro.mp4": {"completed": True, "last_position_seconds": 3.0, "last_accessed_at": "2026-01-01"}},
+        "last_updated_at": "2026-01-01"
+    })
+
+    assert ProgressService.import_to_sqlite([str(course), str(tmp_path / "rust")]) == 1
+
+    assert SqliteProgressRepository(str(course)).load() == {
+        "lessons": {"01/intro.mp4": {"completed": True, "last_position_seconds": 3.0, "last_accessed_at": "2026-01-01"}},
+        "last_updated_at": "2026-01-01"
+    }
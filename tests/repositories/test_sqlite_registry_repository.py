@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+import threading
+import pytest
+from app.repositories.sqlite_registry_repository import SqliteRegistryRepository
+
+
+@pytest.fixture
+def repository(tmp_path):
+    yield SqliteRegistryRepository(str(tmp_path / "registry.sqlite3"))
+    SqliteRegistryRepository.reset()
+
+
+def entry(title, path, node_type="course", last_accessed=None):
+    now = (last_accessed or datetime.now()).isoformat()
+    return {"title": title, "path": path, "node_type": node_type, "registered_at": now, "last_accessed": now}
+
+
+def test_lookups_use_id_path_and_parent(repository):
+    repository.set_entry("directories", "Library|/library", entry("Library", "/library", "directory"))
+    repository.set_entry("courses", "Python|/library/python", entry("Python", "/library/python"))
+    repository.set_entry("directories", "Python|/library/python", entry("Python", "/library/python", "directory"))
+    repository.set_entry("courses", "Rust|/library/rust", entry("Rust", "/library/rust"))
+
+    assert repository.find_by_id("courses", "rust")["path"] == "/library/rust"
+    assert repository.find_by_id("courses", "go") is None
+    assert repository.find_by_path("/library/python")["node_type"] == "directory"
+    assert [child["title"] for child in repository.get_child_entries("/library")] == ["Python", "Python", "Rust"]
+    assert list(repository.get_section("courses")) == ["Python|/library/python", "Rust|/library/rust"]
+
+
+def test_root_path_ignores_sibling_prefixes(repository):
+    for path in ["/library/b", "/library/b-c", "/library/b/d"]:
+        repository.set_entry("courses", f"x|{path}", entry("x", path))
+
+    assert repository.get_root_path() == "/library"
+
+    repository.remove_tree("/library/b")
+    assert repository.get_root_path() == "/library/b-c"
+
+
+def test_cleanup_and_remove_tree(repository):
+    old = datetime.now() - timedelta(days=40)
+    repository.set_entry("directories", "A|/library/a", entry("A", "/library/a", "directory", old))
+    repository.set_entry("courses", "B|/library/a/b", entry("B", "/library/a/b"))
+    repository.set_entry("courses", "C|/library/c", entry("C", "/library/c", last_accessed=old))
+    repository.record_access("courses", "C|/library/c", datetime.now())
+
+    assert repository.remove_accessed_before(datetime.now() - timedelta(days=31)) == 1
+    assert repository.remove_tree("/library/a") == 1
+    assert list(repository.get_section("courses")) == ["C|/library/c"]
+
+
+def test_failed_transaction_is_rolled_back(repository):
+    with pytest.raises(RuntimeError):
+        with repository.transaction():
+            repository.set_entry("courses", "A|/library/a", entry("A", "/library/a"))
+            raise RuntimeError()
+
+    assert repository.get_section("courses") == {}
+
+
+def test_transaction_queues_writes_without_locking_the_database(repository):
+    other_thread = []
+
+    def write_from_another_thread():
+        other = SqliteRegistryRepository(repository.file_path)
+        other.set_entry("courses", "B|/library/b", entry("B", "/library/b"))
+        other_thread.append(other.get_entry("courses", "A|/library/a"))
+
+    with repository.transaction():
+        repository.set_entry("courses", "A|/library/a", entry("A", "/library/a"))
+
+        # Another writer is not blocked while the block runs, and sees nothing queued yet
+        thread = threading.Thread(target=write_from_another_thread)
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert other_thread == [None]
+
+        # The thread that queued the write reads it back
+        assert repository.get_entry("courses", "A|/library/a")["title"] == "A"
+        repository.set_entry("courses", "C|/library/c", entry("C", "/library/c"))
+        assert repository.remove_tree("/library/c") == 1
+
+    assert list(repository.get_section("courses")) == ["B|/library/b", "A|/library/a"]
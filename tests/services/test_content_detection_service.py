@@ -0,0 +1,93 @@
+import os
+import pytest
+from app.models.course_model import NodeType
+from app.models.lesson_type import LessonType
+from app.services.content_detection_service import ContentDetectionService
+from app.utils.directory_scanner import DirectoryScanner
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+@pytest.fixture
+def course_dir(tmp_path):
+    """A course with two modules and a root-level lesson."""
+    course = tmp_path / "python-course"
+    _touch(str(course / "10-advanced" / "01-decorators.mp4"))
+    _touch(str(course / "2-basics" / "02-loops.md"))
+    _touch(str(course / "2-basics" / "01-intro.mp4"))
+    _touch(str(course / "2-basics" / ".hidden.mp4"))
+    _touch(str(course / "intro.mp3"))
+    _touch(str(course / "cover.jpg"))
+    return str(course)
+
+
+def test_detects_course(course_dir):
+    assert ContentDetectionService.detect_content_type(course_dir) == NodeType.COURSE
+
+
+def test_detects_module(course_dir):
+    module_dir = os.path.join(course_dir, "2-basics")
+    assert ContentDetectionService.detect_content_type(module_dir) == NodeType.MODULE
+
+
+def test_detects_directory(tmp_path, course_dir):
+    assert ContentDetectionService.detect_content_type(str(tmp_path)) == NodeType.DIRECTORY
+    assert ContentDetectionService.detect_content_type(str(tmp_path / "missing")) == NodeType.DIRECTORY
+
+
+def test_scan_course_builds_sorted_modules_and_root_lessons(course_dir):
+    modules, lessons = ContentDetectionService.scan_course(course_dir)
+
+    assert [m.directory_name for m in modules] == ["2-basics", "10-advanced"]
+    assert [m.module_number for m in modules] == [1, 2]
+    assert [l.title for l in modules[0].lessons] == ["intro", "loops"]
+    assert modules[0].lessons[0].lesson_type == LessonType.VIDEO
+    assert modules[0].lessons[0].file_path == os.path.join(course_dir, "2-basics", "01-intro.mp4")
+
+    # Only lesson-type files count as root lessons
+    assert [l.title for l in lessons] == ["intro"]
+
+
+def test_scan_course_matches_individual_scans(course_dir):
+    modules, lessons = ContentDetectionService.scan_course(course_dir)
+
+    assert modules == ContentDetectionService.scan_course_modules(course_dir)
+    assert lessons == ContentDetectionService.scan_course_lessons(course_dir)
+
+
+def test_analyze_directory_classifies_and_scans_in_one_pass(tmp_path, course_dir):
+    node_type, modules, lessons = ContentDetectionService.analyze_directory(course_dir)
+    assert node_type == NodeType.COURSE
+    assert (modules, lessons) == ContentDetectionService.scan_course(course_dir)
+
+    assert ContentDetectionService.analyze_directory(str(tmp_path)) == (NodeType.DIRECTORY, [], [])
+
+
+def test_verdict_is_cached_until_a_dependency_changes(tmp_path, course_dir, monkeypatch):
+    assert ContentDetectionService.detect_content_type(course_dir) == NodeType.COURSE
+
+    listed = []
+    original = DirectoryScanner.list_directory
+    monkeypatch.setattr(DirectoryScanner, "list_directory",
+                        lambda path, *args, **kwargs: listed.append(path) or original(path, *args, **kwargs))
+    assert ContentDetectionService.detect_content_type(course_dir) == NodeType.COURSE
+    assert listed == []
+
+    # A folder inside a module turns the course into a directory
+    os.makedirs(os.path.join(course_dir, "2-basics", "nested"))
+    assert ContentDetectionService.detect_content_type(course_dir) == NodeType.DIRECTORY
+    assert listed
+
+
+def test_classification_stops_at_the_first_invalid_subdirectory(tmp_path):
+    for name in ["a-nested", "b-course", "c-course"]:
+        _touch(str(tmp_path / "programming" / name / "01-module" / "01-lesson.mp4"))
+
+    node_type, mtimes = ContentDetectionService._classify_directory(str(tmp_path / "programming"))
+
+    assert node_type == NodeType.DIRECTORY
+    # The root plus the single subdirectory that decided the verdict
+    assert len(mtimes) == 2
@@ -0,0 +1,141 @@
+import os
+import pytest
+from app.models.compact_course_structure import CompactCourseStructure
+from app.services.content_detection_service import ContentDetectionService
+from app.services.course_structure_service import CourseStructureService
+from app.utils.lru_cache import LruCache
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+@pytest.fixture
+def course_dir(tmp_path):
+    course = tmp_path / "course"
+    _touch(str(course / "01-module" / "01-intro.mp4"))
+    _touch(str(course / "01-module" / "02-setup.md"))
+    _touch(str(course / "outro.mp4"))
+    CourseStructureService.clear_cache()
+    yield str(course)
+    CourseStructureService.clear_cache()
+
+
+def test_second_call_is_served_from_cache(course_dir):
+    before = CourseStructureService.get_cache_stats()
+
+    first = CourseStructureService.get_course_structure(course_dir)
+    second = CourseStructureService.get_course_structure(course_dir)
+
+    stats = CourseStructureService.get_cache_stats()
+    assert stats["misses"] == before["misses"] + 1
+    assert stats["hits"] == before["hits"] + 1
+    assert first == second
+
+
+def test_returned_structure_is_a_copy(course_dir):
+    modules, lessons = CourseStructureService.get_course_structure(course_dir)
+    modules[0].lessons[0].completed = True
+    lessons[0].completed = True
+
+    modules, lessons = CourseStructureService.get_course_structure(course_dir)
+    assert modules[0].lessons[0].completed is False
+    assert lessons[0].completed is False
+
+
+def test_module_change_invalidates_entry(course_dir):
+    modules, _ = CourseStructureService.get_course_structure(course_dir)
+    assert len(modules[0].lessons) == 2
+
+    _touch(os.path.join(course_dir, "01-module", "03-next.mp4"))
+    _touch(os.path.join(course_dir, "02-module", "01-more.mp4"))
+
+    modules, _ = CourseStructureService.get_course_structure(course_dir)
+    assert len(modules[0].lessons) == 3
+    assert [m.directory_name for m in modules] == ["01-module", "02-module"]
+
+
+def test_hidden_file_writes_keep_entry(course_dir):
+    from app.services.progress_service import ProgressService
+
+    CourseStructureService.get_course_structure(course_dir)
+    misses = CourseStructureService.get_cache_stats()["misses"]
+
+    # Atomic replace of the progress file and its lock file change the course directory mtime
+    ProgressService(course_dir).mark_lesson_completed("outro.mp4")
+    os.utime(course_dir, ns=(0, 0))
+
+    CourseStructureService.get_course_structure(course_dir)
+    assert CourseStructureService.get_cache_stats()["misses"] == misses
+
+
+def test_playlist_navigation_crosses_module_boundaries(course_dir):
+    playlist = CourseStructureService.get_course_playlist(course_dir)
+
+    assert playlist.lesson_paths == ["01-module/01-intro.mp4", "01-module/02-setup.md", "outro.mp4"]
+    assert playlist.get_navigation("01-module/02-setup.md") == {"next": "outro.mp4", "previous": "01-module/01-intro.mp4"}
+    assert playlist.get_navigation("missing.mp4") == {"next": None, "previous": None}
+    assert playlist.is_module_boundary("01-module/02-setup.md")
+    assert not playlist.is_module_boundary("01-module/01-intro.mp4")
+    assert CourseStructureService.get_course_playlist(course_dir) is playlist
+
+
+def test_lesson_navigation_flags_neighbours_in_other_modules(course_dir):
+    from app.services.lesson_service import LessonService
+
+    assert LessonService.get_lesson_navigation(course_dir, "01-module/02-setup.md") == {
+        "next": "outro.mp4", "previous": "01-module/01-intro.mp4",
+        "next_in_other_module": True, "previous_in_other_module": False
+    }
+    assert LessonService.get_lesson_navigation(course_dir, "outro.mp4") == {
+        "next": None, "previous": "01-module/02-setup.md",
+        "next_in_other_module": False, "previous_in_other_module": True
+    }
+
+
+def test_playlist_is_rebuilt_after_invalidation(course_dir):
+    playlist = CourseStructureService.get_course_playlist(course_dir)
+    _touch(os.path.join(course_dir, "01-module", "03-extra.mp4"))
+
+    rebuilt = CourseStructureService.get_course_playlist(course_dir)
+    assert rebuilt is not playlist
+    assert rebuilt.get_navigation("01-module/03-extra.mp4")["next"] == "outro.mp4"
+    assert CourseStructureService.get_module(course_dir, "01-module").lessons[-1].title
+    assert CourseStructureService.get_module(course_dir, "missing") is None
+
+
+def test_compact_structure_materializes_the_scanned_structure(course_dir):
+    scanned = ContentDetectionService.scan_course(course_dir)
+    compact = CompactCourseStructure.from_structure(course_dir, *scanned)
+
+    assert (compact.materialize_modules(), compact.materialize_lessons()) == scanned
+    assert CourseStructureService.get_course_structure(course_dir) == scanned
+    assert compact.relative_path(compact.root_start) == "outro.mp4"
+
+
+def test_lru_cache_evicts_by_entries_and_bytes():
+    cache = LruCache(max_entries=2, max_bytes=10, sizeof=len)
+    cache.put("a", "xxx")
+    cache.put("b", "xxx")
+    cache.get("a")
+    cache.put("c", "xxx")
+
+    # "b" was least recently used
+    assert cache.keys() == ["a", "c"]
+
+    cache.put("d", "xxxxxxxx")
+    assert cache.keys() == ["d"]
+    assert cache.stats()["evictions"] == 3
+
+
+def test_lesson_set_matches_structure_and_follows_changes(course_dir):
+    lesson_set = CourseStructureService.get_lesson_set(course_dir)
+    assert lesson_set.lesson_paths == {"01-module/01-intro.mp4", "01-module/02-setup.md", "outro.mp4"}
+
+    CourseStructureService.clear_cache()
+    CourseStructureService.get_course_structure(course_dir)
+    assert CourseStructureService.get_lesson_set(course_dir) == lesson_set
+
+    os.remove(os.path.join(course_dir, "outro.mp4"))
+    assert CourseStructureService.get_lesson_set(course_dir).count == 2
@@ -0,0 +1,64 @@
+import os
+import pytest
+from config import Config
+from app.models.course_model import NodeType
+from app.repositories.base_json_repository import BaseJsonRepository
+from app.services.course_structure_service import CourseStructureService
+from app.services.directory_service import DirectoryService
+from app.services.progress_rollup_service import ProgressRollupService
+from app.services.registry_service import RegistryService
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    """A library root with courses and a nested directory; the registry lives in tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    root = tmp_path / "library"
+    for name in ["web-dev", "data_science", "Web Dev", "algorithms"]:
+        _touch(str(root / name / "01-module" / "01-lesson.mp4"))
+    _touch(str(root / "web-dev" / "cover.png"))
+    _touch(str(root / "programming" / "rust" / "01-module" / "01-lesson.mp4"))
+    _touch(str(root / ".hidden" / "01-module" / "01-lesson.mp4"))
+    CourseStructureService.clear_cache()
+    yield str(root)
+    CourseStructureService.clear_cache()
+
+
+def test_scan_directory_builds_sorted_cards(library):
+    courses = DirectoryService.scan_directory(library, max_workers=1)
+
+    assert [c.id for c in courses] == ["algorithms", "data_science", "programming", "Web Dev", "web-dev"]
+    by_id = {c.id: c for c in courses}
+    assert by_id["programming"].node_type == NodeType.DIRECTORY
+    assert by_id["web-dev"].node_type == NodeType.COURSE
+    assert by_id["web-dev"].image_path == "/media/course/web-dev/cover.png"
+
+
+def test_parallel_scan_matches_serial_scan(library):
+    # Directory cards read rolled-up progress, which is "pending" until seeded in the background
+    ProgressRollupService.get_counts(os.path.join(library, "programming"))
+    ProgressRollupService.wait_for_background()
+
+    cold_serial = DirectoryService.scan_directory(library, max_workers=1)
+    warm_parallel = DirectoryService.scan_directory(library, max_workers=4)
+    forced_parallel = DirectoryService.scan_directory(library, force_analysis=True, max_workers=4)
+
+    assert cold_serial == warm_parallel == forced_parallel
+
+
+def test_scan_commits_registry_changes_in_one_write(library, monkeypatch):
+    monkeypatch.setattr(Config, "REGISTRY_WRITE_BEHIND_SECONDS", 0)
+    RegistryService()  # creates the empty registry file
+    writes = []
+    original = BaseJsonRepository._write_file
+    monkeypatch.setattr(BaseJsonRepository, "_write_file",
+                        lambda self, data: writes.append(self.file_path) or original(self, data))
+
+    DirectoryService.scan_directory(library, max_workers=1)
+
+    assert [path for path in writes if path.endswith("registry.json")] == [os.path.abspath("app/data/registry.json")]
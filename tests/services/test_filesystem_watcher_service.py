@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+import pytest
+from app.models.course_model import NodeType
+from app.repositories.registry_repository import RegistryRepository
+from app.services.course_structure_service import CourseStructureService
+from app.services.filesystem_watcher_service import FilesystemWatcherService, InotifyBackend, PollingBackend
+from app.services.registry_service import RegistryService
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    """A library root with one course, and a registry file inside tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    root = tmp_path / "library"
+    _touch(str(root / "python" / "01-basics" / "01-intro.mp4"))
+    monkeypatch.setattr(FilesystemWatcherService, "root_path", str(root))
+    CourseStructureService.clear_cache()
+    yield str(root)
+    # Write the registry behind while tmp_path is still the working directory
+    RegistryRepository.flush_all()
+    CourseStructureService.clear_cache()
+
+
+def test_apply_changes_registers_and_unregisters_children(library):
+    registry = RegistryService()
+    course_path = os.path.join(library, "python")
+
+    FilesystemWatcherService.apply_changes({library})
+    assert registry.find_entry_by_path(course_path)["node_type"] == NodeType.COURSE.value
+
+    _touch(os.path.join(library, "rust", "01-start", "01-hello.mp4"))
+    os.rename(course_path, os.path.join(library, "python3"))
+    FilesystemWatcherService.apply_changes({library})
+
+    assert registry.find_entry_by_path(course_path) is None
+    assert registry.find_entry_by_path(os.path.join(library, "python3")) is not None
+    assert registry.find_entry_by_path(os.path.join(library, "rust")) is not None
+
+
+def test_apply_changes_reclassifies_and_invalidates_structure(library):
+    registry = RegistryService()
+    course_path = os.path.join(library, "python")
+    FilesystemWatcherService.apply_changes({library})
+    CourseStructureService.get_course_structure(course_path)
+
+    # A nested folder inside a module turns the course into a directory
+    module_path = os.path.join(course_path, "01-basics")
+    os.makedirs(os.path.join(module_path, "nested"))
+    FilesystemWatcherService.apply_changes({module_path})
+
+    assert registry.find_entry_by_path(course_path)["node_type"] == NodeType.DIRECTORY.value
+    assert CourseStructureService._cache.peek(course_path) is None
+
+
+def test_polling_backend_reports_changed_directories(library):
+    backend = PollingBackend(library, min_interval=0.01, max_interval=0.02)
+    assert backend.wait_for_changes(timeout=0.01) == set()
+
+    module_path = os.path.join(library, "python", "01-basics")
+    _touch(os.path.join(module_path, "02-next.mp4"))
+    assert module_path in backend.wait_for_changes(timeout=0.01)
+
+
+def test_idle_polls_back_off_to_the_max_interval(library):
+    backend = PollingBackend(library, min_interval=0.01, max_interval=0.08)
+    for _ in range(4):
+        assert backend.wait_for_changes(timeout=0.005) == set()
+    assert backend.interval == 0.08
+
+    # The timeout only slices the sleep, the backend still waits its whole interval
+    started = time.monotonic()
+    backend.wait_for_changes(timeout=0.005)
+    assert time.monotonic() - started >= 0.08
+
+    _touch(os.path.join(library, "python", "01-basics", "02-next.mp4"))
+    assert backend.wait_for_changes(timeout=0.005)
+    assert backend.interval == 0.01
+
+
+def test_polling_backend_returns_promptly_when_stopped(library):
+    stop_event = threading.Event()
+    backend = PollingBackend(library, min_interval=30, max_interval=30, stop_event=stop_event)
+    stop_event.set()
+
+    started = time.monotonic()
+    assert backend.wait_for_changes(timeout=1.0) == set()
+    assert time.monotonic() - started < 1.0
+
+
+def test_inotify_backend_reports_changed_directories(library):
+    try:
+        backend = InotifyBackend(library)
+    except OSError:
+        pytest.skip("inotify not available")
+
+    try:
+        module_path = os.path.join(library, "python", "01-basics")
+        _touch(os.path.join(module_path, "02-next.mp4"))
+        _touch(os.path.join(module_path, ".hidden.json"))
+        assert backend.wait_for_changes(timeout=1.0) == {module_path}
+
+        # Directories created after start are watched too
+        new_module = os.path.join(library, "python", "02-more")
+        os.makedirs(new_module)
+        assert backend.wait_for_changes(timeout=1.0) == {os.path.join(library, "python")}
+        _touch(os.path.join(new_module, "01-a.mp4"))
+        assert backend.wait_for_changes(timeout=1.0) == {new_module}
+    finally:
+        backend.close()
+
+
+def test_full_rescan_rebuilds_the_backend_and_reconciles_the_registry(library, monkeypatch):
+    from config import Config
+    from app.services.filesystem_watcher_service import FULL_RESCAN
+
+    registry = RegistryService()
+    FilesystemWatcherService.apply_changes({library})
+    os.makedirs(os.path.join(library, "archive", "old"))
+    FilesystemWatcherService.apply_changes({library})
+    assert registry.find_entry_by_path(os.path.join(library, "archive"))["node_type"] == NodeType.DIRECTORY.value
+
+    class LostBackend:
+        closed = False
+
+        def close(self):
+            LostBackend.closed = True
+
+    # Changes made while events were lost, in a subtree the backend no longer watched
+    _touch(os.path.join(library, "archive", "go", "01-start", "01-hello.mp4"))
+    os.rename(os.path.join(library, "python"), os.path.join(library, "python3"))
+    CourseStructureService.get_course_structure(os.path.join(library, "python3"))
+    monkeypatch.setattr(Config, "FILESYSTEM_WATCHER_BACKEND", "polling")
+    monkeypatch.setattr(FilesystemWatcherService, "_backend", LostBackend())
+
+    FilesystemWatcherService.apply_changes({FULL_RESCAN})
+
+    assert LostBackend.closed
+    assert isinstance(FilesystemWatcherService._backend, PollingBackend)
+    assert registry.find_entry_by_path(os.path.join(library, "python")) is None
+    assert registry.find_entry_by_path(os.path.join(library, "python3")) is not None
+    assert registry.find_entry_by_path(os.path.join(library, "archive", "go"))["node_type"] == NodeType.COURSE.value
+    assert CourseStructureService._cache.peek(os.path.join(library, "python3")) is None
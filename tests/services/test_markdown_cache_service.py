@@ -0,0 +1,93 @@
+import os
+import pytest
+from config import Config
+from app.repositories.rendered_markdown_repository import RenderedMarkdownRepository
+from app.services.lesson_service import LessonService
+from app.services.markdown_cache_service import MarkdownCacheService
+from app.utils.lru_cache import LruCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(MarkdownCacheService, "_memory", LruCache(max_entries=0, max_bytes=1024 * 1024))
+    monkeypatch.setattr(MarkdownCacheService, "_disk", RenderedMarkdownRepository(tmp_path / "cache", max_bytes=1024 * 1024))
+    monkeypatch.setattr(MarkdownCacheService, "_stats", {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+    monkeypatch.setattr(Config, "MARKDOWN_DISK_CACHE_MAX_BYTES", 1024 * 1024)
+    return tmp_path
+
+
+def test_lessons_are_rendered_once_per_version(cache, monkeypatch):
+    lesson = cache / "notes.md"
+    lesson.write_text("# Title\n\n```python\nprint(1)\n```\n")
+    renders = []
+    original = LessonService._render_markdown
+    monkeypatch.setattr(LessonService, "_render_markdown", staticmethod(lambda content: renders.append(content) or original(content)))
+
+    first = LessonService.prepare_lesson_content(str(lesson))["text_content"]
+    assert LessonService.prepare_lesson_content(str(lesson))["text_content"] == first
+    assert "<h1>Title</h1>" in first
+
+    # Another process starts with an empty memory tier and reads the disk tier
+    MarkdownCacheService._memory.clear()
+    assert LessonService.prepare_lesson_content(str(lesson))["text_content"] == first
+
+    lesson.write_text("# Changed\n")
+    os.utime(lesson, ns=(1, 1))
+    assert "<h1>Changed</h1>" in LessonService.prepare_lesson_content(str(lesson))["text_content"]
+
+    assert len(renders) == 2
+    stats = MarkdownCacheService.get_stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 2)
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    repository = RenderedMarkdownRepository(tmp_path, max_bytes=350)
+    for index, key in enumerate(["a", "b", "c"]):
+        repository.put(key, "x" * 100)
+        os.utime(repository._path(key), ns=(index, index))
+
+    repository.get("a")
+    repository.put("d", "x" * 100)
+
+    assert [repository.get(key) is not None for key in "abcd"] == [True, False, False, True]
+    assert repository.evictions == 2
+    assert repository.size() == 200
+
+
+def test_failed_renders_show_raw_text_and_are_not_cached(cache, monkeypatch):
+    lesson = cache / "notes.md"
+    lesson.write_text("# Title\n")
+    original = LessonService._render_markdown
+
+    def failing(content):
+        raise ValueError("broken extension")
+
+    monkeypatch.setattr(LessonService, "_render_markdown", staticmethod(failing))
+    assert LessonService.prepare_lesson_content(str(lesson))["text_content"] == "# Title\n"
+
+    monkeypatch.setattr(LessonService, "_render_markdown", staticmethod(original))
+
+    # An unreadable file (e.g. fixed later with chmod, which keeps the mtime) shows the error uncached
+    read_text = LessonService._read_text
+
+    def unreadable(file_path):
+        raise PermissionError(13, "Permission denied", file_path)
+
+    monkeypatch.setattr(LessonService, "_read_text", staticmethod(unreadable))
+    assert "Permission denied" in LessonService.prepare_lesson_content(str(lesson))["text_content"]
+    assert MarkdownCacheService.get_stats()["disk"]["bytes"] == 0
+
+    monkeypatch.setattr(LessonService, "_read_text", staticmethod(read_text))
+    assert "<h1>Title</h1>" in LessonService.prepare_lesson_content(str(lesson))["text_content"]
+    assert MarkdownCacheService.get_stats()["disk"]["bytes"] > 0
+
+
+def test_cache_key_depends_on_the_pygments_version(cache, monkeypatch):
+    pygments = pytest.importorskip("pygments")
+    lesson = cache / "notes.md"
+    lesson.write_text("# Title\n")
+    stat_result = os.stat(lesson)
+    key = MarkdownCacheService.cache_key(str(lesson), stat_result, LessonService.MARKDOWN_EXTENSIONS)
+
+    monkeypatch.setattr(pygments, "__version__", "0.0")
+    assert MarkdownCacheService.cache_key(str(lesson), stat_result, LessonService.MARKDOWN_EXTENSIONS) != key
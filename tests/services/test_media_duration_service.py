@@ -0,0 +1,100 @@
+import os
+import wave
+from app.models.lesson_type import LessonType
+from app.repositories.media_duration_repository import MediaDurationRepository
+from app.services.content_detection_service import ContentDetectionService
+from app.services.lesson_service import LessonService
+from app.services.media_duration_service import MediaDurationService
+
+
+def _write_wav(path, seconds, rate=8000):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(1)
+        f.setframerate(rate)
+        f.writeframes(b"\x80" * rate * seconds)
+
+
+def test_probes_real_duration(tmp_path):
+    path = str(tmp_path / "lesson.wav")
+    _write_wav(path, 3)
+
+    assert MediaDurationService.get_duration(path) == 3
+    assert MediaDurationService.get_duration(str(tmp_path / "notes.md")) == 0
+
+
+def test_duration_is_probed_once_and_persisted(tmp_path, monkeypatch):
+    path = str(tmp_path / "lesson.wav")
+    _write_wav(path, 2)
+    MediaDurationService.get_duration(path)
+    MediaDurationService.save()
+
+    # A fresh process reads the persisted cache instead of probing
+    MediaDurationService.reset(MediaDurationRepository(tmp_path / "media_durations.json"))
+    monkeypatch.setattr(MediaDurationService, "probe_duration", staticmethod(lambda p: 999))
+    assert MediaDurationService.get_duration(path) == 2
+
+    # Rewriting the file changes its key, so it is probed again
+    _write_wav(path, 4)
+    os.utime(path, ns=(1, 1))
+    assert MediaDurationService.get_duration(path) == 999
+
+
+def test_module_and_lesson_durations_are_real_sums(tmp_path):
+    course = tmp_path / "course"
+    _write_wav(str(course / "01-module" / "01-a.wav"), 2)
+    _write_wav(str(course / "01-module" / "02-b.wav"), 3)
+    open(course / "01-module" / "03-notes.md", "w").close()
+
+    modules, _ = ContentDetectionService.scan_course(str(course))
+    assert modules[0].total_duration_seconds == 5
+
+    metadata = LessonService.get_file_metadata(str(course / "01-module" / "02-b.wav"), LessonType.AUDIO)
+    assert metadata["duration_seconds"] == 3
+    assert metadata["duration"] == "00:03"
+
+
+def test_scans_key_durations_from_the_listing_and_save_only_new_ones(tmp_path, monkeypatch):
+    course = tmp_path / "course"
+    _write_wav(str(course / "01-module" / "01-a.wav"), 2)
+    _write_wav(str(course / "intro.wav"), 1)
+    monkeypatch.setattr(MediaDurationService, "SAVE_DELAY_SECONDS", 60)
+    saves = []
+    monkeypatch.setattr(MediaDurationService.repository, "update", lambda mutator: saves.append(mutator))
+    stats = []
+    original_stat = os.stat
+    monkeypatch.setattr(os, "stat", lambda path, *args, **kwargs: stats.append(path) or original_stat(path, *args, **kwargs))
+
+    ContentDetectionService.scan_course(str(course))
+    ContentDetectionService.scan_course(str(course))
+    LessonService.get_file_metadata(str(course / "intro.wav"), LessonType.AUDIO)
+
+    # Keys come from the DirEntry of each listed file, not a separate os.stat
+    assert not [path for path in stats if str(path).endswith(".wav") and "intro" not in str(path)]
+    # Two new durations, written once behind the scans
+    assert saves == []
+    assert MediaDurationService._save_timer is not None
+    MediaDurationService._save_on_timer()
+    assert len(saves) == 1
+    MediaDurationService.save()
+    assert len(saves) == 1
+
+
+def test_save_drops_the_entries_of_replaced_versions(tmp_path):
+    repository = MediaDurationRepository(tmp_path / "media_durations.json")
+    MediaDurationService.reset(repository)
+    path = str(tmp_path / "lesson.wav")
+    _write_wav(path, 2)
+    MediaDurationService.get_duration(path)
+    MediaDurationService.save()
+
+    _write_wav(path, 4)
+    os.utime(path, ns=(1, 1))
+    assert MediaDurationService.get_duration(path) == 4
+    MediaDurationService.save()
+
+    durations = repository.load()["durations"]
+    assert [entry["duration_seconds"] for entry in durations.values()] == [4]
+    MediaDurationService.reset(repository)
+    assert MediaDurationService.get_duration(path) == 4
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+import wave
+import pytest
+from app.services.content_detection_service import ContentDetectionService
+from app.services.media_duration_service import MediaDurationService
+from app.services.media_probe_queue_service import MediaProbeQueueService, probe_media_file
+
+
+def _write_wav(path, seconds, rate=8000):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(1)
+        f.setframerate(rate)
+        f.writeframes(b"\x80" * rate * seconds)
+
+
+@pytest.fixture
+def probe_queue():
+    MediaProbeQueueService.start(max_workers=1)
+    yield MediaProbeQueueService
+    MediaProbeQueueService.stop()
+
+
+def _wait_until_idle(timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while MediaProbeQueueService.get_status()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_lessons_are_pending_until_probed(tmp_path, probe_queue):
+    course = tmp_path / "course"
+    _write_wav(str(course / "01-module" / "01-a.wav"), 2)
+    _write_wav(str(course / "01-module" / "02-b.wav"), 3)
+
+    modules, _ = ContentDetectionService.scan_course(str(course))
+    assert modules[0].duration_pending
+    assert all(lesson.duration_pending for lesson in modules[0].lessons)
+
+    _wait_until_idle()
+    status = MediaProbeQueueService.get_status()
+    assert status["queue_depth"] == 0
+    assert status["completed_total"] >= 2
+
+    modules, _ = ContentDetectionService.scan_course(str(course))
+    assert not modules[0].duration_pending
+    assert modules[0].total_duration_seconds == 5
+
+
+def test_probe_library_probes_uncached_files_once(tmp_path):
+    _write_wav(str(tmp_path / "course" / "01-module" / "01-a.wav"), 1)
+    _write_wav(str(tmp_path / "course" / "intro.wav"), 2)
+    open(tmp_path / "course" / "notes.md", "w").close()
+
+    assert MediaProbeQueueService.probe_library(str(tmp_path), max_workers=1) == 2
+    assert MediaProbeQueueService.probe_library(str(tmp_path), max_workers=1) == 0
+    assert MediaDurationService.get_duration(str(tmp_path / "course" / "intro.wav")) == 2
+
+
+def test_probe_library_skips_broken_symlinks(tmp_path):
+    _write_wav(str(tmp_path / "course" / "01-a.wav"), 1)
+    os.symlink(str(tmp_path / "missing.wav"), str(tmp_path / "course" / "02-b.wav"))
+
+    assert MediaProbeQueueService.probe_library(str(tmp_path), max_workers=1) == 1
+
+
+def test_failed_probe_is_cached_and_not_queued_again(tmp_path):
+    from concurrent.futures import Future
+
+    path = str(tmp_path / "course" / "01-broken.wav")
+    _write_wav(path, 1)
+    failed = Future()
+    failed.set_exception(RuntimeError("worker crashed"))
+    MediaProbeQueueService._slots = threading.Semaphore(1)
+    MediaProbeQueueService._pending[path] = MediaProbeQueueService.PRIORITY_INTERACTIVE
+
+    MediaProbeQueueService._on_done(path, failed)
+
+    assert not MediaProbeQueueService.is_pending(path)
+    assert MediaDurationService.get_cached_duration(MediaDurationService.cache_key(os.stat(path))) == 0
+
+
+def test_stop_forgets_pending_files(tmp_path):
+    path = str(tmp_path / "01-a.wav")
+    assert MediaProbeQueueService.enqueue(path)
+    assert not MediaProbeQueueService.enqueue(path)
+
+    MediaProbeQueueService.stop()
+
+    assert not MediaProbeQueueService.is_pending(path)
+    assert MediaProbeQueueService.get_status()["queue_depth"] == 0
+    assert MediaProbeQueueService.enqueue(path)
+    MediaProbeQueueService.stop()
+
+
+def test_probe_workers_are_not_forked(tmp_path):
+    # Forked workers would inherit locks held by the app's background threads
+    with MediaProbeQueueService._create_pool(1) as executor:
+        assert executor._mp_context.get_start_method() in ("forkserver", "spawn")
+        _write_wav(str(tmp_path / "lesson.wav"), 1)
+        assert executor.submit(probe_media_file, str(tmp_path / "lesson.wav")).result()["duration_seconds"] == 1
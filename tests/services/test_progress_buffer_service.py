@@ -0,0 +1,74 @@
+import pytest
+from config import Config
+from app.repositories.base_json_repository import BaseJsonRepository
+from app.services.progress_buffer_service import ProgressBufferService
+from app.services.progress_service import ProgressService
+from app.utils.lru_cache import LruCache
+
+
+@pytest.fixture
+def course_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "PROGRESS_FLUSH_INTERVAL_SECONDS", 60)
+    ProgressBufferService.reset()
+    yield str(tmp_path)
+    ProgressBufferService.reset()
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    written = []
+    original = BaseJsonRepository._write_file
+    monkeypatch.setattr(BaseJsonRepository, "_write_file",
+                        lambda self, data: written.append(self.file_path) or original(self, data))
+    return written
+
+
+def test_positions_are_coalesced_into_one_write(course_dir, writes):
+    for position in [5.0, 10.0, 10.0, 15.0]:
+        ProgressBufferService.record_position(course_dir, "01/intro.mp4", position)
+    ProgressBufferService.record_position(course_dir, "01/setup.mp4", 3.0)
+
+    assert writes == []
+    assert ProgressService(course_dir).get_lesson_progress("01/intro.mp4").last_position_seconds == 15.0
+
+    ProgressBufferService.flush_all()
+
+    assert len(writes) == 1
+    stats = ProgressBufferService.get_stats()
+    assert (stats["recorded"], stats["dropped"], stats["pending_courses"]) == (4, 1, 0)
+    lessons = ProgressService(course_dir).repository.load()["lessons"]
+    assert lessons["01/intro.mp4"]["last_position_seconds"] == 15.0
+    assert lessons["01/setup.mp4"]["completed"] is False
+
+
+def test_completion_writes_buffered_positions_first(course_dir):
+    ProgressBufferService.record_position(course_dir, "01/intro.mp4", 42.0)
+
+    ProgressService(course_dir).mark_lesson_completed("01/intro.mp4")
+
+    lesson = ProgressService(course_dir).repository.load()["lessons"]["01/intro.mp4"]
+    assert lesson["completed"] is True
+    assert lesson["last_position_seconds"] == 42.0
+    assert ProgressBufferService.get_stats()["pending_courses"] == 0
+
+
+def test_repeat_detection_remembers_a_bounded_number_of_lessons(course_dir, monkeypatch):
+    monkeypatch.setattr(ProgressBufferService, "_last_positions", LruCache(max_entries=2))
+    for lesson_path in ["01/a.mp4", "01/b.mp4", "01/c.mp4"]:
+        ProgressBufferService.record_position(course_dir, lesson_path, 5.0)
+
+    assert len(ProgressBufferService._last_positions) == 2
+    assert ProgressBufferService.record_position(course_dir, "01/c.mp4", 5.0) is False
+
+
+def test_flush_keeps_a_newer_last_access_written_meanwhile(course_dir):
+    ProgressBufferService.record_position(course_dir, "01/intro.mp4", 42.0)
+    ProgressService(course_dir).repository.append_changes([
+        {"merge": ["lessons", "01/intro.mp4"], "value": {"last_accessed_at": "2999-01-01T00:00:00"}}
+    ])
+
+    ProgressBufferService.flush_all()
+
+    lesson = ProgressService(course_dir).repository.load()["lessons"]["01/intro.mp4"]
+    assert lesson["last_position_seconds"] == 42.0
+    assert lesson["last_accessed_at"] == "2999-01-01T00:00:00"
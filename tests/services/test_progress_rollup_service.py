@@ -0,0 +1,125 @@
+import os
+import threading
+import pytest
+from config import Config
+from app.models.course_model import NodeType
+from app.repositories.registry_repository import RegistryRepository
+from app.services.course_structure_service import CourseStructureService
+from app.services.progress_buffer_service import ProgressBufferService
+from app.services.progress_rollup_service import ProgressRollupService
+from app.services.progress_service import ProgressService
+from app.services.registry_service import RegistryService
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    """programming/{rust,web/react} courses with 2 lessons each, registered; the registry lives in tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, "REGISTRY_WRITE_BEHIND_SECONDS", 60)
+    monkeypatch.setattr(Config, "PROGRESS_FLUSH_INTERVAL_SECONDS", 60)
+    monkeypatch.setattr(Config, "PROGRESS_ROLLUP_REVALIDATE_SECONDS", 0)
+    root = tmp_path / "library"
+    monkeypatch.setattr(Config, "COURSES_ROOT_DIRECTORY_ABS_PATH", str(root))
+    for course in ["programming/rust", "programming/web/react"]:
+        _touch(str(root / course / "01-start" / "01-hello.mp4"))
+        _touch(str(root / course / "01-start" / "02-next.md"))
+        RegistryService().register_item(os.path.basename(course), str(root / course), NodeType.COURSE)
+    CourseStructureService.clear_cache()
+    ProgressRollupService.reset()
+    yield str(root)
+    ProgressBufferService.reset()
+    ProgressRollupService.reset()
+    CourseStructureService.clear_cache()
+    RegistryRepository.reset()
+
+
+def _counts(directory_path):
+    """Counts of a directory once the background seeding and refreshes it started are done."""
+    ProgressRollupService.get_counts(directory_path)
+    ProgressRollupService.wait_for_background()
+    return ProgressRollupService.get_counts(directory_path)
+
+
+def test_directories_roll_up_courses_below_them(library):
+    rust = os.path.join(library, "programming", "rust")
+    ProgressService(rust).apply_operations([{"op": "complete_module", "module": "01-start"}])
+
+    # Seeded in the background: no counts (the card shows "pending") until then
+    assert ProgressRollupService.get_counts(library) is None
+    assert ProgressRollupService.get_progress_percent(library) is None
+    ProgressRollupService.wait_for_background()
+
+    assert ProgressRollupService.get_counts(os.path.join(library, "programming")) == (2, 4)
+    assert ProgressRollupService.get_progress_percent(library) == 50.0
+    assert ProgressRollupService.get_counts(os.path.join(library, "programming", "web")) == (0, 2)
+
+
+def test_seeding_discovers_unregistered_courses_and_later_additions(library):
+    # Neither the course nor the directories above it were ever browsed
+    _touch(os.path.join(library, "languages", "spanish", "basics", "01-start", "01-hola.mp4"))
+
+    assert _counts(library) == (0, 5)
+    assert ProgressRollupService.get_counts(os.path.join(library, "languages")) == (0, 1)
+
+    _touch(os.path.join(library, "languages", "french", "01-start", "01-bonjour.mp4"))
+    assert _counts(library) == (0, 6)
+
+
+def test_completion_and_lesson_changes_update_rollups(library):
+    programming = os.path.join(library, "programming")
+    react = os.path.join(programming, "web", "react")
+    assert _counts(programming) == (0, 4)
+
+    ProgressService(react).mark_lesson_completed("01-start/01-hello.mp4")
+    ProgressService(react).mark_lesson_completed("01-start/01-hello.mp4")
+    assert ProgressRollupService.get_counts(programming) == (1, 4)
+
+    _touch(os.path.join(react, "01-start", "03-more.mp4"))
+    CourseStructureService.invalidate_path(os.path.join(react, "01-start"))
+    assert _counts(programming) == (1, 5)
+
+    os.remove(os.path.join(react, "01-start", "01-hello.mp4"))
+    CourseStructureService.invalidate_path(os.path.join(react, "01-start"))
+    assert _counts(programming) == (0, 4)
+
+    RegistryService().remove_path(react)
+    assert ProgressRollupService.get_counts(programming) == (0, 2)
+
+
+def test_counts_are_pending_while_a_subtree_is_reseeded(library, monkeypatch):
+    programming = os.path.join(library, "programming")
+    assert _counts(library) == (0, 4)
+
+    release = threading.Event()
+    seed = ProgressRollupService.seed
+    monkeypatch.setattr(ProgressRollupService, "seed", staticmethod(lambda path: release.wait(5) and seed(path)))
+    ProgressRollupService.directory_changed(os.path.join(programming, "web"))
+
+    # Pending at and above the reseeded directory, not 0%
+    assert ProgressRollupService.get_counts(library) is None
+    assert ProgressRollupService.get_counts(os.path.join(programming, "web")) is None
+    release.set()
+    ProgressRollupService.wait_for_background()
+    assert ProgressRollupService.get_counts(library) == (0, 4)
+
+
+def test_reads_check_the_disk_on_the_background_thread_at_most_once_per_interval(library, monkeypatch):
+    monkeypatch.setattr(Config, "PROGRESS_ROLLUP_REVALIDATE_SECONDS", 3600)
+    assert _counts(library) == (0, 4)
+
+    _touch(os.path.join(library, "languages", "french", "01-start", "01-bonjour.mp4"))
+    stats = []
+    stat = os.stat
+    monkeypatch.setattr(os, "stat", lambda path, *args, **kwargs: stats.append(path) or stat(path, *args, **kwargs))
+
+    # Checked when seeded, so not again within the interval: no stat and the old counts
+    assert _counts(library) == (0, 4)
+    assert stats == []
+
+    monkeypatch.setattr(Config, "PROGRESS_ROLLUP_REVALIDATE_SECONDS", 0)
+    assert _counts(library) == (0, 5)
@@ -0,0 +1,79 @@
+import os
+import pytest
+from config import Config
+from app.services.course_structure_service import CourseStructureService
+from app.services.progress_buffer_service import ProgressBufferService
+from app.services.progress_service import ProgressService
+
+
+@pytest.fixture
+def course_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "PROGRESS_FLUSH_INTERVAL_SECONDS", 60)
+    ProgressBufferService.reset()
+    for module in ["01 Basics", "02 Advanced"]:
+        os.makedirs(tmp_path / module)
+        for lesson in ["01 intro.mp4", "02 setup.md"]:
+            (tmp_path / module / lesson).write_text("x")
+    yield str(tmp_path)
+    ProgressBufferService.reset()
+    CourseStructureService.invalidate(str(tmp_path))
+
+
+def test_batch_operations_are_applied_in_order_in_one_write(course_dir, monkeypatch):
+    service = ProgressService(course_dir)
+    ProgressBufferService.record_position(course_dir, "02 Advanced/01 intro.mp4", 7.0)
+    writes = []
+    original = service.repository.append_changes
+    monkeypatch.setattr(service.repository, "append_changes", lambda changes: writes.append(changes) or original(changes))
+
+    applied = service.apply_operations([
+        {"op": "complete_module", "module": "01 Basics"},
+        {"op": "incomplete", "lesson_path": "01 Basics/02 setup.md"},
+        {"op": "position", "lesson_path": "01 Basics/01 intro.mp4", "position_seconds": 30},
+    ])
+
+    assert applied == 4
+    assert len(writes) == 1
+    lessons = service.repository.load()["lessons"]
+    assert lessons["01 Basics/01 intro.mp4"]["completed"] is True
+    assert lessons["01 Basics/01 intro.mp4"]["last_position_seconds"] == 30.0
+    assert lessons["01 Basics/02 setup.md"]["completed"] is False
+    # Buffered positions of the course were written before the batch
+    assert lessons["02 Advanced/01 intro.mp4"]["last_position_seconds"] == 7.0
+
+
+@pytest.mark.parametrize("operation", [
+    {"op": "complete_module", "module": "03 Missing"},
+    {"op": "position", "lesson_path": "01 Basics/01 intro.mp4"},
+    {"op": "complete"},
+    {"op": "rewind", "lesson_path": "01 Basics/01 intro.mp4"},
+])
+def test_invalid_batch_writes_nothing(course_dir, operation):
+    service = ProgressService(course_dir)
+
+    with pytest.raises(ValueError):
+        service.apply_operations([{"op": "complete", "lesson_path": "01 Basics/02 setup.md"}, operation])
+
+    assert service.repository.load() is None
+
+
+def test_completion_stats_ignore_deleted_lessons(course_dir):
+    service = ProgressService(course_dir)
+    service.apply_operations([{"op": "complete_module", "module": "02 Advanced"}])
+    assert service.get_course_completion_stats()["completed_lessons"] == 2
+
+    os.remove(os.path.join(course_dir, "02 Advanced", "02 setup.md"))
+
+    stats = service.get_course_completion_stats()
+    assert (stats["completed_lessons"], stats["total_lessons"], stats["completion_percentage"]) == (1, 3, 33.33)
+
+
+def test_progress_of_a_read_only_course_reads_as_default(course_dir):
+    os.chmod(course_dir, 0o555)
+    try:
+        progress = ProgressService(course_dir).get_progress()
+    finally:
+        os.chmod(course_dir, 0o755)
+
+    assert progress == {"lessons": {}, "last_updated_at": None}
+    assert sorted(os.listdir(course_dir)) == ["01 Basics", "02 Advanced"]
@@ -0,0 +1,146 @@
+import json
+import os
+import pytest
+from config import Config
+from app.models.course_model import NodeType
+from app.repositories.registry_repository import RegistryRepository
+from app.services.registry_service import RegistryService
+
+
+@pytest.fixture
+def registry_file(tmp_path, monkeypatch):
+    """A registry inside tmp_path, with a write-behind delay long enough to never fire during a test."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, "REGISTRY_WRITE_BEHIND_SECONDS", 60)
+    yield tmp_path / RegistryRepository.DEFAULT_REGISTRY_PATH
+    RegistryRepository.reset()
+
+
+def test_changes_are_shared_in_memory_and_written_behind(registry_file):
+    RegistryService().register_item("Python", "/library/python", NodeType.COURSE)
+
+    assert RegistryService().find_entry_by_path("/library/python")["title"] == "Python"
+    with open(registry_file) as f:
+        assert json.load(f)["courses"] == {}
+
+    RegistryService().flush()
+    with open(registry_file) as f:
+        assert "Python|/library/python" in json.load(f)["courses"]
+
+
+def test_external_edit_is_reloaded(registry_file):
+    service = RegistryService()
+    service.register_item("Python", "/library/python", NodeType.COURSE)
+    service.flush()
+
+    with open(registry_file) as f:
+        data = json.load(f)
+    data["courses"]["Rust|/library/rust"] = dict(data["courses"]["Python|/library/python"], title="Rust", path="/library/rust")
+    with open(registry_file, "w") as f:
+        json.dump(data, f)
+    stat = os.stat(registry_file)
+    os.utime(registry_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert RegistryService().get_course_by_id("rust")["title"] == "Rust"
+
+
+def test_id_and_path_indexes_follow_changes(registry_file):
+    service = RegistryService()
+    assert service.get_course_by_id("python") is None
+
+    service.register_item("Python", "/library/python", NodeType.COURSE)
+    service.register_item("Python", "/library/archive/python", NodeType.COURSE)
+    service.register_item("Archive", "/library/archive", NodeType.DIRECTORY)
+
+    # Unknown ids are cached as missing only until they are registered
+    assert service.get_course_by_id("python")["path"] == "/library/python"
+    assert service.get_directory_by_id("archive")["title"] == "Archive"
+    assert service.get_directory_by_id("python") is None
+
+    service.remove_path("/library/python")
+    assert service.get_course_by_id("python")["path"] == "/library/archive/python"
+    assert service.find_entry_by_path("/library/python") is None
+
+    service.clear_all_entries()
+    assert service.get_course_by_id("python") is None
+
+
+def test_last_accessed_is_written_once_per_interval(registry_file, monkeypatch):
+    service = RegistryService()
+    service.register_item("Python", "/library/python", NodeType.COURSE)
+    service.flush()
+    stored = service.find_entry_by_path("/library/python")["last_accessed"]
+
+    for _ in range(5):
+        service.update_last_accessed("Python", "/library/python", NodeType.COURSE)
+
+    # Registered just now, so the accesses stay in the access table
+    assert service.find_entry_by_path("/library/python")["last_accessed"] == stored
+    assert not service.repository._document.has_changes
+    assert service.get_access_stats()[0]["hits"] == 5
+
+    service.repository.apply_pending_accesses()
+    assert service.find_entry_by_path("/library/python")["last_accessed"] > stored
+
+    monkeypatch.setattr(service.repository._document.accesses, "flush_interval_seconds", 0)
+    service.flush()
+    service.update_last_accessed("Python", "/library/python", NodeType.COURSE)
+    assert service.repository._document.has_changes
+
+
+def test_json_registry_migrates_to_sqlite(registry_file, tmp_path):
+    from app.repositories.sqlite_registry_repository import SqliteRegistryRepository
+
+    json_service = RegistryService()
+    json_service.register_item("Library", "/library", NodeType.DIRECTORY)
+    json_service.register_item("Python", "/library/python", NodeType.COURSE)
+    json_service.flush()
+
+    sqlite_service = RegistryService(SqliteRegistryRepository(str(tmp_path / "registry.sqlite3")))
+    try:
+        assert sqlite_service.migrate_from_json_registry(str(registry_file)) == 2
+        assert sqlite_service.get_course_by_id("python")["title"] == "Python"
+        breadcrumbs = sqlite_service.build_breadcrumbs_from_path("/library/python", "Python")
+        assert breadcrumbs[-1] == {"title": "Python", "url": "/course/python"}
+    finally:
+        SqliteRegistryRepository.reset()
+
+
+def test_breadcrumbs_follow_the_path_trie(registry_file):
+    service = RegistryService()
+    service.register_item("Programming", "/library/programming", NodeType.DIRECTORY)
+    service.register_item("Python", "/library/programming/python", NodeType.COURSE)
+    service.register_item("Rust", "/library/rust", NodeType.COURSE)
+
+    assert service.build_breadcrumbs_from_path("/library/programming/python", "Python") == [
+        {"title": "Home", "url": "/"},
+        {"title": "Programming", "url": "/directory/programming"},
+        {"title": "Python", "url": "/course/python"}
+    ]
+    assert [entry["title"] for entry in service.get_child_entries("/library")] == ["Programming", "Rust"]
+
+    # The cached root follows removals
+    service.remove_path("/library/rust")
+    assert service.repository.get_root_path() == "/library/programming"
+    assert service.build_breadcrumbs_from_path("/library/programming/python", "Python")[1:] == [
+        {"title": "Python", "url": "/course/python"}
+    ]
+
+
+def test_journaled_registry_appends_entry_changes(registry_file, monkeypatch):
+    monkeypatch.setattr(Config, "JSON_JOURNAL_ENABLED", True)
+    service = RegistryService()
+    service.flush()
+    snapshot = registry_file.read_text()
+
+    service.register_item("Python", "/library/python", NodeType.COURSE)
+    service.register_item("Rust", "/library/rust", NodeType.COURSE)
+    service.flush()
+
+    assert registry_file.read_text() == snapshot
+    journal = RegistryRepository(str(registry_file)).journal_path
+    with open(journal) as f:
+        assert len(f.readlines()) == 3
+
+    RegistryRepository.reset()
+    assert RegistryService().get_course_by_id("rust")["title"] == "Rust"
@@ -0,0 +1,69 @@
+import os
+import pytest
+from app.services.course_structure_service import CourseStructureService
+from app.services.registry_service import RegistryService
+from app.services.warmup_service import WarmupService
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "w").close()
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    """A library root with a course and a nested directory of courses; the registry lives in tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    root = tmp_path / "library"
+    _touch(str(root / "python" / "01-basics" / "01-intro.mp4"))
+    _touch(str(root / "programming" / "rust" / "01-start" / "01-hello.mp4"))
+    _touch(str(root / "programming" / "go" / "01-start" / "01-hello.mp4"))
+    CourseStructureService.clear_cache()
+    yield str(root)
+    CourseStructureService.clear_cache()
+    monkeypatch.setattr(WarmupService, "_status", {"state": WarmupService.STATE_DISABLED})
+
+
+def test_crawl_warms_registry_and_structure_cache(library):
+    WarmupService.crawl(library, max_workers=2)
+
+    status = WarmupService.get_status()
+    assert status["state"] == WarmupService.STATE_READY
+    assert WarmupService.is_ready()
+    assert status["directories_warmed"] == status["directories_discovered"] == 2
+    assert status["courses_warmed"] == 3
+    assert status["percent_warm"] == 100.0
+
+    registry = RegistryService()
+    assert registry.find_entry_by_path(os.path.join(library, "programming", "rust")) is not None
+    assert CourseStructureService._cache.peek(os.path.join(library, "programming", "go")) is not None
+
+
+def test_background_crawl_reports_readiness(library):
+    WarmupService.start(library, max_workers=1)
+    WarmupService._thread.join(timeout=10)
+
+    assert WarmupService.is_ready()
+    assert not WarmupService.is_running()
+
+
+@pytest.mark.parametrize("state", [WarmupService.STATE_FAILED, WarmupService.STATE_STOPPED])
+def test_failed_or_stopped_crawl_is_ready_but_degraded(library, monkeypatch, state):
+    from app.services.directory_service import DirectoryService
+
+    if state == WarmupService.STATE_FAILED:
+        def scan_directory(*args, **kwargs):
+            raise OSError("library unmounted")
+        monkeypatch.setattr(DirectoryService, "scan_directory", scan_directory)
+    else:
+        WarmupService._stop_event.set()
+
+    try:
+        WarmupService.crawl(library, max_workers=1)
+    finally:
+        WarmupService._stop_event.clear()
+
+    status = WarmupService.get_status()
+    assert status["state"] == state
+    assert status["degraded"] is True
+    assert WarmupService.is_ready()
@@ -0,0 +1,18 @@
+import threading
+import markdown
+from app.services.lesson_service import LessonService
+from app.utils.markdown_converter_pool import MarkdownConverterPool
+
+
+def test_pooled_converters_are_reused_and_reset():
+    pool = MarkdownConverterPool(LessonService.MARKDOWN_EXTENSIONS)
+    documents = ["# One\n\n```python\nx = 1\n```\n", "| a | b |\n|---|---|\n| 1 | 2 |\n", "line\nbreak"]
+
+    for document in documents * 2:
+        assert pool.convert(document) == markdown.markdown(document, extensions=LessonService.MARKDOWN_EXTENSIONS)
+    assert pool.created == 1
+
+    thread = threading.Thread(target=pool.convert, args=(documents[0],))
+    thread.start()
+    thread.join()
+    assert pool.created == 2